@@ -0,0 +1,16 @@
+"""
+Performance benchmarks for cloudbridge service hot paths, run against the
+moto backed mock provider with a seeded dataset of instances, volumes,
+buckets and objects. Each benchmark reports its throughput and peak memory
+use, and is compared against the baselines stored in ``baselines/``. The
+time taken to import cloudbridge and create a provider is also measured::
+
+    python -m benchmarks                   # compare against the baselines
+    python -m benchmarks storage.objects   # run a subset
+    python -m benchmarks --save            # record new baselines
+
+The command exits with a non-zero status if any benchmark's throughput
+drops, or its memory use grows, by more than the allowed tolerance.
+Timings depend on the machine, so baselines should be recorded on the same
+machine (or CI runner) they are compared on.
+"""
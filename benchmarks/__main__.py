@@ -0,0 +1,102 @@
+"""
+Runs the mock provider benchmarks and compares them against the stored
+baselines, exiting with a non-zero status if any regress, or if there are
+no baselines to compare against.
+
+No baselines are shipped, as timings depend on the machine. Run with
+``--save`` to record them, or with ``--save-missing`` to record them only
+if there are none yet, as ``tox -e bench`` does: its first run records the
+baselines, and later runs compare against them.
+"""
+import argparse
+import logging
+import os
+import platform
+import sys
+
+from . import harness
+from . import mock_provider
+from . import parsers
+from . import startup
+
+DEFAULT_BASELINES = os.path.join(os.path.dirname(__file__), 'baselines',
+                                 'mock.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('names', nargs='*',
+                        help="Run only benchmarks starting with these names")
+    parser.add_argument('--baselines', default=DEFAULT_BASELINES,
+                        help="Path to the baselines file")
+    parser.add_argument('--save', action='store_true',
+                        help="Save the results as the new baselines instead"
+                             " of comparing against them")
+    parser.add_argument('--save-missing', action='store_true',
+                        help="Save the results as the baselines if there"
+                             " are none yet, and compare against them"
+                             " otherwise")
+    parser.add_argument('--tolerance', type=float,
+                        default=harness.DEFAULT_TOLERANCE,
+                        help="Allowed fractional regression (default:"
+                             " %(default)s)")
+    parser.add_argument('--repeat', type=int, default=harness.DEFAULT_REPEAT,
+                        help="Runs per benchmark; the fastest is kept")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Do not measure peak memory use")
+    for key, value in sorted(mock_provider.DEFAULT_SIZES.items()):
+        parser.add_argument('--{0}'.format(key.replace('_', '-')), type=int,
+                            default=value, dest=key,
+                            help="Dataset size (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.save_missing and not os.path.exists(args.baselines):
+        args.save = True
+    if not args.save and not os.path.exists(args.baselines):
+        # Nothing could be detected, which must not pass as a clean run
+        print("No baselines found at {0}. Run with --save or --save-missing"
+              " to create them.".format(args.baselines))
+        return 2
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for name in ('cloudbridge', 'botocore', 'boto3'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    os.environ.setdefault('MOTO_AMIS_PATH', os.path.join(
+        os.path.dirname(__file__), '..', 'tests', 'fixtures',
+        'custom_amis.json'))
+
+    sizes = {key: getattr(args, key) for key in mock_provider.DEFAULT_SIZES}
+    # Startup is measured first, in separate interpreters, before the mock
+    # provider patches boto
+    results = startup.build_suite().run(
+        repeat=args.repeat, measure_memory=False, names=args.names)
+    results += parsers.build_suite().run(
+        repeat=args.repeat, measure_memory=not args.no_memory,
+        names=args.names)
+    provider = mock_provider.create_provider()
+    try:
+        dataset = mock_provider.seed(provider, sizes)
+        suite = mock_provider.build_suite(provider, dataset)
+        results += suite.run(repeat=args.repeat,
+                             measure_memory=not args.no_memory,
+                             names=args.names)
+    finally:
+        provider.tearDownMock()
+
+    if args.save:
+        harness.save_baselines(args.baselines, results, metadata={
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes})
+        print("Saved baselines to {0}".format(args.baselines))
+        return 0
+
+    regressions = harness.compare(
+        results, harness.load_baselines(args.baselines), args.tolerance)
+    for r in regressions:
+        print("REGRESSION: {0} {1} is {2:.1f}, baseline {3:.1f}".format(
+            r.name, r.metric, r.value, r.baseline))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+A minimal harness for timing benchmarks, measuring their memory use and
+comparing the results against stored baselines.
+"""
+import collections
+import gc
+import json
+import logging
+import os
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+log = logging.getLogger(__name__)
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+DEFAULT_REPEAT = 3
+# The fraction by which a result may be worse than its baseline before it is
+# considered a regression. Timings vary between runs, so this is generous.
+DEFAULT_TOLERANCE = 0.3
+
+Benchmark = collections.namedtuple('Benchmark',
+                                   ['name', 'func', 'items', 'memory'])
+
+Result = collections.namedtuple(
+    'Result', ['name', 'items', 'seconds', 'items_per_second',
+               'peak_memory_kb'])
+
+Regression = collections.namedtuple(
+    'Regression', ['name', 'metric', 'baseline', 'value'])
+
+
+class BenchmarkSuite(object):
+    """
+    A collection of named benchmarks. Each benchmark is a callable which
+    processes a known number of ``items`` (objects listed, bytes uploaded and
+    so on), so that results are reported as a throughput.
+
+    Example:
+
+    .. code-block:: python
+
+        suite = BenchmarkSuite()
+
+        @suite.benchmark('instances.list', items=50)
+        def list_instances():
+            provider.compute.instances.list(limit=50)
+    """
+
+    def __init__(self):
+        self.benchmarks = collections.OrderedDict()
+
+    def benchmark(self, name, items=1, memory=True):
+        """
+        Registers a benchmark. Pass ``memory=False`` for benchmarks whose
+        work happens outside this process, where ``tracemalloc`` cannot see
+        it.
+        """
+        def register(func):
+            self.benchmarks[name] = Benchmark(name, func, items, memory)
+            return func
+        return register
+
+    def run(self, repeat=DEFAULT_REPEAT, measure_memory=True, names=None):
+        """
+        Runs each benchmark ``repeat`` times and keeps the fastest run, then
+        runs it once more under ``tracemalloc`` to record its peak memory
+        use. Memory is not measured on Pythons without ``tracemalloc``.
+
+        :type names: ``list`` of ``str``
+        :param names: Run only the benchmarks whose names start with one of
+                      these prefixes.
+
+        :rtype: ``list`` of :class:`Result`
+        """
+        results = []
+        for benchmark in self.benchmarks.values():
+            if names and not any(benchmark.name.startswith(n) for n in names):
+                continue
+            results.append(run_benchmark(benchmark, repeat, measure_memory))
+            log.info("%s", format_result(results[-1]))
+        return results
+
+
+def run_benchmark(benchmark, repeat=DEFAULT_REPEAT, measure_memory=True):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = _timer()
+        benchmark.func()
+        timings.append(_timer() - start)
+    seconds = min(timings)
+
+    peak_memory_kb = None
+    if measure_memory and benchmark.memory and tracemalloc:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            benchmark.func()
+            peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024.0
+        finally:
+            tracemalloc.stop()
+    return Result(benchmark.name, benchmark.items, seconds,
+                  benchmark.items / seconds if seconds else float('inf'),
+                  peak_memory_kb)
+
+
+def format_result(result):
+    memory = ("{0:10.1f} KiB".format(result.peak_memory_kb)
+              if result.peak_memory_kb is not None else "           n/a")
+    return "{0:<40} {1:12.1f} items/s {2:10.4f} s {3}".format(
+        result.name, result.items_per_second, result.seconds, memory)
+
+
+def load_baselines(path):
+    with open(path) as f:
+        return json.load(f)['benchmarks']
+
+
+def save_baselines(path, results, metadata=None):
+    data = {
+        'metadata': metadata or {},
+        'benchmarks': collections.OrderedDict(
+            (r.name, {'items_per_second': round(r.items_per_second, 2),
+                      'peak_memory_kb': (round(r.peak_memory_kb, 1)
+                                         if r.peak_memory_kb is not None
+                                         else None)})
+            for r in results)
+    }
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def compare(results, baselines, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares results against their baselines. A result regresses if its
+    throughput is more than ``tolerance`` below the baseline, or its peak
+    memory is more than ``tolerance`` above it. Benchmarks without a
+    baseline are ignored.
+
+    :rtype: ``list`` of :class:`Regression`
+    """
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.name)
+        if not baseline:
+            continue
+        expected = baseline.get('items_per_second')
+        if expected and result.items_per_second < expected * (1 - tolerance):
+            regressions.append(Regression(result.name, 'items_per_second',
+                                          expected, result.items_per_second))
+        expected = baseline.get('peak_memory_kb')
+        if (expected and result.peak_memory_kb is not None and
+                result.peak_memory_kb > expected * (1 + tolerance)):
+            regressions.append(Regression(result.name, 'peak_memory_kb',
+                                          expected, result.peak_memory_kb))
+    return regressions
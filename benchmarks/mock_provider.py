@@ -0,0 +1,240 @@
+"""
+Benchmarks for service hot paths, driven against the moto backed
+``MockAWSCloudProvider`` with a seeded dataset.
+"""
+import io
+import logging
+
+from cloudbridge.base import helpers as cb_helpers
+from cloudbridge.base.resources import ClientPagedResultList
+from cloudbridge.factory import CloudProviderFactory
+from cloudbridge.factory import ProviderList
+
+from .harness import BenchmarkSuite
+
+log = logging.getLogger(__name__)
+
+# Matches the ami in tests/fixtures/custom_amis.json, which should be
+# supplied to moto through the MOTO_AMIS_PATH environment variable
+IMAGE_ID = 'ami-aa2ea6d0'
+VM_TYPE = 't2.nano'
+ZONE = 'us-east-1a'
+
+DEFAULT_SIZES = {
+    'instances': 2000,
+    'volumes': 1000,
+    'buckets': 100,
+    'objects': 2000,
+    'object_mb': 16,
+}
+
+# Instances and volumes are labelled in groups of this size, so that finds
+# by label have a known number of matches
+GROUP_SIZE = 100
+PAGE_SIZE = 50
+OBJECT_BUCKET = 'cb-bench-objects'
+TRANSFER_PART_SIZE = 5 * 1024 * 1024
+
+
+class Dataset(object):
+    """
+    The ids and names of the seeded resources.
+    """
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.instance_ids = []
+        self.volume_ids = []
+        self.bucket_names = []
+        self.object_names = []
+
+
+def create_provider():
+    return CloudProviderFactory().create_provider(
+        ProviderList.MOCK, {'aws_zone_name': ZONE})
+
+
+def _tags(resource_type, label):
+    return [{'ResourceType': resource_type,
+             'Tags': [{'Key': 'Name', 'Value': label}]}]
+
+
+def seed(provider, sizes=None):
+    """
+    Creates the benchmark dataset directly through boto, bypassing
+    cloudbridge so that seeding is fast and does not skew any caches.
+    """
+    sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+    dataset = Dataset(sizes)
+    ec2 = provider.ec2_conn.meta.client
+    s3 = provider.s3_conn.meta.client
+
+    for group in range(0, sizes['instances'], GROUP_SIZE):
+        count = min(GROUP_SIZE, sizes['instances'] - group)
+        response = ec2.run_instances(
+            ImageId=IMAGE_ID, InstanceType=VM_TYPE, MinCount=count,
+            MaxCount=count, Placement={'AvailabilityZone': ZONE},
+            TagSpecifications=_tags(
+                'instance', 'bench-inst-{0}'.format(group // GROUP_SIZE)))
+        dataset.instance_ids.extend(
+            i['InstanceId'] for i in response['Instances'])
+
+    for i in range(sizes['volumes']):
+        response = ec2.create_volume(
+            Size=1, AvailabilityZone=ZONE,
+            TagSpecifications=_tags(
+                'volume', 'bench-vol-{0}'.format(i // GROUP_SIZE)))
+        dataset.volume_ids.append(response['VolumeId'])
+
+    for i in range(sizes['buckets']):
+        name = 'cb-bench-{0:05d}'.format(i)
+        s3.create_bucket(Bucket=name)
+        dataset.bucket_names.append(name)
+
+    s3.create_bucket(Bucket=OBJECT_BUCKET)
+    for i in range(sizes['objects']):
+        name = 'dir{0}/key-{1:05d}'.format(i // GROUP_SIZE, i)
+        s3.put_object(Bucket=OBJECT_BUCKET, Key=name, Body=b'x')
+        dataset.object_names.append(name)
+    log.info("Seeded %s", ", ".join(
+        "{0} {1}".format(v, k) for k, v in sorted(sizes.items())))
+    return dataset
+
+
+class _Item(object):
+
+    def __init__(self, item_id):
+        self.id = item_id
+        self.name = 'item-{0:05d}'.format(item_id)
+        self.label = 'group-{0}'.format(item_id // GROUP_SIZE)
+
+
+def build_suite(provider, dataset):
+    """
+    Registers the benchmarks for a seeded provider.
+    """
+    suite = BenchmarkSuite()
+    sizes = dataset.sizes
+    compute = provider.compute
+    storage = provider.storage
+    object_bucket = storage.buckets.get(OBJECT_BUCKET)
+    payload = b'0123456789abcdef' * (sizes['object_mb'] * 64 * 1024)
+    in_memory = [_Item(i) for i in range(sizes['objects'])]
+
+    # In-process helpers, without any moto overhead
+    @suite.benchmark('helpers.client_paged_result_list',
+                     items=len(in_memory))
+    def client_paged_result_list():
+        marker = None
+        while True:
+            page = ClientPagedResultList(provider, in_memory, PAGE_SIZE,
+                                         marker)
+            if not page.is_truncated:
+                break
+            marker = page.marker
+
+    @suite.benchmark('helpers.generic_find', items=len(in_memory))
+    def generic_find():
+        list(cb_helpers.generic_find(
+            ['name', 'label'], {'name': 'item-0*', 'label': 'group-1'},
+            in_memory))
+
+    # Compute
+    @suite.benchmark('compute.instances.list', items=PAGE_SIZE)
+    def list_instances():
+        compute.instances.list(limit=PAGE_SIZE)
+
+    first_page = compute.instances.list(limit=PAGE_SIZE)
+
+    @suite.benchmark('compute.instances.list_next_page', items=PAGE_SIZE)
+    def list_next_instances():
+        compute.instances.list(limit=PAGE_SIZE, marker=first_page.marker)
+
+    @suite.benchmark('compute.instances.iterate',
+                     items=sizes['instances'])
+    def iterate_instances():
+        for _ in compute.instances:
+            pass
+
+    @suite.benchmark('compute.instances.get', items=PAGE_SIZE)
+    def get_instances():
+        for instance_id in dataset.instance_ids[:PAGE_SIZE]:
+            compute.instances.get(instance_id)
+
+    @suite.benchmark('compute.instances.find', items=GROUP_SIZE)
+    def find_instances():
+        compute.instances.find(label='bench-inst-0')
+
+    # Storage
+    @suite.benchmark('storage.volumes.list', items=PAGE_SIZE)
+    def list_volumes():
+        storage.volumes.list(limit=PAGE_SIZE)
+
+    @suite.benchmark('storage.volumes.iterate', items=sizes['volumes'])
+    def iterate_volumes():
+        for _ in storage.volumes:
+            pass
+
+    @suite.benchmark('storage.volumes.get', items=PAGE_SIZE)
+    def get_volumes():
+        for volume_id in dataset.volume_ids[:PAGE_SIZE]:
+            storage.volumes.get(volume_id)
+
+    @suite.benchmark('storage.volumes.find', items=GROUP_SIZE)
+    def find_volumes():
+        storage.volumes.find(label='bench-vol-0')
+
+    @suite.benchmark('storage.buckets.list', items=PAGE_SIZE)
+    def list_buckets():
+        storage.buckets.list(limit=PAGE_SIZE)
+
+    @suite.benchmark('storage.buckets.iterate', items=sizes['buckets'] + 1)
+    def iterate_buckets():
+        for _ in storage.buckets:
+            pass
+
+    @suite.benchmark('storage.objects.list', items=PAGE_SIZE)
+    def list_objects():
+        object_bucket.objects.list(limit=PAGE_SIZE)
+
+    @suite.benchmark('storage.objects.iterate', items=sizes['objects'])
+    def iterate_objects():
+        for _ in object_bucket.objects:
+            pass
+
+    @suite.benchmark('storage.objects.get', items=PAGE_SIZE)
+    def get_objects():
+        for name in dataset.object_names[:PAGE_SIZE]:
+            object_bucket.objects.get(name)
+
+    @suite.benchmark('storage.objects.find', items=GROUP_SIZE)
+    def find_objects():
+        object_bucket.objects.find(name='dir1/*')
+
+    # Transfers, measured in MiB
+    transfer_obj = object_bucket.objects.create('bench-transfer')
+
+    @suite.benchmark('storage.objects.upload', items=sizes['object_mb'])
+    def upload():
+        transfer_obj.upload(payload)
+
+    @suite.benchmark('storage.objects.upload_stream',
+                     items=sizes['object_mb'])
+    def upload_stream():
+        transfer_obj.upload_stream(io.BytesIO(payload),
+                                   part_size=TRANSFER_PART_SIZE)
+
+    @suite.benchmark('storage.objects.download', items=sizes['object_mb'])
+    def download():
+        for _ in transfer_obj.iter_content():
+            pass
+
+    @suite.benchmark('storage.objects.download_to',
+                     items=sizes['object_mb'])
+    def download_to():
+        transfer_obj.download_to(io.BytesIO(),
+                                 part_size=TRANSFER_PART_SIZE)
+
+    # Give the download benchmarks content, even if uploads are skipped
+    transfer_obj.upload(payload)
+    return suite
@@ -0,0 +1,72 @@
+"""
+Micro-benchmarks for the resource ID and URL parsers that providers run on
+most operations. These run in-process and need no cloud access.
+"""
+import logging
+
+from .harness import BenchmarkSuite
+
+log = logging.getLogger(__name__)
+
+# The number of distinct resource IDs in a simulated listing, and the number
+# of times each is parsed while walking the listing
+LISTING_SIZE = 2000
+PASSES = 5
+
+
+def _reference_parse_url(template_urls, original_url):
+    """
+    The previous implementation of the Azure ``parse_url`` helper, which
+    splits every template on every call. Kept to show the speedup.
+    """
+    original_url_parts = original_url.split('/')
+    if len(original_url_parts) == 1:
+        original_url_parts = original_url.split(':')
+    for each_template in template_urls:
+        template_url_parts = each_template.split('/')
+        if len(template_url_parts) == 1:
+            template_url_parts = each_template.split(':')
+        if len(template_url_parts) == len(original_url_parts):
+            break
+    resource_param = {}
+    for key, value in zip(template_url_parts, original_url_parts):
+        if key.startswith('{') and key.endswith('}'):
+            resource_param.update({key[1:-1]: value})
+    return resource_param
+
+
+def build_suite():
+    suite = BenchmarkSuite()
+    try:
+        from cloudbridge.providers.azure import azure_client
+        from cloudbridge.providers.azure import helpers as azure_helpers
+    except ImportError as e:
+        log.warning("Skipping the Azure parser benchmarks: %s", e)
+        return suite
+
+    templates = azure_client.VM_RESOURCE_ID
+    vm_ids = ['/subscriptions/sub-0000/resourceGroups/cb-bench/providers/'
+              'Microsoft.Compute/virtualMachines/vm-{0:05d}'.format(i)
+              for i in range(LISTING_SIZE)]
+    items = LISTING_SIZE * PASSES
+
+    @suite.benchmark('azure.parse_url.reference', items=items)
+    def parse_reference():
+        for _ in range(PASSES):
+            for vm_id in vm_ids:
+                _reference_parse_url(templates, vm_id)
+
+    @suite.benchmark('azure.parse_url.uncached', items=items)
+    def parse_uncached():
+        for _ in range(PASSES):
+            for vm_id in vm_ids:
+                azure_helpers._parsed_ids.clear()
+                azure_helpers.parse_url(templates, vm_id)
+
+    @suite.benchmark('azure.parse_url.listing', items=items)
+    def parse_listing():
+        for _ in range(PASSES):
+            for vm_id in vm_ids:
+                azure_helpers.parse_url(templates, vm_id)
+
+    return suite
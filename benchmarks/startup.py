@@ -0,0 +1,34 @@
+"""
+Benchmarks for the time taken to import cloudbridge and create a provider,
+each measured in a fresh interpreter so that nothing is already imported.
+"""
+import subprocess
+import sys
+
+from .harness import BenchmarkSuite
+
+CREATE_PROVIDER = """
+import sys
+from cloudbridge.factory import CloudProviderFactory
+CloudProviderFactory().create_provider(sys.argv[1], {})
+"""
+
+# The providers which can be created without any credentials
+PROVIDERS = ['aws']
+
+
+def build_suite():
+    suite = BenchmarkSuite()
+
+    @suite.benchmark('startup.import', memory=False)
+    def import_cloudbridge():
+        subprocess.check_call([sys.executable, '-c', 'import cloudbridge'])
+
+    for provider_id in PROVIDERS:
+        @suite.benchmark('startup.create_provider.{0}'.format(provider_id),
+                         memory=False)
+        def create_provider(provider_id=provider_id):
+            subprocess.check_call(
+                [sys.executable, '-c', CREATE_PROVIDER, provider_id])
+
+    return suite
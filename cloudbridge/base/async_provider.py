@@ -0,0 +1,220 @@
+"""
+An asyncio front-end for cloudbridge providers.
+
+Cloudbridge services are synchronous, so the wrappers in this module run
+each call on a bounded thread pool owned by the provider, and return an
+awaitable for its result. The wrapped services are the provider's own
+services, so all middleware, including event handlers, caching and
+metrics, runs exactly as it does for synchronous calls.
+
+This module requires Python 3, but is written without ``async`` syntax so
+that it can still be byte-compiled by Python 2.
+"""
+import asyncio
+import collections
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from cloudbridge.interfaces.resources import PageableObjectMixin
+from cloudbridge.interfaces.services import CloudService
+
+log = logging.getLogger(__name__)
+
+try:
+    StopAsyncIteration
+except NameError:  # Python 2
+    StopAsyncIteration = StopIteration
+
+
+def _completed(loop, result):
+    future = loop.create_future()
+    future.set_result(result)
+    return future
+
+
+class AsyncCloudProvider(object):
+    """
+    Wraps a :class:`.CloudProvider` so that its services can be used from
+    asyncio code. Services and sub-services are exposed through
+    :class:`AsyncServiceProxy` objects, whose methods return awaitables, and
+    pageable services can be iterated with ``async for``.
+
+    Example:
+
+    .. code-block:: python
+
+        provider = CloudProviderFactory().create_async_provider('aws', config)
+        async with provider:
+            instance = await provider.compute.instances.get(instance_id)
+            async for volume in provider.storage.volumes:
+                print(volume.name)
+            async for obj in provider.wrap(bucket.objects).iter(prefix='a/'):
+                print(obj.name)
+
+    Calls run on a thread pool of ``max_workers`` threads, created for this
+    provider and shut down by :meth:`close`. Property access on a proxy is
+    not deferred, so properties that make API calls, such as
+    ``regions.current``, should be read through :meth:`run`.
+    """
+
+    def __init__(self, provider, max_workers=None):
+        self._provider = provider
+        self._max_workers = (max_workers or
+                             provider.config.default_max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+
+    @property
+    def provider(self):
+        """
+        The wrapped synchronous provider.
+        """
+        return self._provider
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    def run(self, func, *args, **kwargs):
+        """
+        Runs ``func(*args, **kwargs)`` on the provider's thread pool.
+
+        :rtype: :class:`asyncio.Future`
+        :return: An awaitable for the return value of ``func``.
+        """
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    def wrap(self, obj):
+        """
+        Wraps a synchronous service or sub-service, such as the ``objects``
+        of a bucket returned by an earlier call.
+
+        :rtype: :class:`AsyncServiceProxy`
+        """
+        return AsyncServiceProxy(self, obj)
+
+    def close(self):
+        """
+        Shuts down the thread pool once pending calls have completed.
+        """
+        self._executor.shutdown(wait=False)
+
+    def __aenter__(self):
+        return _completed(asyncio.get_event_loop(), self)
+
+    def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return _completed(asyncio.get_event_loop(), False)
+
+    def __getattr__(self, name):
+        value = getattr(self._provider, name)
+        if isinstance(value, (CloudService, PageableObjectMixin)):
+            return AsyncServiceProxy(self, value)
+        if callable(value):
+            return functools.partial(self.run, value)
+        return value
+
+    def __repr__(self):
+        return "<Async {0}>".format(self._provider.name)
+
+
+class AsyncServiceProxy(object):
+    """
+    An asyncio view of a synchronous service. Methods of the service return
+    awaitables, nested services are wrapped in turn, and other attributes
+    are returned unchanged.
+
+    A service may supply a native asyncio implementation of a method by
+    defining it with an ``_async_`` prefix, for example ``_async_get``, which
+    must return an awaitable. It is used instead of running the synchronous
+    method on the thread pool.
+    """
+
+    def __init__(self, async_provider, service):
+        self._async_provider = async_provider
+        self._service = service
+
+    @property
+    def service(self):
+        """
+        The wrapped synchronous service.
+        """
+        return self._service
+
+    def __getattr__(self, name):
+        native = getattr(self._service, '_async_' + name, None)
+        if native is not None:
+            return native
+        value = getattr(self._service, name)
+        if isinstance(value, (CloudService, PageableObjectMixin)):
+            return AsyncServiceProxy(self._async_provider, value)
+        if callable(value):
+            return functools.partial(self._async_provider.run, value)
+        return value
+
+    def iter(self, limit=None, **kwargs):
+        """
+        Returns an asynchronous iterator over all objects in a pageable
+        service, fetching ``limit`` objects per page. Other arguments, such as
+        a ``prefix`` for bucket objects, are passed to each ``list()`` call.
+
+        :rtype: :class:`AsyncPageIterator`
+        """
+        if not isinstance(self._service, PageableObjectMixin):
+            raise TypeError("{0} is not iterable".format(self._service))
+        return AsyncPageIterator(self._async_provider, self._service, limit,
+                                 **kwargs)
+
+    def __aiter__(self):
+        return self.iter()
+
+    def __repr__(self):
+        return "<Async {0}>".format(self._service)
+
+
+class AsyncPageIterator(object):
+    """
+    Iterates asynchronously over a pageable service, fetching one page at a
+    time on the provider's thread pool. Objects from a fetched page are
+    returned without switching threads.
+
+    :type kwargs: ``dict``
+    :param kwargs: Extra arguments passed to each ``list()`` call.
+    """
+
+    def __init__(self, async_provider, service, limit=None, **kwargs):
+        self._async_provider = async_provider
+        self._service = service
+        self._limit = limit
+        self._kwargs = kwargs
+        self._buffer = collections.deque()
+        self._marker = None
+        self._exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        if self._buffer:
+            return _completed(asyncio.get_event_loop(),
+                              self._buffer.popleft())
+        return self._async_provider.run(self._fetch_next)
+
+    def _fetch_next(self):
+        # Runs on the thread pool. A page may be empty while more remain, so
+        # keep fetching until there is an object to return.
+        while not self._buffer:
+            if self._exhausted:
+                raise StopAsyncIteration
+            page = self._service.list(limit=self._limit, marker=self._marker,
+                                      **self._kwargs)
+            if page.supports_server_paging:
+                self._buffer.extend(page)
+                self._marker = page.marker
+                self._exhausted = not page.is_truncated
+            else:
+                self._buffer.extend(page.data)
+                self._exhausted = True
+        return self._buffer.popleft()
@@ -0,0 +1,100 @@
+"""
+Pooling of SDK clients between threads.
+"""
+import collections
+import logging
+import threading
+import weakref
+
+log = logging.getLogger(__name__)
+
+
+class ClientPool(object):
+    """
+    A pool of SDK clients, which gives each thread a client of its own.
+
+    Many SDK clients, such as boto3 resources and googleapiclient services,
+    must not be shared between threads. A pool creates a client the first
+    time a thread asks for one, by calling ``factory``, and returns the same
+    client to that thread afterwards. The factory is called outside of the
+    pool's lock, so it should guard any state it shares between clients,
+    such as a credential source.
+
+    The clients of threads which have finished are handed to new threads,
+    so short-lived worker threads do not each pay for a new client. At most
+    ``max_size`` clients are kept: beyond that, the clients of finished
+    threads are dropped first, followed by the least recently used ones.
+    A thread whose client was dropped simply gets another.
+
+    Example:
+
+    .. code-block:: python
+
+        pool = ClientPool(lambda: session.resource('ec2'), max_size=32)
+        pool.get().instances.all()
+    """
+
+    def __init__(self, factory, max_size=None):
+        self._factory = factory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # Maps a thread ident to a (weakref to thread, client) pair, with the
+        # most recently used last. Idents are reused once a thread finishes,
+        # so the weakref tells whether an entry belongs to the current thread.
+        self._clients = collections.OrderedDict()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+    @staticmethod
+    def _is_finished(thread_ref):
+        thread = thread_ref()
+        return thread is None or not thread.is_alive()
+
+    def get(self):
+        """
+        Returns the client of the current thread, creating one if needed.
+        """
+        thread = threading.current_thread()
+        ident = thread.ident
+        with self._lock:
+            entry = self._clients.pop(ident, None)
+            if entry is not None and entry[0]() is thread:
+                self._clients[ident] = entry
+                return entry[1]
+            # An entry under the same ident was left by a finished thread
+            client = entry[1] if entry is not None else self._reclaim()
+        if client is None:
+            log.debug("Creating a client for thread %s", thread.name)
+            client = self._factory()
+        with self._lock:
+            self._clients[ident] = (weakref.ref(thread), client)
+            self._trim()
+        return client
+
+    def _reclaim(self):
+        """
+        Removes and returns the client of a finished thread, if any.
+        """
+        for ident, (thread_ref, client) in self._clients.items():
+            if self._is_finished(thread_ref):
+                del self._clients[ident]
+                return client
+        return None
+
+    def _trim(self):
+        if self.max_size is None or len(self._clients) <= self.max_size:
+            return
+        for ident, (thread_ref, _) in list(self._clients.items()):
+            if self._is_finished(thread_ref):
+                del self._clients[ident]
+        while len(self._clients) > self.max_size:
+            self._clients.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops all pooled clients, so that threads get new ones.
+        """
+        with self._lock:
+            self._clients.clear()
@@ -0,0 +1,148 @@
+"""
+Fan-out of service calls to several regions of a provider.
+"""
+import collections
+import functools
+import logging
+
+from cloudbridge.base import helpers as cb_helpers
+
+log = logging.getLogger(__name__)
+
+
+class MultiRegionResultList(list):
+    """
+    The merged results of a call made in several regions. The list holds the
+    results of every region in turn, and ``regions`` holds the region each
+    result came from, at the same index.
+
+    Example:
+
+    .. code-block:: python
+
+        instances = provider.across_regions().compute.instances.list()
+        for region, instance in instances.with_regions():
+            print(region, instance.name)
+        print(instances.by_region['us-east-1'])
+    """
+
+    def __init__(self, region_results=None, errors=None):
+        super(MultiRegionResultList, self).__init__()
+        self.regions = []
+        self.errors = errors or {}
+        for region_name, results in region_results or []:
+            self.extend(results)
+            self.regions.extend([region_name] * len(results))
+
+    @property
+    def by_region(self):
+        """
+        The results grouped by region, in the order the regions were queried.
+
+        :rtype: ``OrderedDict``
+        """
+        grouped = collections.OrderedDict()
+        for region_name, result in self.with_regions():
+            grouped.setdefault(region_name, []).append(result)
+        return grouped
+
+    def with_regions(self):
+        """
+        Iterates over ``(region_name, result)`` pairs.
+        """
+        return zip(self.regions, self)
+
+
+class MultiRegionProvider(object):
+    """
+    Runs service calls in several regions concurrently, and merges their
+    results into a :class:`MultiRegionResultList`. Attributes are resolved
+    on the provider of each region, so any service method can be called.
+    Paged results, such as those of ``list()``, are fetched page by page in
+    each region until they are complete, as the merged list cannot be paged.
+
+    See :meth:`cloudbridge.interfaces.provider.CloudProvider.across_regions`.
+    """
+
+    def __init__(self, provider, regions=None, max_workers=None,
+                 ignore_errors=False):
+        self._provider = provider
+        self._regions = regions
+        self._max_workers = (max_workers or
+                             provider.config.default_max_workers)
+        self._ignore_errors = ignore_errors
+
+    @property
+    def region_names(self):
+        """
+        The names of the regions that calls are made in. Defaults to all
+        regions of the provider.
+        """
+        if self._regions is None:
+            self._regions = list(self._provider.compute.regions)
+        return [getattr(region, 'name', region) for region in self._regions]
+
+    def __getattr__(self, name):
+        return _MultiRegionCall(self, (name,))
+
+    @staticmethod
+    def _fetch_all(method, args, kwargs):
+        result = method(*args, **kwargs)
+        if not getattr(result, 'is_truncated', False):
+            return result
+        results = list(result)
+        while result.is_truncated and result.marker:
+            marker = result.marker
+            result = method(*args, **dict(kwargs, marker=marker))
+            results.extend(result)
+            if result.marker == marker:
+                log.warning("Stopped paging %s, which returned the marker"
+                            " %s again", method, marker)
+                break
+        return results
+
+    def _call(self, path, args, kwargs):
+        def call_in_region(region_name):
+            try:
+                # pylint:disable=protected-access
+                provider = self._provider._get_region_provider(region_name)
+                method = functools.reduce(getattr, path, provider)
+                return region_name, self._fetch_all(
+                    method, args, kwargs), None
+            except Exception as e:
+                if not self._ignore_errors:
+                    raise
+                log.warning("%s failed in region %s: %s",
+                            '.'.join(path), region_name, e)
+                return region_name, None, e
+
+        region_results = []
+        errors = collections.OrderedDict()
+        for region_name, result, error in cb_helpers.concurrent_map(
+                call_in_region, self.region_names, self._max_workers):
+            if error is not None:
+                errors[region_name] = error
+            elif isinstance(result, list):
+                region_results.append((region_name, result))
+            elif result is not None:
+                region_results.append((region_name, [result]))
+        return MultiRegionResultList(region_results, errors)
+
+
+class _MultiRegionCall(object):
+    """
+    An attribute path, such as ``compute.instances.list``, which is
+    resolved and called in every region when it is called.
+    """
+
+    def __init__(self, multi_region_provider, path):
+        self._multi_region_provider = multi_region_provider
+        self._path = path
+
+    def __getattr__(self, name):
+        return _MultiRegionCall(self._multi_region_provider,
+                                self._path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        # pylint:disable=protected-access
+        return self._multi_region_provider._call(self._path, args, kwargs)
@@ -1,9 +1,11 @@
-import fnmatch
 import functools
+import json
+import logging
 import os
 import re
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 from cryptography.hazmat.backends import default_backend
@@ -16,8 +18,12 @@ import six
 
 import cloudbridge
 
+from .predicates import compile_predicate
+from .predicates import iter_matches
 from ..interfaces.exceptions import InvalidParamException
 
+log = logging.getLogger(__name__)
+
 
 def generate_key_pair():
     """
@@ -48,26 +54,35 @@ def filter_by(prop_name, kwargs, objs):
     """
     prop_val = kwargs.pop(prop_name, None)
     if prop_val:
-        if isinstance(prop_val, six.string_types):
-            regex = fnmatch.translate(prop_val)
-            results = [o for o in objs
-                       if getattr(o, prop_name)
-                       and re.search(regex, getattr(o, prop_name))]
-        else:
-            results = [o for o in objs
-                       if getattr(o, prop_name) == prop_val]
-        return results
+        return list(iter_matches(
+            [(prop_name, compile_predicate(prop_val))], objs))
     else:
         return objs
 
 
+def get_glob_prefix(pattern):
+    """
+    Returns the literal prefix of a glob pattern, i.e. everything before the
+    first wildcard character. Every name matching the pattern starts with
+    this prefix, so it can be passed to a server-side prefix filter.
+    """
+    match = re.search(r'[*?[]', pattern)
+    return pattern[:match.start()] if match else pattern
+
+
 def generic_find(filter_names, kwargs, objs):
     """
     Utility method for filtering a list of objects by a list of filters.
+
+    Each non empty value in kwargs is compiled into a predicate, see
+    :func:`cloudbridge.base.predicates.compile_predicate`, and all of them
+    are matched in a single pass over objs.
     """
-    matches = objs
+    predicates = []
     for name in filter_names:
-        matches = filter_by(name, kwargs, matches)
+        value = kwargs.pop(name, None)
+        if value:
+            predicates.append((name, compile_predicate(value)))
 
     # All kwargs should have been popped at this time.
     if len(kwargs) > 0:
@@ -75,7 +90,35 @@ def generic_find(filter_names, kwargs, objs):
             "Unrecognised parameters for search: %s. Supported attributes: %s"
             % (kwargs, filter_names))
 
-    return matches
+    if not predicates:
+        return objs
+    return list(iter_matches(predicates, objs))
+
+
+def concurrent_map(func, items, max_workers):
+    """
+    Applies ``func`` to each item using a bounded pool of threads, and
+    returns the results in the same order as the supplied items. Any
+    exception raised by ``func`` is propagated to the caller.
+
+    :type func: ``callable``
+    :param func: A function accepting a single item
+
+    :type items: ``iterable``
+    :param items: The items to apply the function to
+
+    :type max_workers: ``int``
+    :param max_workers: The maximum number of threads to use concurrently
+
+    :rtype: ``list``
+    :return: The result of ``func`` for each item, in input order
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
 
 
 @contextmanager
@@ -138,6 +181,44 @@ def get_env(varname, default_value=None):
     return value
 
 
+def read_cached_json(cache_dir, name):
+    """
+    Returns the JSON document stored under ``name`` in ``cache_dir``, or
+    ``None`` if caching is disabled (``cache_dir`` is empty) or the document
+    is missing or unreadable.
+    """
+    if not cache_dir:
+        return None
+    path = os.path.join(cache_dir, name)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        log.debug("Could not read cached file %s", path, exc_info=True)
+        return None
+
+
+def write_cached_json(cache_dir, name, data):
+    """
+    Stores ``data`` as JSON under ``name`` in ``cache_dir``. The file is
+    written to a temporary location and then moved into place, so that
+    concurrent readers never see a partial document. Failures are logged
+    and otherwise ignored, since the cache is only an optimisation.
+    """
+    if not cache_dir:
+        return
+    path = os.path.join(cache_dir, name)
+    tmp_path = "{0}.{1}.tmp".format(path, os.getpid())
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+    except (IOError, OSError):
+        log.warning("Could not write cached file %s", path, exc_info=True)
+
+
 # Alias deprecation decorator, following:
 # https://stackoverflow.com/questions/49802412/
 # how-to-implement-deprecation-in-python-with-argument-alias
@@ -0,0 +1,174 @@
+"""
+Latency histograms and exporters used by the ``MetricsMiddleware``.
+"""
+import bisect
+import collections
+import logging
+import socket
+
+log = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets. The last bucket
+# is unbounded.
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                           2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))
+
+
+class LatencyHistogram(object):
+    """
+    Counts observed latencies in fixed buckets, along with their sum and
+    maximum. Not thread safe; callers are expected to hold a lock.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        assert list(self.buckets) == sorted(self.buckets)
+        assert self.buckets[-1] == float('inf')
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Estimates the ``q`` quantile (0 to 1) by interpolating linearly
+        within the bucket it falls in. Observations in the unbounded bucket
+        are assumed to be no larger than the maximum seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets, self.counts):
+            upper = min(upper, self.max)
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': collections.OrderedDict(
+                zip(self.buckets, self.counts))
+        }
+
+
+def _escape_label(value):
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def to_prometheus(snapshot, namespace='cloudbridge'):
+    """
+    Renders a ``MetricsMiddleware`` snapshot in the Prometheus text
+    exposition format, suitable for serving from a ``/metrics`` endpoint.
+
+    :type snapshot: ``dict``
+    :param snapshot: The value returned by ``MetricsMiddleware.snapshot()``.
+
+    :type namespace: ``str``
+    :param namespace: A prefix for all metric names.
+
+    :rtype: ``str``
+    :return: The metrics, one sample per line.
+    """
+    calls = '{0}_event_calls_total'.format(namespace)
+    errors = '{0}_event_errors_total'.format(namespace)
+    latency = '{0}_event_duration_seconds'.format(namespace)
+    lines = ['# HELP {0} Number of dispatched provider events.'.format(calls),
+             '# TYPE {0} counter'.format(calls)]
+    samples = []
+    for provider_id, events in sorted(snapshot['providers'].items()):
+        for event, stats in sorted(events.items()):
+            samples.append(('provider="{0}",event="{1}"'.format(
+                _escape_label(provider_id), _escape_label(event)), stats))
+
+    lines.extend('{0}{{{1}}} {2}'.format(calls, labels, stats['calls'])
+                 for labels, stats in samples)
+    lines.extend(['# HELP {0} Number of provider events that raised an'
+                  ' exception.'.format(errors),
+                  '# TYPE {0} counter'.format(errors)])
+    lines.extend('{0}{{{1}}} {2}'.format(errors, labels, stats['errors'])
+                 for labels, stats in samples)
+    lines.extend(['# HELP {0} Time taken to handle provider events.'
+                  .format(latency),
+                  '# TYPE {0} histogram'.format(latency)])
+    for labels, stats in samples:
+        cumulative = 0
+        for bound, count in stats['latency']['buckets'].items():
+            cumulative += count
+            lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.format(
+                latency, labels, _format_bound(bound), cumulative))
+        lines.append('{0}_sum{{{1}}} {2!r}'.format(
+            latency, labels, stats['latency']['sum']))
+        lines.append('{0}_count{{{1}}} {2}'.format(
+            latency, labels, stats['latency']['count']))
+    return '\n'.join(lines) + '\n'
+
+
+class StatsdExporter(object):
+    """
+    Pushes each recorded event to a StatsD daemon over UDP as a call counter,
+    a timer in milliseconds and, for failed events, an error counter. Metric
+    names take the form ``<prefix>.<provider>.<event>``, with the leading
+    ``provider.`` dropped from the event name, for example
+    ``cloudbridge.aws.compute.instances.list.calls``.
+
+    Example:
+
+    .. code-block:: python
+
+        metrics = MetricsMiddleware(
+            exporters=[StatsdExporter('localhost', 8125)])
+        provider.middleware.add(metrics)
+
+    Metrics are sent on a best effort basis; send failures are logged and
+    otherwise ignored.
+    """
+
+    def __init__(self, host='localhost', port=8125, prefix='cloudbridge'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def format(self, provider_id, event, elapsed, error):
+        if event.startswith('provider.'):
+            event = event[len('provider.'):]
+        name = '.'.join(part for part in (self.prefix, provider_id, event)
+                        if part)
+        lines = ['{0}.calls:1|c'.format(name),
+                 '{0}.latency:{1:.3f}|ms'.format(name, elapsed * 1000)]
+        if error:
+            lines.append('{0}.errors:1|c'.format(name))
+        return '\n'.join(lines)
+
+    def record(self, provider_id, event, elapsed, error):
+        try:
+            self._socket.sendto(
+                self.format(provider_id, event, elapsed, error)
+                .encode('utf-8'), self.address)
+        except (socket.error, OSError):
+            log.debug("Could not send metrics to StatsD at %s", self.address,
+                      exc_info=True)
+
+    def close(self):
+        self._socket.close()
@@ -1,5 +1,11 @@
+import collections
+import fnmatch
 import logging
 import sys
+import threading
+import time
+
+import cachetools
 
 from pyeventsystem.middleware import dispatch as pyevent_dispatch
 from pyeventsystem.middleware import intercept
@@ -7,7 +13,15 @@ from pyeventsystem.middleware import observe
 
 import six
 
+from .metrics import DEFAULT_LATENCY_BUCKETS
+from .metrics import LatencyHistogram
+from .metrics import to_prometheus
+from .ratelimit import TokenBucket
+from .ratelimit import get_throttle
+from .waiters import ExponentialBackoffWaitStrategy
 from ..interfaces.exceptions import CloudBridgeBaseException
+from ..interfaces.exceptions import RateLimitExceededException
+from ..interfaces.resources import CloudResource
 
 log = logging.getLogger(__name__)
 
@@ -55,3 +69,542 @@ class ExceptionWrappingMiddleware(object):
                     six.raise_from(cb_ex, e)
                 else:
                     six.reraise(CloudBridgeBaseException, cb_ex, traceback)
+
+
+class RateLimitingMiddleware(object):
+    """
+    Limits the rate of requests made through a provider, and retries
+    lookups which the cloud throttled.
+
+    Each API family of the provider (see
+    :meth:`BaseCloudProvider._get_api_family`), such as EC2 or S3, has a
+    token bucket which allows ``rate_limit`` requests per second, or the
+    rate configured for it in ``rate_limits``. When a request is throttled,
+    the family's bucket is paused for the delay the cloud asked for in its
+    ``Retry-After`` header, or else an exponentially increasing delay, so
+    that concurrent callers back off together.
+
+    Throttled ``get``, ``list`` and ``find`` events are then retried, up to
+    ``throttle_max_retries`` times. Other events are not retried, since
+    they may have changed resources before being throttled. A request
+    which is still throttled raises a
+    :class:`RateLimitExceededException`.
+
+    This middleware is added to every provider, and its counters are
+    available through ``provider.rate_limiter.stats``.
+    """
+    RATE_LIMIT_EVENT_PRIORITY = 1200
+    RETRYABLE_ACTIONS = ('get', 'list', 'find')
+    # The longest delay between retries, unless the cloud asks for more
+    MAX_RETRY_DELAY = 30
+
+    def __init__(self, provider):
+        self._provider = provider
+        self._backoff = ExponentialBackoffWaitStrategy(base=0.5, factor=2,
+                                                       jitter=0.5)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+
+    def _get_bucket(self, family):
+        with self._lock:
+            bucket = self._buckets.get(family)
+            if bucket is None:
+                config = self._provider.config
+                bucket = self._buckets[family] = TokenBucket(
+                    config.rate_limits.get(family, config.rate_limit),
+                    config.rate_limit_burst)
+            return bucket
+
+    def _count(self, family, **counts):
+        with self._lock:
+            stats = self._stats.get(family)
+            if stats is None:
+                stats = self._stats[family] = collections.Counter()
+            stats.update(counts)
+
+    @intercept(event_pattern="provider.*",
+               priority=RATE_LIMIT_EVENT_PRIORITY)
+    def limit_rate(self, event_args, *args, **kwargs):
+        next_handler = event_args.pop("next_handler")
+        if not next_handler:
+            return
+        event = event_args.get('event')
+        # pylint:disable=protected-access
+        family = self._provider._get_api_family(event)
+        bucket = self._get_bucket(family)
+        retryable = event.rsplit('.', 1)[-1] in self.RETRYABLE_ACTIONS
+        max_retries = self._provider.config.throttle_max_retries
+        delays = self._backoff.delays(self.MAX_RETRY_DELAY)
+        attempt = 0
+        while True:
+            waited = bucket.acquire()
+            self._count(family, requests=1, waits=int(waited > 0),
+                        wait_time=waited)
+            try:
+                return next_handler.invoke(dict(event_args), *args, **kwargs)
+            except Exception as e:
+                throttle = get_throttle(e)
+                if throttle is None:
+                    raise
+                delay = next(delays)
+                if throttle.retry_after is not None:
+                    delay = max(delay, throttle.retry_after)
+                bucket.pause(delay)
+                self._count(family, throttles=1)
+                if not retryable or attempt >= max_retries:
+                    cb_ex = RateLimitExceededException(
+                        "Request {0} was throttled with {1} after {2}"
+                        " attempt(s)".format(event, throttle.code,
+                                             attempt + 1),
+                        throttle.retry_after)
+                    six.raise_from(cb_ex, e)
+                attempt += 1
+                self._count(family, retries=1)
+                log.debug("Request %s was throttled with %s. Retrying in"
+                          " %.2f seconds.", event, throttle.code, delay)
+
+    @property
+    def stats(self):
+        """
+        Returns a snapshot of the counters of each API family.
+
+        :rtype: ``dict``
+        :return: A dict mapping each API family to its count of
+                 ``requests``, ``throttles``, ``retries`` and ``waits`` (the
+                 requests which were held back by the rate limit or a
+                 throttle), and the total ``wait_time`` in seconds.
+        """
+        with self._lock:
+            return dict((family, {'requests': stats['requests'],
+                                  'throttles': stats['throttles'],
+                                  'retries': stats['retries'],
+                                  'waits': stats['waits'],
+                                  'wait_time': stats['wait_time']})
+                        for family, stats in self._stats.items())
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+_CACHE_MISS = object()
+
+
+class ResourceCacheMiddleware(object):
+    """
+    A read-through cache for service lookups. The results of ``get``,
+    ``list`` and ``find`` events are cached per provider, and are
+    evicted when their time-to-live expires, when the cache exceeds its
+    maximum size (least recently used entries first), or when a ``create``
+    or ``delete`` event fires on the same service.
+
+    This middleware is opt-in and must be explicitly added to a provider::
+
+        cache = ResourceCacheMiddleware(ttl=30, maxsize=1024)
+        provider.middleware.add(cache)
+        ...
+        print(cache.stats)
+
+    Note that cached resources are shared between callers, and changes made
+    outside of the service's ``create`` and ``delete`` methods (for example,
+    through the cloud console or by another process) will only be visible
+    once the cached entry expires.
+    """
+    DEFAULT_TTL = 60
+    DEFAULT_MAXSIZE = 1024
+    CACHE_EVENT_PRIORITY = 1100
+    INVALIDATE_EVENT_PRIORITY = 2600
+
+    def __init__(self, ttl=DEFAULT_TTL, maxsize=DEFAULT_MAXSIZE):
+        self._cache = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+        self._hits = collections.Counter()
+        self._misses = collections.Counter()
+        self._invalidations = 0
+
+    @staticmethod
+    def _to_key_component(value):
+        if isinstance(value, CloudResource):
+            return (value.__class__.__name__, value.id)
+        elif isinstance(value, (list, tuple)):
+            return tuple(ResourceCacheMiddleware._to_key_component(v)
+                         for v in value)
+        elif isinstance(value, dict):
+            return tuple(sorted(
+                (k, ResourceCacheMiddleware._to_key_component(v))
+                for k, v in value.items()))
+        # Raises a TypeError for unhashable values, which are not cached
+        hash(value)
+        return value
+
+    def _make_key(self, event_args, args, kwargs):
+        # A cache may be shared by several providers, such as the providers
+        # of other regions, or of other accounts in the same region, so
+        # results are keyed by the provider which fetched them. Cached
+        # resources refer to their provider, so keeping it in the key does
+        # not extend its lifetime.
+        provider = getattr(event_args.get('sender'), 'provider', None)
+        return (provider,
+                event_args.get('event'),
+                self._to_key_component(args),
+                self._to_key_component(kwargs))
+
+    def _read_through(self, event_args, *args, **kwargs):
+        next_handler = event_args.pop("next_handler")
+        if not next_handler:
+            return
+        event = event_args.get('event')
+        try:
+            key = self._make_key(event_args, args, kwargs)
+        except TypeError:
+            log.debug("Event: %s has uncacheable arguments. Bypassing cache.",
+                      event)
+            return next_handler.invoke(event_args, *args, **kwargs)
+
+        with self._lock:
+            result = self._cache.get(key, _CACHE_MISS)
+            if result is not _CACHE_MISS:
+                self._hits[event] += 1
+                return result
+            self._misses[event] += 1
+        result = next_handler.invoke(event_args, *args, **kwargs)
+        with self._lock:
+            self._cache[key] = result
+        return result
+
+    @intercept(event_pattern="provider.*.get",
+               priority=CACHE_EVENT_PRIORITY)
+    def cache_get(self, event_args, *args, **kwargs):
+        return self._read_through(event_args, *args, **kwargs)
+
+    @intercept(event_pattern="provider.*.list",
+               priority=CACHE_EVENT_PRIORITY)
+    def cache_list(self, event_args, *args, **kwargs):
+        return self._read_through(event_args, *args, **kwargs)
+
+    @intercept(event_pattern="provider.*.find",
+               priority=CACHE_EVENT_PRIORITY)
+    def cache_find(self, event_args, *args, **kwargs):
+        return self._read_through(event_args, *args, **kwargs)
+
+    @observe(event_pattern="provider.*.create",
+             priority=INVALIDATE_EVENT_PRIORITY)
+    def invalidate_on_create(self, event_args, *args, **kwargs):
+        self.invalidate(event_args.get('event').rsplit('.', 1)[0])
+
+    @observe(event_pattern="provider.*.delete",
+             priority=INVALIDATE_EVENT_PRIORITY)
+    def invalidate_on_delete(self, event_args, *args, **kwargs):
+        self.invalidate(event_args.get('event').rsplit('.', 1)[0])
+
+    def invalidate(self, service_event_prefix=None):
+        """
+        Evict cached results. If a service event prefix such as
+        ``provider.networking.networks`` is given, only results for events
+        of that service are evicted. Otherwise, the entire cache is cleared.
+        """
+        with self._lock:
+            if service_event_prefix:
+                prefix = service_event_prefix + "."
+                stale = [key for key in list(self._cache.keys())
+                         if key[1].startswith(prefix)]
+                for key in stale:
+                    self._cache.pop(key, None)
+            else:
+                self._cache.clear()
+            self._invalidations += 1
+        log.debug("Invalidated cached results for: %s",
+                  service_event_prefix or "all events")
+
+    @property
+    def stats(self):
+        """
+        Returns a snapshot of cache statistics, including total and per-event
+        hit and miss counts.
+
+        :rtype: ``dict``
+        :return: A dict with the keys ``hits``, ``misses``,
+                 ``invalidations``, ``size``, ``maxsize``, ``ttl`` and
+                 ``events``.
+        """
+        with self._lock:
+            events = set(self._hits) | set(self._misses)
+            return {
+                'hits': sum(self._hits.values()),
+                'misses': sum(self._misses.values()),
+                'invalidations': self._invalidations,
+                'size': len(self._cache),
+                'maxsize': self._cache.maxsize,
+                'ttl': self._cache.ttl,
+                'events': {event: {'hits': self._hits[event],
+                                   'misses': self._misses[event]}
+                           for event in events}
+            }
+
+
+class _InFlightCall(object):
+    """
+    A call made by one thread, whose outcome is shared with the threads
+    which made the same call while it was in flight.
+    """
+
+    def __init__(self):
+        self.leader = threading.current_thread()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlightMiddleware(object):
+    """
+    Coalesces concurrent identical lookups. While a ``get``, ``list``,
+    ``find`` or ``get_or_create_default`` event is in flight, other threads
+    which dispatch the same event on the same service with equal arguments
+    wait for it, and receive its result or exception, instead of making
+    their own request.
+
+    Events matching any of the ``exclude`` glob patterns are never
+    coalesced.
+
+    This middleware is opt-in and must be explicitly added to a provider::
+
+        single_flight = SingleFlightMiddleware(
+            exclude=['provider.storage.*'])
+        provider.middleware.add(single_flight)
+        ...
+        print(single_flight.stats)
+
+    Note that the threads which share a call also share the objects it
+    returns: each of them receives the same resource objects, or the same
+    result list. Callers which modify resources, refresh them or change the
+    returned list in place should not rely on other threads seeing the
+    resources as they were returned, and should exclude those events.
+    """
+    SINGLE_FLIGHT_EVENT_PRIORITY = 1150
+    COALESCED_EVENTS = ('provider.*.get', 'provider.*.list',
+                        'provider.*.find', 'provider.*.get_or_create_default')
+
+    def __init__(self, exclude=None):
+        self.exclude = list(exclude or [])
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._coalesced_events = {}
+        self._calls = collections.Counter()
+        self._coalesced = collections.Counter()
+
+    def _is_coalesced(self, event):
+        coalesced = self._coalesced_events.get(event)
+        if coalesced is None:
+            coalesced = (
+                any(fnmatch.fnmatchcase(event, pattern)
+                    for pattern in self.COALESCED_EVENTS) and
+                not any(fnmatch.fnmatchcase(event, pattern)
+                        for pattern in self.exclude))
+            self._coalesced_events[event] = coalesced
+        return coalesced
+
+    @intercept(event_pattern="provider.*",
+               priority=SINGLE_FLIGHT_EVENT_PRIORITY)
+    def coalesce(self, event_args, *args, **kwargs):
+        next_handler = event_args.pop("next_handler")
+        if not next_handler:
+            return
+        event = event_args.get('event')
+        if not self._is_coalesced(event):
+            return next_handler.invoke(event_args, *args, **kwargs)
+        try:
+            key = (id(event_args.get('sender')), event,
+                   ResourceCacheMiddleware._to_key_component(args),
+                   ResourceCacheMiddleware._to_key_component(kwargs))
+        except TypeError:
+            log.debug("Event: %s has unhashable arguments. Not coalescing.",
+                      event)
+            return next_handler.invoke(event_args, *args, **kwargs)
+
+        current = threading.current_thread()
+        leading = False
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = self._in_flight[key] = _InFlightCall()
+                self._calls[event] += 1
+                leading = True
+            elif call.leader is not current:
+                self._coalesced[event] += 1
+        if not leading:
+            if call.leader is current:
+                # A call made while handling the same call
+                return next_handler.invoke(event_args, *args, **kwargs)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = next_handler.invoke(event_args, *args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    @property
+    def stats(self):
+        """
+        Returns the number of calls made and the number of calls which were
+        coalesced into them, in total and per event.
+
+        :rtype: ``dict``
+        :return: A dict with the keys ``calls``, ``coalesced``,
+                 ``in_flight`` and ``events``.
+        """
+        with self._lock:
+            events = set(self._calls) | set(self._coalesced)
+            return {
+                'calls': sum(self._calls.values()),
+                'coalesced': sum(self._coalesced.values()),
+                'in_flight': len(self._in_flight),
+                'events': {event: {'calls': self._calls[event],
+                                   'coalesced': self._coalesced[event]}
+                           for event in events}
+            }
+
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+class MetricsMiddleware(object):
+    """
+    Records call counts, error counts and latency histograms for every
+    dispatched ``provider.*`` event, per provider and event name.
+
+    The middleware intercepts events at a higher priority than all other
+    cloudbridge middleware, so the recorded latency is the time seen by the
+    caller, including time spent in exception wrapping and caching. Events
+    dispatched while handling another event (for example, a ``get`` made by
+    a ``create``) are recorded separately, and their time is included in the
+    outer event's latency.
+
+    This middleware is opt-in and must be explicitly added to a provider::
+
+        metrics = MetricsMiddleware()
+        provider.middleware.add(metrics)
+        ...
+        print(metrics.snapshot())
+        print(metrics.to_prometheus())
+
+    A single instance may be added to several providers. Additional
+    exporters, such as a :class:`cloudbridge.base.metrics.StatsdExporter`,
+    are notified of each event as it completes.
+    """
+    METRICS_EVENT_PRIORITY = 1000
+
+    def __init__(self, exporters=None, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.exporters = list(exporters or [])
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._events = {}
+
+    @staticmethod
+    def _get_provider_id(event_args):
+        provider = getattr(event_args.get('sender'), 'provider', None)
+        return getattr(provider, 'PROVIDER_ID', None)
+
+    @intercept(event_pattern="provider.*", priority=METRICS_EVENT_PRIORITY)
+    def measure(self, event_args, *args, **kwargs):
+        next_handler = event_args.pop("next_handler")
+        if not next_handler:
+            return
+        start = _timer()
+        error = None
+        try:
+            return next_handler.invoke(event_args, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.record(self._get_provider_id(event_args),
+                        event_args.get('event'), _timer() - start, error)
+
+    def record(self, provider_id, event, elapsed, error=None):
+        """
+        Records a single completed event. Called automatically for each
+        dispatched event.
+        """
+        with self._lock:
+            key = (provider_id, event)
+            stats = self._events.get(key)
+            if stats is None:
+                stats = self._events[key] = {
+                    'calls': 0,
+                    'errors': collections.Counter(),
+                    'latency': LatencyHistogram(self._buckets)
+                }
+            stats['calls'] += 1
+            stats['latency'].observe(elapsed)
+            if error is not None:
+                stats['errors'][type(error).__name__] += 1
+        for exporter in self.exporters:
+            try:
+                exporter.record(provider_id, event, elapsed,
+                                error is not None)
+            except Exception:  # pylint:disable=broad-except
+                log.warning("Metrics exporter %s failed", exporter,
+                            exc_info=True)
+
+    def snapshot(self):
+        """
+        Returns a point-in-time copy of the recorded metrics.
+
+        :rtype: ``dict``
+        :return: A dict with the total number of ``calls`` and ``errors``,
+                 and a ``providers`` dict mapping each provider id to a dict
+                 of event names. Each event has ``calls``, ``errors``,
+                 ``error_types`` (a count per exception class name) and
+                 ``latency``, which holds the ``count``, ``sum``, ``max``,
+                 ``mean``, estimated ``p50``, ``p95`` and ``p99`` latencies
+                 in seconds, and the ``buckets`` of the histogram.
+        """
+        with self._lock:
+            providers = {}
+            for (provider_id, event), stats in self._events.items():
+                providers.setdefault(provider_id, {})[event] = {
+                    'calls': stats['calls'],
+                    'errors': sum(stats['errors'].values()),
+                    'error_types': dict(stats['errors']),
+                    'latency': stats['latency'].to_dict()
+                }
+        return {
+            'calls': sum(event['calls'] for events in providers.values()
+                         for event in events.values()),
+            'errors': sum(event['errors'] for events in providers.values()
+                          for event in events.values()),
+            'providers': providers
+        }
+
+    def slowest(self, n=10):
+        """
+        Returns the ``n`` events with the highest total latency, as a list
+        of ``(provider_id, event, total_seconds, calls)`` tuples, to help
+        find the calls which dominate overall time.
+        """
+        with self._lock:
+            totals = [(provider_id, event, stats['latency'].sum,
+                       stats['calls'])
+                      for (provider_id, event), stats in self._events.items()]
+        return sorted(totals, key=lambda t: t[2], reverse=True)[:n]
+
+    def to_prometheus(self, namespace='cloudbridge'):
+        """
+        Returns the recorded metrics in the Prometheus text exposition
+        format.
+        """
+        return to_prometheus(self.snapshot(), namespace)
+
+    def reset(self):
+        with self._lock:
+            self._events.clear()
@@ -0,0 +1,210 @@
+"""
+Predicates for client-side filtering of ``find()`` results.
+
+A ``find()`` argument is compiled once into a predicate, which is then
+called with the attribute value of each object. A string is a glob pattern
+and any other value is compared for equality, as before. The operators in
+this module may also be passed as values, for example:
+
+.. code-block:: python
+
+    from cloudbridge.base.predicates import In, Prefix
+
+    provider.compute.instances.find(label=Prefix('web-'))
+    provider.storage.volumes.find(label=In(['db-1', 'db-2']))
+"""
+import fnmatch
+import re
+import threading
+
+import cachetools
+
+import six
+
+# The number of compiled glob patterns to remember
+GLOB_CACHE_SIZE = 512
+
+_compiled_globs = cachetools.LRUCache(maxsize=GLOB_CACHE_SIZE)
+_compiled_globs_lock = threading.Lock()
+
+
+def compile_glob(pattern):
+    """
+    Returns the compiled regular expression for a glob pattern, from a
+    cache of recently used patterns.
+    """
+    with _compiled_globs_lock:
+        regex = _compiled_globs.get(pattern)
+    if regex is None:
+        regex = re.compile(fnmatch.translate(pattern))
+        with _compiled_globs_lock:
+            _compiled_globs[pattern] = regex
+    return regex
+
+
+class Predicate(object):
+    """
+    A condition on the value of an attribute. Subclasses implement
+    ``__call__``, which returns ``True`` if the value matches.
+    """
+
+    def __call__(self, value):
+        raise NotImplementedError()
+
+    def __repr__(self):
+        return "{0}({1})".format(type(self).__name__, self._describe())
+
+    def _describe(self):
+        return ''
+
+
+class Glob(Predicate):
+    """
+    Matches strings against a glob pattern. Empty values never match.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        # Patterns are searched for, as they always have been, so a pattern
+        # with no leading wildcard also matches at the end of a value.
+        self._search = compile_glob(pattern).search
+
+    def __call__(self, value):
+        return bool(value) and self._search(value) is not None
+
+    def _describe(self):
+        return repr(self.pattern)
+
+
+class Equals(Predicate):
+    """
+    Matches values equal to ``expected``.
+    """
+
+    def __init__(self, expected):
+        self.expected = expected
+
+    def __call__(self, value):
+        return value == self.expected
+
+    def _describe(self):
+        return repr(self.expected)
+
+
+class In(Predicate):
+    """
+    Matches values equal to any of ``values``.
+    """
+
+    def __init__(self, values):
+        self.values = list(values)
+        try:
+            self._lookup = frozenset(self.values)
+        except TypeError:
+            # Unhashable values are compared one by one
+            self._lookup = self.values
+
+    def __call__(self, value):
+        try:
+            return value in self._lookup
+        except TypeError:
+            return value in self.values
+
+    def _describe(self):
+        return repr(self.values)
+
+
+class Prefix(Predicate):
+    """
+    Matches strings starting with ``prefix``.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def __call__(self, value):
+        return (isinstance(value, six.string_types) and
+                value.startswith(self.prefix))
+
+    def _describe(self):
+        return repr(self.prefix)
+
+
+class Range(Predicate):
+    """
+    Matches values between ``low`` and ``high``, either of which may be
+    ``None`` for an open-ended range. The bounds are inclusive unless
+    ``inclusive`` is ``False``. ``None`` values never match.
+    """
+
+    def __init__(self, low=None, high=None, inclusive=True):
+        self.low = low
+        self.high = high
+        self.inclusive = inclusive
+
+    def __call__(self, value):
+        if value is None:
+            return False
+        if self.inclusive:
+            return ((self.low is None or value >= self.low) and
+                    (self.high is None or value <= self.high))
+        return ((self.low is None or value > self.low) and
+                (self.high is None or value < self.high))
+
+    def _describe(self):
+        return "{0!r}, {1!r}, inclusive={2}".format(self.low, self.high,
+                                                    self.inclusive)
+
+
+class Regex(Predicate):
+    """
+    Matches strings containing a match for a regular expression, which may
+    be a pattern string or a compiled expression.
+    """
+
+    def __init__(self, pattern, flags=0):
+        self._regex = (re.compile(pattern, flags)
+                       if isinstance(pattern, six.string_types) else pattern)
+        self.pattern = self._regex.pattern
+
+    def __call__(self, value):
+        return (isinstance(value, six.string_types) and
+                self._regex.search(value) is not None)
+
+    def _describe(self):
+        return repr(self.pattern)
+
+
+def compile_predicate(value):
+    """
+    Returns the predicate for a ``find()`` argument: the value itself if it
+    is a :class:`Predicate`, a :class:`Glob` for a string, and an
+    :class:`Equals` for any other value.
+    """
+    if isinstance(value, Predicate):
+        return value
+    if isinstance(value, six.string_types):
+        return Glob(value)
+    return Equals(value)
+
+
+def iter_matches(predicates, objs):
+    """
+    Yields the objects which match all ``predicates`` in a single pass. Each
+    attribute is fetched once per object, and checks stop at the first
+    predicate that does not match.
+
+    :type predicates: ``list`` of ``tuple``
+    :param predicates: ``(attribute_name, predicate)`` pairs
+    """
+    predicates = tuple(predicates)
+    if not predicates:
+        for obj in objs:
+            yield obj
+        return
+    for obj in objs:
+        for name, predicate in predicates:
+            if not predicate(getattr(obj, name)):
+                break
+        else:
+            yield obj
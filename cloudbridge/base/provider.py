@@ -1,8 +1,10 @@
 """Base implementation of a provider interface."""
 import ast
+import collections
 import functools
 import logging
 import os
+import threading
 from os.path import expanduser
 try:
     from configparser import ConfigParser
@@ -13,16 +15,34 @@ from pyeventsystem.middleware import SimpleMiddlewareManager
 
 import six
 
+from ..base.fanout import MultiRegionProvider
 from ..base.middleware import ExceptionWrappingMiddleware
+from ..base.middleware import RateLimitingMiddleware
+from ..base.waiters import ExponentialBackoffWaitStrategy
+from ..base.waiters import FixedIntervalWaitStrategy
+from ..base.waiters import WaitMetrics
+from ..base.waiters import WaitStrategy
+from ..base.waiters import Waiter
 from ..interfaces import CloudProvider
 from ..interfaces.exceptions import ProviderConnectionException
+from ..interfaces.exceptions import WaitStateException
 from ..interfaces.resources import Configuration
+from ..interfaces.services import CloudService
 
 log = logging.getLogger(__name__)
 
 DEFAULT_RESULT_LIMIT = 50
 DEFAULT_WAIT_TIMEOUT = 600
 DEFAULT_WAIT_INTERVAL = 5
+DEFAULT_MAX_WORKERS = 10
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_CLIENT_POOL_SIZE = 32
+DEFAULT_RATE_LIMIT = 0
+DEFAULT_THROTTLE_MAX_RETRIES = 5
+DEFAULT_WAIT_STRATEGY = 'backoff'
+DEFAULT_WAIT_BACKOFF_BASE = 0.5
+DEFAULT_WAIT_BACKOFF_FACTOR = 2
+DEFAULT_WAIT_BACKOFF_JITTER = 0.5
 
 # By default, use two locations for CloudBridge configuration
 CloudBridgeConfigPath = '/etc/cloudbridge.ini'
@@ -30,6 +50,9 @@ CloudBridgeConfigLocations = [CloudBridgeConfigPath]
 UserConfigPath = os.path.join(expanduser('~'), '.cloudbridge')
 CloudBridgeConfigLocations.append(UserConfigPath)
 
+# Data fetched from providers, such as VM type catalogues, is cached here
+DEFAULT_CACHE_DIR = os.path.join(expanduser('~'), '.cache', 'cloudbridge')
+
 
 class BaseConfiguration(Configuration):
 
@@ -67,6 +90,114 @@ class BaseConfiguration(Configuration):
                   DEFAULT_WAIT_INTERVAL)
         return self.get('default_wait_interval', DEFAULT_WAIT_INTERVAL)
 
+    @property
+    def default_wait_strategy(self):
+        """
+        Gets the strategy used to space out polls while waiting on
+        LifeCycleObjects and provider operations.
+
+        The ``default_wait_strategy`` config value may be ``backoff``,
+        ``fixed`` or a ``WaitStrategy`` instance. The backoff strategy starts
+        polling after ``default_wait_backoff_base`` seconds and multiplies
+        the delay by ``default_wait_backoff_factor`` after each poll, up to
+        the wait interval, subtracting a random fraction of up to
+        ``default_wait_backoff_jitter`` from each delay.
+        """
+        strategy = self.get('default_wait_strategy', DEFAULT_WAIT_STRATEGY)
+        if isinstance(strategy, WaitStrategy):
+            return strategy
+        elif strategy == 'fixed':
+            return FixedIntervalWaitStrategy()
+        elif strategy == 'backoff':
+            return ExponentialBackoffWaitStrategy(
+                base=float(self.get('default_wait_backoff_base',
+                                    DEFAULT_WAIT_BACKOFF_BASE)),
+                factor=float(self.get('default_wait_backoff_factor',
+                                      DEFAULT_WAIT_BACKOFF_FACTOR)),
+                jitter=float(self.get('default_wait_backoff_jitter',
+                                      DEFAULT_WAIT_BACKOFF_JITTER)))
+        else:
+            raise ValueError(
+                "Unknown wait strategy: {0}. Valid values are 'backoff' and"
+                " 'fixed'.".format(strategy))
+
+    @property
+    def default_max_workers(self):
+        """
+        Gets the default maximum number of threads used by operations that
+        make concurrent requests to the provider.
+        """
+        log.debug("Default max workers for concurrent operations %s",
+                  DEFAULT_MAX_WORKERS)
+        return self.get('default_max_workers', DEFAULT_MAX_WORKERS)
+
+    @property
+    def default_chunk_size(self):
+        """
+        Gets the default number of bytes fetched per request when streaming
+        object contents.
+        """
+        log.debug("Default chunk size for streaming downloads %s",
+                  DEFAULT_CHUNK_SIZE)
+        return int(self.get('default_chunk_size', DEFAULT_CHUNK_SIZE))
+
+    @property
+    def client_pool_size(self):
+        """
+        Gets the maximum number of per-thread SDK clients kept for each
+        cloud service.
+        """
+        log.debug("Client pool size %s", DEFAULT_CLIENT_POOL_SIZE)
+        return int(self.get('client_pool_size', DEFAULT_CLIENT_POOL_SIZE))
+
+    @property
+    def rate_limit(self):
+        """
+        Gets the maximum number of requests per second made to each API of
+        the provider. Zero, the default, disables client-side rate limiting.
+        """
+        return float(self.get('rate_limit', DEFAULT_RATE_LIMIT) or 0)
+
+    @property
+    def rate_limit_burst(self):
+        """
+        Gets the number of requests which may be made at once before the
+        rate limit applies. Defaults to one second's worth of requests.
+        """
+        burst = self.get('rate_limit_burst')
+        return float(burst) if burst else None
+
+    @property
+    def rate_limits(self):
+        """
+        Gets the rate limits of individual APIs, which override
+        ``rate_limit``, as a dict mapping an API family to requests per
+        second.
+        """
+        return dict(self.get('rate_limits') or {})
+
+    @property
+    def throttle_max_retries(self):
+        """
+        Gets the number of times a throttled request is retried.
+        """
+        return int(self.get('throttle_max_retries',
+                            DEFAULT_THROTTLE_MAX_RETRIES))
+
+    @property
+    def cache_dir(self):
+        """
+        The directory in which provider data, such as VM type catalogues, is
+        cached between processes. Set the ``cb_cache_dir`` config value or
+        the ``CB_CACHE_DIR`` environment variable to change it, or to an
+        empty string to disable on-disk caching.
+
+        :rtype: ``str``
+        :return: The cache directory, or an empty string if disabled.
+        """
+        return self.get('cb_cache_dir',
+                        os.environ.get('CB_CACHE_DIR', DEFAULT_CACHE_DIR))
+
     @property
     def debug_mode(self):
         """
@@ -84,6 +215,13 @@ class BaseConfiguration(Configuration):
 
 
 class BaseCloudProvider(CloudProvider):
+    # The config key that sets the provider's region, if it has one
+    REGION_CONFIG_KEY = None
+    # The API which serves the events starting with each prefix, as
+    # (prefix, family) pairs checked in order. Requests to each API family
+    # are rate limited separately.
+    API_FAMILIES = ()
+
     def __init__(self, config):
         self._config = BaseConfiguration(config)
         self._config_parser = ConfigParser()
@@ -92,6 +230,9 @@ class BaseCloudProvider(CloudProvider):
         self.add_required_middleware()
         self._region_name = None
         self._zone_name = None
+        self._wait_metrics = WaitMetrics()
+        self._region_providers = {}
+        self._region_providers_lock = threading.Lock()
 
     @property
     def region_name(self):
@@ -125,12 +266,49 @@ class BaseCloudProvider(CloudProvider):
     def middleware(self):
         return self._middleware
 
+    @property
+    def wait_metrics(self):
+        return self._wait_metrics
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter
+
+    def _get_api_family(self, event):
+        """
+        Returns the name of the API family which serves an event, for rate
+        limiting. Events of services which are not listed in
+        ``API_FAMILIES`` belong to a family named after the service, such
+        as ``compute``.
+        """
+        for prefix, family in self.API_FAMILIES:
+            if event == prefix or event.startswith(prefix + '.'):
+                return family
+        parts = event.split('.')
+        return parts[1] if len(parts) > 2 else event
+
+    def _create_waiter(self, timeout=None, interval=None, description=None):
+        """
+        Returns a :class:`.Waiter` that spaces out polls according to the
+        configured wait strategy and records its outcome in
+        ``wait_metrics``. The timeout and interval default to the configured
+        ``default_wait_timeout`` and ``default_wait_interval``.
+        """
+        if timeout is None:
+            timeout = self.config.default_wait_timeout
+        if interval is None:
+            interval = self.config.default_wait_interval
+        return Waiter(self.config.default_wait_strategy, timeout, interval,
+                      metrics=self.wait_metrics, description=description)
+
     def add_required_middleware(self):
         """
         Adds common middleware that is essential for cloudbridge to function.
         Any other extra middleware can be added through the provider factory.
         """
         self.middleware.add(ExceptionWrappingMiddleware())
+        self._rate_limiter = RateLimitingMiddleware(self)
+        self.middleware.add(self._rate_limiter)
 
     def authenticate(self):
         """
@@ -147,6 +325,95 @@ class BaseCloudProvider(CloudProvider):
             raise ProviderConnectionException(
                 "Authentication with cloud provider failed: %s" % (e,))
 
+    def wait_for_all(self, resources, target_states, terminal_states=None,
+                     timeout=None, interval=None):
+        pending = list(resources)
+        waiter = self._create_waiter(
+            timeout, interval,
+            description="{0} objects".format(len(pending)))
+        with waiter:
+            while True:
+                pending = [obj for obj in pending
+                           if obj.state not in target_states]
+                if not pending:
+                    break
+                for obj in pending:
+                    if obj.state in (terminal_states or []):
+                        raise WaitStateException(
+                            "Object: {0} is in state: {1} which is a"
+                            " terminal state and cannot be waited on.".format(
+                                obj, obj.state))
+                log.debug(
+                    "%s objects have not reached target state(s): %s."
+                    " Waiting another %s seconds...", len(pending),
+                    target_states, int(waiter.remaining))
+                if not waiter.next_poll():
+                    raise WaitStateException(
+                        "Waited too long for objects: {0} to reach a desired"
+                        " state: {1}".format(pending, target_states))
+                self._refresh_all(pending)
+        log.debug("All objects successfully reached target state(s): %s",
+                  target_states)
+        return True
+
+    def _refresh_all(self, resources):
+        """
+        Refreshes a list of resources, grouping them by type so that each
+        group can be refreshed with a single batched query.
+        """
+        groups = collections.OrderedDict()
+        for obj in resources:
+            groups.setdefault(type(obj), []).append(obj)
+        for obj_type, objs in groups.items():
+            # pylint:disable=protected-access
+            obj_type._refresh_many(objs)
+
+    def across_regions(self, regions=None, max_workers=None,
+                       ignore_errors=False):
+        return MultiRegionProvider(self, regions, max_workers, ignore_errors)
+
+    def _get_region_provider(self, region_name):
+        """
+        Returns the provider used for calls in another region. Providers are
+        created on first use and then reused, so that each region keeps its
+        own pooled SDK clients.
+        """
+        if region_name == self.region_name:
+            return self
+        with self._region_providers_lock:
+            provider = self._region_providers.get(region_name)
+        if provider is None:
+            provider = self._create_region_provider(region_name)
+            # Share any middleware added by the user, such as caching or
+            # metrics, but not the handlers of this provider's services.
+            for middleware in self.middleware.middleware_list:
+                obj = getattr(middleware, 'obj_to_discover', middleware)
+                if not isinstance(obj, (CloudService,
+                                        ExceptionWrappingMiddleware,
+                                        RateLimitingMiddleware)):
+                    provider.middleware.add(obj)
+            with self._region_providers_lock:
+                provider = self._region_providers.setdefault(region_name,
+                                                             provider)
+        return provider
+
+    def _create_region_provider(self, region_name, provider_class=None):
+        """
+        Creates a provider with the same configuration as this one, but for
+        another region. Its zone is left unset, so that the default zone of
+        the region is used. Providers can override this method to share
+        their SDK sessions and credentials with the new provider.
+        """
+        config = dict(self.config)
+        if self.REGION_CONFIG_KEY:
+            # Services may connect to the region as they are initialized, so
+            # the region must be configured before the provider is created.
+            config[self.REGION_CONFIG_KEY] = region_name
+        provider = (provider_class or self.__class__)(config)
+        provider._region_name = region_name
+        provider._zone_name = None
+        return provider
+
     def _deepgetattr(self, obj, attr):
         """Recurses through an attribute chain to get the ultimate value."""
         return functools.reduce(getattr, attr.split('.'), obj)
@@ -0,0 +1,224 @@
+"""
+Planning of ``find()`` queries.
+
+A ``find()`` call is split into the filters which the cloud can apply on the
+server, in its native form (such as EC2 ``Filters``, a GCE ``filter``
+expression or Nova ``search_opts``), and the filters which remain to be
+applied client-side to the listed objects.
+"""
+import collections
+import re
+
+import six
+
+from cloudbridge.interfaces.exceptions import InvalidParamException
+
+from . import helpers as cb_helpers
+from .predicates import Equals
+from .predicates import Predicate
+from .predicates import Prefix
+
+
+class Pushdown(collections.namedtuple('Pushdown', ['key', 'value',
+                                                   'exact'])):
+    """
+    A native server-side filter for a single ``find()`` attribute.
+
+    ``key`` and ``value`` are the native filter name and value, and ``exact``
+    is ``True`` if the server filter selects exactly the objects which match
+    the attribute. Otherwise, the server filter only narrows down the
+    candidates, and the attribute is also filtered client-side.
+    """
+
+    def __new__(cls, key, value, exact=True):
+        return super(Pushdown, cls).__new__(cls, key, value, exact)
+
+
+class QueryPlan(object):
+    """
+    The result of planning a ``find()`` query.
+
+    :type native_filters: ``OrderedDict``
+    :param native_filters: The native server-side filters, keyed by filter
+                           name.
+
+    :type pushed_down: ``dict``
+    :param pushed_down: The ``find()`` attributes which were translated to a
+                        native filter.
+
+    :type residual: ``dict``
+    :param residual: The ``find()`` attributes which must be filtered
+                     client-side.
+    """
+
+    def __init__(self, native_filters=None, pushed_down=None, residual=None):
+        self.native_filters = native_filters or collections.OrderedDict()
+        self.pushed_down = pushed_down or {}
+        self.residual = residual or {}
+
+    def filter(self, objs):
+        """
+        Applies the residual filters to ``objs``, which are returned as is
+        if all filters were pushed down.
+        """
+        if not self.residual:
+            return objs
+        return cb_helpers.generic_find(list(self.residual),
+                                       dict(self.residual), objs)
+
+    def explain(self):
+        """
+        Describes how the query is run.
+
+        :rtype: ``dict``
+        :return: A dict with the ``native_filters`` sent to the server, the
+                 ``pushed_down`` attributes they were translated from and
+                 the ``client_side`` attributes which are filtered after
+                 listing. An attribute which the server can only narrow down
+                 appears in both.
+        """
+        return {
+            'native_filters': dict(self.native_filters),
+            'pushed_down': dict(self.pushed_down),
+            'client_side': dict(self.residual)
+        }
+
+    def __repr__(self):
+        return "<QueryPlan: native={0} client={1}>".format(
+            dict(self.native_filters), self.residual)
+
+
+class QueryPlanner(object):
+    """
+    Plans ``find()`` queries for a service.
+
+    :type attributes: ``list`` of ``str``
+    :param attributes: The attributes the service can be searched by.
+
+    :type pushdowns: ``dict``
+    :param pushdowns: Maps an attribute to a function, which translates a
+                      value for the attribute to a :class:`Pushdown`, or
+                      returns ``None`` if the value cannot be filtered on
+                      the server.
+
+    Example:
+
+    .. code-block:: python
+
+        planner = QueryPlanner(['label'], {'label': ec2_tag_filter('Name')})
+        plan = planner.plan(kwargs)
+        objs = plan.filter(svc.find(filters=plan.native_filters))
+    """
+
+    def __init__(self, attributes, pushdowns=None):
+        self.attributes = list(attributes)
+        self.pushdowns = pushdowns or {}
+
+    def plan(self, kwargs):
+        """
+        Plans a query for the ``find()`` arguments in ``kwargs``. As in
+        :func:`cloudbridge.base.helpers.generic_find`, attributes with empty
+        values are ignored.
+
+        :rtype: :class:`QueryPlan`
+        """
+        unknown = dict((k, v) for k, v in kwargs.items()
+                       if k not in self.attributes)
+        if unknown:
+            raise InvalidParamException(
+                "Unrecognised parameters for search: %s. Supported "
+                "attributes: %s" % (unknown, ", ".join(self.attributes)))
+
+        plan = QueryPlan()
+        for attr in self.attributes:
+            value = kwargs.get(attr)
+            if not value:
+                continue
+            translate = self.pushdowns.get(attr)
+            pushdown = translate(value) if translate else None
+            if pushdown is None:
+                plan.residual[attr] = value
+                continue
+            plan.native_filters[pushdown.key] = pushdown.value
+            plan.pushed_down[attr] = value
+            if not pushdown.exact:
+                plan.residual[attr] = value
+        return plan
+
+
+_GLOB_CHARS = re.compile(r'[*?[]')
+_REGEX_SPECIAL_CHARS = frozenset('.^$*+?()[]{}|\\/')
+
+
+def is_glob(value):
+    """
+    Returns ``True`` if ``value`` is a string with glob wildcards.
+    """
+    return (isinstance(value, six.string_types) and
+            bool(_GLOB_CHARS.search(value)))
+
+
+def glob_to_regex(pattern):
+    """
+    Translates a glob pattern with ``*`` and ``?`` wildcards to a regular
+    expression, using only syntax shared by the RE2, POSIX and Python
+    dialects. The expression is not anchored, so it must be matched against
+    the whole string. Returns ``None`` for patterns with character classes,
+    which are not translated.
+    """
+    if '[' in pattern:
+        return None
+    parts = []
+    for char in pattern:
+        if char == '*':
+            parts.append('.*')
+        elif char == '?':
+            parts.append('.')
+        elif char in _REGEX_SPECIAL_CHARS:
+            parts.append('\\' + char)
+        else:
+            parts.append(char)
+    return ''.join(parts)
+
+
+def prefix_pushdown(key):
+    """
+    Returns a translator to the prefix filter which most object stores
+    support. Only a :class:`~cloudbridge.base.predicates.Prefix` is pushed
+    down: glob patterns are searched for, so ``foo*`` also matches
+    ``barfoo1``, and no prefix selects all the names a pattern can match.
+    """
+    def translate(value):
+        if isinstance(value, Prefix) and value.prefix:
+            return Pushdown(key, value.prefix)
+        return None
+    return translate
+
+
+def equality_pushdown(key, exact=False):
+    """
+    Returns a translator for servers which can only filter by exact value.
+    Glob patterns and other predicates are left to the client. A pattern
+    without wildcards also matches longer values which end with it, so this
+    only suits services which have always filtered by exact value on the
+    server, and values are also filtered client-side unless ``exact`` is
+    ``True``.
+    """
+    def translate(value):
+        if is_glob(value) or isinstance(value, Predicate):
+            return None
+        return Pushdown(key, value, exact)
+    return translate
+
+
+def equals_pushdown(key):
+    """
+    Returns a translator for servers which can only filter by exact value,
+    for services which have always searched for glob patterns client-side.
+    Only an :class:`~cloudbridge.base.predicates.Equals` is pushed down.
+    """
+    def translate(value):
+        if isinstance(value, Equals):
+            return Pushdown(key, value.expected)
+        return None
+    return translate
@@ -0,0 +1,186 @@
+"""
+Client-side rate limiting, and detection of throttling errors raised by the
+cloud SDKs, used by the ``RateLimitingMiddleware``.
+"""
+import calendar
+import collections
+import email.utils
+import json
+import logging
+import threading
+import time
+
+import six
+
+log = logging.getLogger(__name__)
+
+_clock = getattr(time, 'monotonic', time.time)
+
+# Error codes and reasons which the clouds use to signal throttling, such as
+# EC2's RequestLimitExceeded, S3's SlowDown and GCE's rateLimitExceeded.
+THROTTLE_ERROR_CODES = frozenset([
+    'RequestLimitExceeded', 'Throttling', 'ThrottlingException',
+    'ThrottledException', 'RequestThrottled', 'RequestThrottledException',
+    'TooManyRequests', 'TooManyRequestsException', 'SlowDown',
+    'rateLimitExceeded', 'userRateLimitExceeded', 'OverLimit'
+])
+
+
+class TokenBucket(object):
+    """
+    A thread safe token bucket, which allows ``rate`` requests per second
+    on average, with bursts of up to ``burst`` requests. A bucket with no
+    rate does not limit requests, but may still be paused.
+
+    Callers which find the bucket empty reserve a token ahead of time and
+    sleep until it is due, so waiting callers are served in turn.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = float(rate) if rate else None
+        self.burst = float(burst or max(self.rate or 1, 1))
+        self._tokens = self.burst
+        self._updated = _clock()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token, and returns the number of seconds the caller must
+        wait before making its request.
+        """
+        with self._lock:
+            now = _clock()
+            wait = max(self._paused_until - now, 0)
+            if self.rate:
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def acquire(self):
+        """
+        Takes a token, sleeping until it is available, and returns the
+        number of seconds slept.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """
+        Holds back all requests for ``seconds``, for example after the
+        cloud asked for requests to be retried later.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, _clock() + seconds)
+
+
+Throttle = collections.namedtuple('Throttle', ['code', 'retry_after'])
+
+
+def parse_retry_after(value):
+    """
+    Returns the number of seconds to wait for a ``Retry-After`` header,
+    which holds either a number of seconds or an HTTP date, or ``None`` if
+    it cannot be parsed.
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except (TypeError, ValueError):
+        pass
+    parsed = email.utils.parsedate_tz(str(value))
+    if parsed is None:
+        return None
+    return max(email.utils.mktime_tz(parsed) - calendar.timegm(time.gmtime()),
+               0)
+
+
+def _int_or_none(value):
+    return value if isinstance(value, six.integer_types) else None
+
+
+def _get_header(headers, name):
+    if not headers:
+        return None
+    try:
+        return headers.get(name) or headers.get(name.lower())
+    except AttributeError:
+        return None
+
+
+def _google_error_reasons(content):
+    try:
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        error = json.loads(content).get('error', {})
+    except (ValueError, AttributeError, UnicodeDecodeError):
+        return []
+    return [e.get('reason') for e in error.get('errors', [])
+            if isinstance(e, dict)]
+
+
+def get_throttle(error):
+    """
+    Returns a :class:`Throttle` with the error code and requested retry
+    delay in seconds (or ``None``) if ``error`` was raised because the cloud
+    throttled the request, and ``None`` otherwise.
+
+    Errors are recognised by their shape rather than their type, so that
+    no cloud SDK has to be imported: botocore ``ClientError``,
+    googleapiclient ``HttpError``, Azure ``CloudError`` and OpenStack
+    client exceptions are supported.
+    """
+    codes = []
+    status = None
+    headers = None
+    retry_after = getattr(error, 'retry_after', None)
+
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        # botocore ClientError
+        codes.append(response.get('Error', {}).get('Code'))
+        metadata = response.get('ResponseMetadata', {})
+        status = metadata.get('HTTPStatusCode')
+        headers = metadata.get('HTTPHeaders')
+    elif response is not None:
+        # Azure errors, which wrap a requests response
+        status = _int_or_none(getattr(response, 'status_code', None))
+        headers = getattr(response, 'headers', None)
+
+    resp = getattr(error, 'resp', None)
+    if resp is not None:
+        # googleapiclient HttpError, whose httplib2 response holds headers
+        status = _int_or_none(getattr(resp, 'status', None))
+        headers = resp
+        codes.extend(_google_error_reasons(getattr(error, 'content', None)))
+
+    if status is None:
+        for attr in ('status_code', 'http_status', 'code'):
+            status = _int_or_none(getattr(error, attr, None))
+            if status is not None:
+                break
+    codes.append(getattr(error, 'error_code', None))
+    # novaclient raises OverLimit, which has neither an error code nor a
+    # 429 status
+    codes.append(type(error).__name__)
+    if retry_after is None:
+        retry_after = _get_header(headers, 'Retry-After')
+
+    code = next((c for c in codes if c in THROTTLE_ERROR_CODES), None)
+    if code is None and status == 429:
+        code = 'TooManyRequests'
+    elif code is None and status == 413 and retry_after is not None:
+        # OpenStack APIs report rate limits as 413 with a retry delay, as
+        # opposed to a request which is simply too large
+        code = 'OverLimit'
+    if code is None:
+        return None
+    return Throttle(code, parse_retry_after(retry_after))
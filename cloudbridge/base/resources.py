@@ -1,13 +1,13 @@
 """
 Base implementation for data objects exposed through a provider or service
 """
+import functools
 import inspect
 import itertools
 import logging
 import os
 import re
 import shutil
-import time
 import uuid
 
 import six
@@ -52,6 +52,8 @@ from cloudbridge.interfaces.resources import Volume
 from cloudbridge.interfaces.resources import VolumeState
 
 from . import helpers as cb_helpers
+from . import transfer as cb_transfer
+from .query import QueryPlan
 
 log = logging.getLogger(__name__)
 
@@ -136,43 +138,45 @@ class BaseObjectLifeCycleMixin(ObjectLifeCycleMixin):
     """
 
     def wait_for(self, target_states, terminal_states=None, timeout=None,
-
                  interval=None):
-        if timeout is None:
-            timeout = self._provider.config.default_wait_timeout
-        if interval is None:
-            interval = self._provider.config.default_wait_interval
-
-        assert timeout >= 0
-        assert interval >= 0
-        assert timeout >= interval
-
-        end_time = time.time() + timeout
-
-        while self.state not in target_states:
-            if self.state in (terminal_states or []):
-                raise WaitStateException(
-                    "Object: {0} is in state: {1} which is a terminal state"
-                    " and cannot be waited on.".format(self, self.state))
-            else:
-                log.debug(
-                    "Object %s is in state: %s. Waiting another %s"
-                    " seconds to reach target state(s): %s...",
-                    self,
-                    self.state,
-                    int(end_time - time.time()),
-                    target_states)
-                time.sleep(interval)
-                if time.time() > end_time:
+        # pylint:disable=protected-access
+        with self._provider._create_waiter(timeout, interval,
+                                           description=self) as waiter:
+            while self.state not in target_states:
+                if self.state in (terminal_states or []):
                     raise WaitStateException(
-                        "Waited too long for object: {0} to reach a desired"
-                        "state: {1}. It's still in state: {2}".format(
-                            self, target_states, self.state))
-            self.refresh()
+                        "Object: {0} is in state: {1} which is a terminal"
+                        " state and cannot be waited on.".format(
+                            self, self.state))
+                else:
+                    log.debug(
+                        "Object %s is in state: %s. Waiting another %s"
+                        " seconds to reach target state(s): %s...",
+                        self,
+                        self.state,
+                        int(waiter.remaining),
+                        target_states)
+                    if not waiter.next_poll():
+                        raise WaitStateException(
+                            "Waited too long for object: {0} to reach a"
+                            " desired state: {1}. It's still in state:"
+                            " {2}".format(self, target_states, self.state))
+                self.refresh()
         log.debug("Object: %s successfully reached target state: %s",
                   self, self.state)
         return True
 
+    @classmethod
+    def _refresh_many(cls, objects):
+        """
+        Refreshes the state of several objects of this type. This generic
+        implementation refreshes each object individually. Providers should
+        override this with a single batched query where possible, so that
+        ``provider.wait_for_all()`` makes one request per polling interval.
+        """
+        for obj in objects:
+            obj.refresh()
+
 
 class BaseResultList(ResultList):
 
@@ -258,11 +262,61 @@ class ClientPagedResultList(BaseResultList):
         return self._objects
 
 
+class LazyClientPagedResultList(BaseResultList):
+    """
+    A variant of :class:`ClientPagedResultList` for listings that are too
+    large to materialise in full, such as the contents of a bucket. Instead
+    of a list, it accepts a callable which returns an iterator over the
+    objects following a given marker, and only consumes that iterator as far
+    as the requested page plus one, which is needed to determine whether the
+    results are truncated. The total number of results is not known.
+
+    If the underlying iterator cannot start from a marker, pass
+    ``seekable=False`` and the callable will be invoked without a marker,
+    with the objects up to and including the marker skipped on the client
+    side.
+    """
+
+    def __init__(self, provider, objects, limit=None, marker=None,
+                 seekable=True):
+        self._objects = objects
+        limit = limit or provider.config.default_result_limit
+        if not marker:
+            results = objects(None)
+        elif seekable:
+            results = objects(marker)
+        else:
+            results = itertools.dropwhile(
+                lambda obj: not obj.id == marker, objects(None))
+            # skip one past the marker
+            next(results, None)
+        results = list(itertools.islice(results, limit + 1))
+        is_truncated = len(results) > limit
+        results = results[:limit]
+        super(LazyClientPagedResultList, self).__init__(
+            is_truncated,
+            results[-1].id if is_truncated else None,
+            False, data=results)
+
+    @property
+    def supports_server_paging(self):
+        return False
+
+    @property
+    def data(self):
+        """
+        Returns an iterator over all objects, fetched as they are consumed.
+        """
+        return iter(self._objects(None))
+
+
 class BasePageableObjectMixin(PageableObjectMixin):
     """
     A mixin to provide iteration capability for a class
     that support a list(limit, marker) method.
     """
+    # Plans find() queries, for services which filter on the server
+    _find_planner = None
 
     def __iter__(self):
         for result in self.iter():
@@ -281,6 +335,29 @@ class BasePageableObjectMixin(PageableObjectMixin):
             for result in result_list.data:
                 yield result
 
+    def get_many(self, ids):
+        """
+        Generic implementation which fetches each object concurrently through
+        ``get()``. Providers should override this with a batched query where
+        the cloud supports one.
+        """
+        return cb_helpers.concurrent_map(
+            self.get, ids, self._provider.config.default_max_workers)
+
+    def explain(self, **kwargs):
+        return self._plan_find(**kwargs).explain()
+
+    def _plan_find(self, **kwargs):
+        """
+        Plans a ``find()`` query with the service's ``_find_planner``. If it
+        has none, all attributes are filtered client-side. Services which
+        filter on the server set a :class:`cloudbridge.base.query.QueryPlanner`
+        and run the plan in ``find()``.
+        """
+        if self._find_planner:
+            return self._find_planner.plan(kwargs)
+        return QueryPlan(residual=dict(kwargs))
+
 
 class BaseVMType(BaseCloudResource, VMType):
 
@@ -298,10 +375,43 @@ class BaseVMType(BaseCloudResource, VMType):
         return self.size_root_disk + self.size_ephemeral_disks
 
 
+def prefetchable(func):
+    """
+    Decorates the getter of an instance relationship, so that a value
+    prefetched by ``instances.list(prefetch=[...])`` is returned without
+    making any further calls. The relationship is named after the getter.
+    """
+    @functools.wraps(func)
+    def wrapper(self):
+        # pylint:disable=protected-access
+        try:
+            return self._prefetched[func.__name__]
+        except KeyError:
+            return func(self)
+    return wrapper
+
+
 class BaseInstance(BaseCloudResource, BaseObjectLifeCycleMixin, Instance):
 
     def __init__(self, provider):
         super(BaseInstance, self).__init__(provider)
+        # Related resources resolved in bulk when the instance was listed,
+        # keyed by relationship name. Cleared on refresh.
+        self._prefetched = {}
+
+    @property
+    @prefetchable
+    def subnet(self):
+        subnet_id = self.subnet_id
+        return (self._provider.networking.subnets.get(subnet_id)
+                if subnet_id else None)
+
+    @property
+    @prefetchable
+    def floating_ips(self):
+        # pylint:disable=protected-access
+        return self._provider.compute.instances._resolve_floating_ips(
+            [self]).get(self.id, [])
 
     def __eq__(self, other):
         return (isinstance(other, Instance) and
@@ -710,9 +820,91 @@ class BaseBucketObject(BaseCloudResource, BucketObject):
                 "in: http://docs.aws.amazon.com/AmazonS3/latest/dev/UsingMeta"
                 "data.html#object-key-guidelines" % name)
 
+    # Smallest part size the provider accepts in a multipart upload
+    MIN_PART_SIZE = 1
+
     def save_content(self, target_stream):
         shutil.copyfileobj(self.iter_content(), target_stream)
 
+    def upload_stream(self, fileobj, part_size=None, concurrency=None):
+        part_size = max(part_size or cb_transfer.DEFAULT_PART_SIZE,
+                        self.MIN_PART_SIZE)
+        concurrency = (concurrency or
+                       self._provider.config.default_max_workers)
+        stats = cb_transfer.TransferStats()
+        parts = cb_transfer.iter_parts(fileobj, part_size)
+        first = next(parts, b'')
+        second = next(parts, None)
+        if second is None:
+            # Small enough for a single request
+            self.upload(first)
+            stats.record_part(len(first))
+            return stats.finish()
+
+        upload = self._begin_multipart_upload()
+        try:
+            results = cb_transfer.upload_parts(
+                functools.partial(self._upload_part, upload),
+                itertools.chain([first, second], parts), concurrency, stats)
+            self._complete_multipart_upload(upload, results)
+        except Exception:
+            log.debug("Multipart upload of %s failed. Aborting...", self,
+                      exc_info=True)
+            self._abort_multipart_upload(upload)
+            raise
+        return stats.finish()
+
+    def download_to(self, fileobj, part_size=None, concurrency=None):
+        part_size = part_size or cb_transfer.DEFAULT_PART_SIZE
+        concurrency = (concurrency or
+                       self._provider.config.default_max_workers)
+        stats = cb_transfer.TransferStats()
+        size = self.size
+        if size <= part_size:
+            self.save_content(fileobj)
+            stats.record_part(size)
+        else:
+            cb_transfer.download_ranges(self._read_range, size, fileobj,
+                                        part_size, concurrency, stats)
+        return stats.finish()
+
+    def _begin_multipart_upload(self):
+        """
+        Starts a multipart upload and returns any state needed by the other
+        multipart methods.
+        """
+        raise NotImplementedError(
+            "Multipart uploads are not supported by this provider")
+
+    def _upload_part(self, upload, part_number, data):
+        """
+        Uploads a single part and returns the information needed to
+        complete the upload. Called concurrently from several threads.
+        """
+        raise NotImplementedError(
+            "Multipart uploads are not supported by this provider")
+
+    def _complete_multipart_upload(self, upload, parts):
+        """
+        Assembles the uploaded parts, given in order, into this object.
+        """
+        raise NotImplementedError(
+            "Multipart uploads are not supported by this provider")
+
+    def _abort_multipart_upload(self, upload):
+        """
+        Discards any parts uploaded so far.
+        """
+        pass
+
+    def _read_range(self, start, end):
+        """
+        Returns the bytes between ``start`` and ``end`` inclusive. Called
+        concurrently from several threads.
+        """
+        raise NotImplementedError(
+            "Ranged downloads are not supported by this provider")
+
     def __eq__(self, other):
         return (isinstance(other, BucketObject) and
                 # pylint:disable=protected-access
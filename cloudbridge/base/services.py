@@ -1,8 +1,12 @@
 """
 Base implementation for services available through a provider
 """
+import collections
+import functools
 import logging
 
+import six
+
 from cloudbridge.interfaces.exceptions import InvalidParamException
 from cloudbridge.interfaces.resources import DnsRecordType
 from cloudbridge.interfaces.resources import Network
@@ -33,6 +37,7 @@ from cloudbridge.interfaces.services import VolumeService
 
 from . import helpers as cb_helpers
 from .middleware import dispatch
+from .query import QueryPlan
 from .resources import BaseNetwork
 from .resources import BasePageableObjectMixin
 from .resources import BaseRouter
@@ -180,11 +185,60 @@ class BaseBucketService(
 
 class BaseBucketObjectService(BucketObjectService, BaseCloudService):
 
+    # Maximum number of objects removed by a single _delete_batch() call
+    DELETE_BATCH_SIZE = 1
+    # Plans find() queries, for services which filter on the server
+    _find_planner = None
+
     def __init__(self, provider):
         super(BaseBucketObjectService, self).__init__(provider)
         self._service_event_pattern += ".storage._bucket_objects"
         self._bucket = None
 
+    def delete_many(self, bucket, names_or_prefix):
+        if isinstance(names_or_prefix, six.string_types):
+            names = [obj.name
+                     for obj in bucket.objects.iter(prefix=names_or_prefix)]
+        else:
+            # Drop duplicates, which bulk delete APIs may reject
+            names = list(collections.OrderedDict.fromkeys(names_or_prefix))
+        batches = [names[i:i + self.DELETE_BATCH_SIZE]
+                   for i in range(0, len(names), self.DELETE_BATCH_SIZE)]
+        failures = {}
+        for batch_failures in cb_helpers.concurrent_map(
+                functools.partial(self._delete_batch, bucket), batches,
+                self.provider.config.default_max_workers):
+            failures.update(batch_failures)
+        return failures
+
+    def explain(self, bucket, **kwargs):
+        return self._plan_find(bucket, **kwargs).explain()
+
+    def _plan_find(self, bucket, **kwargs):
+        # See BasePageableObjectMixin._plan_find
+        if self._find_planner:
+            return self._find_planner.plan(kwargs)
+        return QueryPlan(residual=dict(kwargs))
+
+    def _delete_batch(self, bucket, names):
+        """
+        Deletes a batch of up to ``DELETE_BATCH_SIZE`` objects, returning a
+        dict of the names that could not be deleted mapped to the reason.
+        This generic implementation deletes each object individually.
+        Providers should override it with a bulk delete request.
+        """
+        failures = {}
+        for name in names:
+            try:
+                obj = self.get(bucket, name)
+                if obj:
+                    obj.delete()
+                else:
+                    failures[name] = "Object not found"
+            except Exception as e:  # pylint:disable=broad-except
+                failures[name] = str(e)
+        return failures
+
 
 class BaseComputeService(ComputeService, BaseCloudService):
 
@@ -207,6 +261,131 @@ class BaseInstanceService(
         super(BaseInstanceService, self).__init__(provider)
         self._service_event_pattern += ".compute.instances"
 
+    @staticmethod
+    def _check_count(count):
+        if count is not None and (not isinstance(count, six.integer_types)
+                                  or count < 1):
+            raise InvalidParamException(
+                "The number of instances to create must be a positive "
+                "integer, got: %s" % (count,))
+
+    def _create_concurrently(self, count, *args, **kwargs):
+        """
+        Launches ``count`` instances through concurrent ``create()`` calls,
+        bounded by the provider's ``default_max_workers``, for clouds without
+        a multi-launch call. If any launch fails, the instances which were
+        launched are deleted, and the first error is raised.
+        """
+        self._check_count(count)
+
+        def launch(_):
+            try:
+                return self.create(*args, **kwargs), None
+            except Exception as e:
+                return None, e
+
+        results = cb_helpers.concurrent_map(
+            launch, range(count), self.provider.config.default_max_workers)
+        errors = [error for _, error in results if error is not None]
+        instances = [inst for inst, _ in results if inst is not None]
+        if errors:
+            log.warning("%s of %s instances failed to launch. Deleting the "
+                        "%s launched instances.", len(errors), count,
+                        len(instances))
+            for inst in instances:
+                try:
+                    inst.delete()
+                except Exception:
+                    log.exception("Could not delete instance %s", inst.id)
+            raise errors[0]
+        return instances
+
+    # The relationships which list(prefetch=...) can resolve in bulk
+    PREFETCH_RELATIONS = ('vm_firewalls', 'vm_type', 'subnet', 'floating_ips')
+
+    def _prefetch(self, instances, relations):
+        """
+        Resolves each of the ``relations`` of ``instances`` with a batched
+        lookup, and attaches the results to the instances, which are
+        returned. Each relationship is resolved by a ``_resolve_<relation>``
+        method, which returns a dict of values keyed by instance id, and
+        which providers override where a cheaper lookup is available.
+        """
+        if not relations:
+            return instances
+        unknown = [r for r in relations if r not in self.PREFETCH_RELATIONS]
+        if unknown:
+            raise InvalidParamException(
+                "Unrecognised relationships to prefetch: %s. Supported "
+                "relationships: %s" % (unknown,
+                                       ", ".join(self.PREFETCH_RELATIONS)))
+        if not instances:
+            return instances
+        for relation in relations:
+            values = getattr(self, '_resolve_' + relation)(instances)
+            for inst in instances:
+                # pylint:disable=protected-access
+                inst._prefetched[relation] = values[inst.id]
+        return instances
+
+    @staticmethod
+    def _unique(values):
+        return list(collections.OrderedDict.fromkeys(v for v in values if v))
+
+    def _resolve_vm_firewalls(self, instances):
+        fw_ids = self._unique(fw_id for inst in instances
+                              for fw_id in inst.vm_firewall_ids)
+        firewalls = dict(zip(
+            fw_ids, self.provider.security.vm_firewalls.get_many(fw_ids)))
+        return dict((inst.id, [firewalls[fw_id]
+                               for fw_id in inst.vm_firewall_ids
+                               if firewalls.get(fw_id)])
+                    for inst in instances)
+
+    def _resolve_vm_type(self, instances):
+        vm_types = {}
+        for vm_type in self.provider.compute.vm_types:
+            vm_types[vm_type.id] = vm_type
+            vm_types.setdefault(vm_type.name, vm_type)
+        # Types which are not listed, such as custom types, are fetched
+        # individually
+        return dict((inst.id, vm_types.get(inst.vm_type_id) or inst.vm_type)
+                    for inst in instances)
+
+    def _resolve_subnet(self, instances):
+        subnet_ids = self._unique(inst.subnet_id for inst in instances)
+        subnets = dict(zip(
+            subnet_ids, self.provider.networking.subnets.get_many(subnet_ids)))
+        return dict((inst.id, subnets.get(inst.subnet_id))
+                    for inst in instances)
+
+    def _resolve_floating_ips(self, instances):
+        attached = {}
+        for fip in self._list_floating_ips():
+            if fip.in_use and fip.private_ip:
+                attached.setdefault(fip.private_ip, []).append(fip)
+        return dict((inst.id, [fip for ip in inst.private_ips
+                               for fip in attached.get(ip, [])])
+                    for inst in instances)
+
+    def _list_floating_ips(self):
+        """
+        Lists the floating IPs of all gateways, for resolving the floating
+        IPs of instances. The generic implementation pages through the
+        floating IPs of the provider, for clouds where they do not belong to
+        a gateway.
+        """
+        # pylint:disable=protected-access
+        fip_svc = self.provider.networking._floating_ips
+        result_list = fip_svc.list(None)
+        if not result_list.supports_server_paging:
+            return list(result_list.data)
+        fips = list(result_list)
+        while result_list.is_truncated:
+            result_list = fip_svc.list(None, marker=result_list.marker)
+            fips.extend(result_list)
+        return fips
+
 
 class BaseVMTypeService(
         BasePageableObjectMixin, VMTypeService, BaseCloudService):
@@ -264,6 +443,8 @@ class BaseNetworkService(
         return [subnet for subnet in self.provider.subnets
                 if subnet.network_id == self.id]
 
+    @dispatch(event="provider.networking.networks.get_or_create_default",
+              priority=BaseCloudService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self):
         networks = self.provider.networking.networks.find(
             label=BaseNetwork.CB_DEFAULT_NETWORK_LABEL)
@@ -311,6 +492,15 @@ class BaseSubnetService(
         matches = cb_helpers.generic_find(filters, kwargs, obj_list)
         return ClientPagedResultList(self._provider, list(matches))
 
+    def explain(self, network=None, **kwargs):
+        return self._plan_find(network, **kwargs).explain()
+
+    def _plan_find(self, network=None, **kwargs):
+        # The network is a scope, not a filter attribute
+        return super(BaseSubnetService, self)._plan_find(**kwargs)
+
+    @dispatch(event="provider.networking.subnets.get_or_create_default",
+              priority=BaseCloudService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self):
         # Look for a CB-default subnet
         matches = self.find(label=BaseSubnet.CB_DEFAULT_SUBNET_LABEL)
@@ -331,6 +521,8 @@ class BaseRouterService(
         super(BaseRouterService, self).__init__(provider)
         self._service_event_pattern += ".networking.routers"
 
+    @dispatch(event="provider.networking.routers.get_or_create_default",
+              priority=BaseCloudService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self, network):
         net_id = network.id if isinstance(network, Network) else network
         routers = self.provider.networking.routers.find(
@@ -34,9 +34,17 @@ class BaseBucketObjectSubService(BasePageableObjectMixin,
         return self._provider.storage._bucket_objects.find(self.bucket,
                                                            **kwargs)
 
+    def explain(self, **kwargs):
+        return self._provider.storage._bucket_objects.explain(self.bucket,
+                                                              **kwargs)
+
     def create(self, name):
         return self._provider.storage._bucket_objects.create(self.bucket, name)
 
+    def delete_many(self, names_or_prefix):
+        return self._provider.storage._bucket_objects.delete_many(
+            self.bucket, names_or_prefix)
+
 
 class BaseGatewaySubService(GatewaySubService, BasePageableObjectMixin):
 
@@ -160,6 +168,10 @@ class BaseSubnetSubService(SubnetSubService, BasePageableObjectMixin):
         return self._provider.networking.subnets.find(network=self.network,
                                                       **kwargs)
 
+    def explain(self, **kwargs):
+        return self._provider.networking.subnets.explain(network=self.network,
+                                                         **kwargs)
+
     def create(self, label, cidr_block):
         return self._provider.networking.subnets.create(label,
                                                         self.network,
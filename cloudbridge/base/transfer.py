@@ -0,0 +1,183 @@
+"""
+Helpers for transferring bucket object contents in parts, in parallel.
+"""
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+MAX_PART_ATTEMPTS = 3
+PART_RETRY_DELAY = 0.5
+
+
+class TransferStats(object):
+    """
+    Reports on a completed transfer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start_time = time.time()
+        self.bytes = 0
+        self.parts = 0
+        self.retries = 0
+        self.elapsed = 0.0
+
+    def record_part(self, size):
+        with self._lock:
+            self.bytes += size
+            self.parts += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def finish(self):
+        self.elapsed = time.time() - self._start_time
+        log.debug("Transferred %s bytes in %s parts (%s retries) in %.2f"
+                  " seconds (%.0f bytes/s)", self.bytes, self.parts,
+                  self.retries, self.elapsed, self.throughput)
+        return self
+
+    @property
+    def throughput(self):
+        """
+        Average transfer rate in bytes per second.
+        """
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return ("<TransferStats: {0} bytes, {1} parts, {2} retries, {3:.2f}s,"
+                " {4:.0f} bytes/s>".format(self.bytes, self.parts,
+                                           self.retries, self.elapsed,
+                                           self.throughput))
+
+
+class ChunkedReader(object):
+    """
+    A read-only, file-like wrapper around an iterator of byte chunks, so
+    that content can be streamed to callers expecting either an iterable
+    or a file object, without holding more than one chunk in memory.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        # The current chunk, and how much of it has been read
+        self._chunk = b''
+        self._offset = 0
+
+    def __iter__(self):
+        if self._offset < len(self._chunk):
+            yield self._chunk[self._offset:]
+        self._chunk, self._offset = b'', 0
+        for chunk in self._chunks:
+            if chunk:
+                yield chunk
+
+    def read(self, length=-1):
+        if length is None or length < 0:
+            return b''.join(self)
+        parts = []
+        while length > 0:
+            if self._offset >= len(self._chunk):
+                self._chunk = next(self._chunks, None)
+                self._offset = 0
+                if self._chunk is None:
+                    self._chunk = b''
+                    break
+            data = self._chunk[self._offset:self._offset + length]
+            self._offset += len(data)
+            length -= len(data)
+            parts.append(data)
+        return b''.join(parts)
+
+    def close(self):
+        close = getattr(self._chunks, 'close', None)
+        if close:
+            close()
+
+
+def _with_retries(stats, func, *args):
+    """
+    Calls ``func``, retrying it up to ``MAX_PART_ATTEMPTS`` times in total.
+    """
+    for attempt in range(1, MAX_PART_ATTEMPTS + 1):
+        try:
+            return func(*args)
+        except Exception:  # pylint:disable=broad-except
+            if attempt == MAX_PART_ATTEMPTS:
+                raise
+            log.debug("Attempt %s to transfer part %s failed. Retrying...",
+                      attempt, args[0], exc_info=True)
+            stats.record_retry()
+            time.sleep(PART_RETRY_DELAY * attempt)
+
+
+def iter_parts(fileobj, part_size):
+    """
+    Reads ``fileobj`` lazily, in parts of ``part_size`` bytes.
+    """
+    while True:
+        data = fileobj.read(part_size)
+        if not data:
+            return
+        yield data
+
+
+def upload_parts(upload_part, parts, concurrency, stats):
+    """
+    Passes each part in the ``parts`` iterable to
+    ``upload_part(part_number, data)`` on a pool of ``concurrency`` threads.
+    Part numbers start at 1. Parts are consumed only as threads become free,
+    so at most ``concurrency`` parts are held in memory at a time, and
+    failed parts are retried.
+
+    :rtype: ``list``
+    :return: The values returned by ``upload_part``, in part order.
+    """
+    results = []
+    in_flight = collections.deque()
+
+    def upload(part_number, data):
+        result = _with_retries(stats, upload_part, part_number, data)
+        stats.record_part(len(data))
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for part_number, data in enumerate(parts, 1):
+            if len(in_flight) >= concurrency:
+                results.append(in_flight.popleft().result())
+            in_flight.append(executor.submit(upload, part_number, data))
+        while in_flight:
+            results.append(in_flight.popleft().result())
+    return results
+
+
+def download_ranges(read_range, size, fileobj, part_size, concurrency,
+                    stats):
+    """
+    Splits ``size`` bytes into ranges of ``part_size`` bytes, fetches each
+    with ``read_range(start, end)`` on a pool of ``concurrency`` threads and
+    writes them to ``fileobj`` in order. ``end`` is inclusive. At most
+    ``concurrency`` parts are held in memory at a time, and failed parts are
+    retried.
+    """
+    in_flight = collections.deque()
+
+    def download(start, end):
+        data = _with_retries(stats, read_range, start, end)
+        stats.record_part(len(data))
+        return data
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for start in range(0, size, part_size):
+            if len(in_flight) >= concurrency:
+                fileobj.write(in_flight.popleft().result())
+            end = min(start + part_size, size) - 1
+            in_flight.append(executor.submit(download, start, end))
+        while in_flight:
+            fileobj.write(in_flight.popleft().result())
@@ -0,0 +1,187 @@
+"""
+Wait strategies used when polling for state changes on cloud resources.
+"""
+import collections
+import logging
+import random
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class WaitStrategy(object):
+    """
+    Determines how long to sleep between successive polls while waiting on
+    a resource. Subclasses implement ``delays()``.
+    """
+
+    def delays(self, interval):
+        """
+        Returns an iterator over successive sleep durations, in seconds.
+
+        :type interval: ``float``
+        :param interval: The maximum number of seconds to sleep between polls.
+        """
+        raise NotImplementedError()
+
+
+class FixedIntervalWaitStrategy(WaitStrategy):
+    """
+    Sleeps for the same interval between each poll.
+    """
+
+    def delays(self, interval):
+        while True:
+            yield interval
+
+
+class ExponentialBackoffWaitStrategy(WaitStrategy):
+    """
+    Starts with a short delay and multiplies it by ``factor`` after every
+    poll, up to the supplied interval. A random fraction of up to
+    ``jitter`` of each delay is subtracted so that concurrent waiters do not
+    poll in lockstep.
+    """
+
+    def __init__(self, base=0.5, factor=2, jitter=0.5):
+        assert base >= 0
+        assert factor >= 1
+        assert 0 <= jitter <= 1
+        self.base = base
+        self.factor = factor
+        self.jitter = jitter
+
+    def delays(self, interval):
+        delay = min(self.base, interval)
+        while True:
+            yield delay * (1 - self.jitter * random.random())
+            delay = min(delay * self.factor, interval)
+
+
+WaitRecord = collections.namedtuple(
+    'WaitRecord', ['description', 'polls', 'elapsed', 'succeeded'])
+
+
+class WaitMetrics(object):
+    """
+    Keeps a record of the most recent waits performed by a provider, along
+    with running totals.
+    """
+
+    DEFAULT_HISTORY = 100
+
+    def __init__(self, history=DEFAULT_HISTORY):
+        self._lock = threading.Lock()
+        self._recent = collections.deque(maxlen=history)
+        self._waits = 0
+        self._polls = 0
+        self._failures = 0
+
+    def record(self, description, polls, elapsed, succeeded):
+        with self._lock:
+            self._recent.append(
+                WaitRecord(description, polls, elapsed, succeeded))
+            self._waits += 1
+            self._polls += polls
+            if not succeeded:
+                self._failures += 1
+
+    @property
+    def last(self):
+        """
+        The most recently completed wait, or ``None``.
+
+        :rtype: :class:`WaitRecord`
+        """
+        with self._lock:
+            return self._recent[-1] if self._recent else None
+
+    @property
+    def recent(self):
+        """
+        A list of the most recently completed waits, oldest first.
+        """
+        with self._lock:
+            return list(self._recent)
+
+    @property
+    def stats(self):
+        """
+        Totals across all waits recorded so far.
+        """
+        with self._lock:
+            return {
+                'waits': self._waits,
+                'polls': self._polls,
+                'failures': self._failures,
+                'average_polls': (float(self._polls) / self._waits
+                                  if self._waits else 0.0)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._waits = self._polls = self._failures = 0
+
+
+class Waiter(object):
+    """
+    Tracks a single wait. Use as a context manager, calling ``next_poll()``
+    before each poll; the outcome is recorded in ``metrics`` on exit.
+
+    Example:
+
+    .. code-block:: python
+
+        with Waiter(strategy, timeout, interval) as waiter:
+            while not done():
+                if not waiter.next_poll():
+                    raise WaitStateException("Timed out")
+    """
+
+    def __init__(self, strategy, timeout, interval, metrics=None,
+                 description=None):
+        assert timeout >= 0
+        assert interval >= 0
+        assert timeout >= interval
+        self._delays = strategy.delays(interval)
+        self._metrics = metrics
+        self.description = description
+        self.timeout = timeout
+        self.polls = 0
+        self.start_time = time.time()
+        self.end_time = self.start_time + timeout
+
+    @property
+    def remaining(self):
+        return max(self.end_time - time.time(), 0)
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def next_poll(self):
+        """
+        Sleeps until the next poll is due, without overshooting the
+        timeout.
+
+        :rtype: ``bool``
+        :return: ``False`` if the timeout has elapsed, in which case the
+                 caller should stop waiting, ``True`` otherwise.
+        """
+        time.sleep(min(next(self._delays), self.remaining))
+        if time.time() >= self.end_time:
+            return False
+        self.polls += 1
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        log.debug("Wait for %s finished after %s polls in %.2f seconds",
+                  self.description, self.polls, self.elapsed)
+        if self._metrics is not None:
+            self._metrics.record(self.description, self.polls, self.elapsed,
+                                 exc_type is None)
@@ -1,10 +1,7 @@
 import importlib
-import inspect
 import logging
-import pkgutil
 from collections import defaultdict
 
-from cloudbridge import providers
 from cloudbridge.interfaces import CloudProvider
 from cloudbridge.interfaces import TestMockHelperMixin
 
@@ -20,6 +17,51 @@ class ProviderList(object):
     MOCK = 'mock'
 
 
+# Import paths of the built-in providers, in ``module:class`` form. A
+# provider's module is only imported when that provider is requested, so that
+# creating one provider does not load the SDKs of all the others.
+PROVIDER_PATHS = {
+    ProviderList.AWS: 'cloudbridge.providers.aws.provider:AWSCloudProvider',
+    ProviderList.AZURE:
+        'cloudbridge.providers.azure.provider:AzureCloudProvider',
+    ProviderList.GCP: 'cloudbridge.providers.gcp.provider:GCPCloudProvider',
+    ProviderList.OPENSTACK:
+        'cloudbridge.providers.openstack.provider:OpenStackCloudProvider',
+    ProviderList.MOCK:
+        'cloudbridge.providers.mock.provider:MockAWSCloudProvider'
+}
+
+# Third-party providers can register themselves under this setuptools entry
+# point group, for example:
+#   entry_points={'cloudbridge.providers': [
+#       'myprovider = mypackage.provider:MyCloudProvider']}
+ENTRY_POINT_GROUP = 'cloudbridge.providers'
+
+
+def _iter_entry_points(group):
+    """
+    Returns ``(name, path)`` pairs for the entry points in a group, where
+    path is in ``module:class`` form.
+    """
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            metadata = None
+    if metadata is None:
+        import pkg_resources
+        return [(ep.name, '{0}:{1}'.format(ep.module_name, '.'.join(ep.attrs)))
+                for ep in pkg_resources.iter_entry_points(group)]
+    eps = metadata.entry_points()
+    if hasattr(eps, 'select'):
+        eps = eps.select(group=group)
+    else:
+        eps = eps.get(group, [])
+    return [(ep.name, ep.value) for ep in eps]
+
+
 class CloudProviderFactory(object):
 
     """
@@ -28,6 +70,8 @@ class CloudProviderFactory(object):
 
     def __init__(self):
         self.provider_list = defaultdict(dict)
+        self._provider_paths = None
+        self._discovered = False
         log.debug("Providers List: %s", self.provider_list)
 
     def register_provider_class(self, cls):
@@ -61,39 +105,66 @@ class CloudProviderFactory(object):
             log.debug("Class: %s does not implement the CloudProvider"
                       "  interface. Ignoring...", cls)
 
+    @property
+    def provider_paths(self):
+        """
+        The import paths of all known providers, keyed by provider id. These
+        are the built-in providers, plus any registered by other packages
+        through the ``cloudbridge.providers`` entry point group. Built-in
+        providers cannot be replaced through entry points, which lets them be
+        looked up without scanning the installed packages.
+
+        :rtype: ``dict``
+        :return: A dict of provider ids to ``module:class`` import paths.
+        """
+        if self._provider_paths is None:
+            paths = {}
+            try:
+                for name, path in _iter_entry_points(ENTRY_POINT_GROUP):
+                    log.debug("Found provider entry point %s: %s", name, path)
+                    paths[name] = path
+            except Exception as e:
+                log.warning("Could not load provider entry points: %s", e)
+            paths.update(PROVIDER_PATHS)
+            self._provider_paths = paths
+        return self._provider_paths
+
     def discover_providers(self):
         """
-        Discover all available providers within the
-        ``cloudbridge.providers`` package.
-        Note that this methods does not guard against a failed import.
+        Imports and registers all known providers. Providers which cannot be
+        imported, for example because their SDK is not installed, are
+        skipped.
         """
-        for _, modname, _ in pkgutil.iter_modules(providers.__path__):
-            log.debug("Importing provider: %s", modname)
+        for provider_id, path in self.provider_paths.items():
+            if self.provider_list.get(provider_id, {}).get('class'):
+                continue
             try:
-                self._import_provider(modname)
+                self._import_provider(path)
             except Exception as e:
-                log.warn("Could not import provider: %s", e)
+                log.warning("Could not import provider %s: %s",
+                            provider_id, e)
+        self._discovered = True
 
-    def _import_provider(self, module_name):
+    def _import_provider(self, path):
         """
-        Imports and registers providers from the given module name.
-        Raises an ImportError if the import does not succeed.
+        Imports and registers the provider class at the given ``module:class``
+        path. Raises an ImportError if the import does not succeed.
         """
-        log.debug("Importing providers from %s", module_name)
-        module = importlib.import_module(
-            "{0}.{1}".format(providers.__name__,
-                             module_name))
-        classes = inspect.getmembers(module, inspect.isclass)
-        for _, cls in classes:
-            log.debug("Registering the provider: %s", cls)
-            self.register_provider_class(cls)
+        log.debug("Importing provider from %s", path)
+        module_name, _, class_name = path.partition(':')
+        module = importlib.import_module(module_name)
+        cls = module
+        for attr in class_name.split('.'):
+            cls = getattr(cls, attr)
+        self.register_provider_class(cls)
+        return cls
 
     def list_providers(self):
         """
         Get a list of available providers.
 
-        It uses a simple automatic discovery system by iterating through all
-        submodules in cloudbridge.providers.
+        This imports every known provider, so prefer
+        :meth:`get_provider_class` when only one provider is needed.
 
         :rtype: dict
         :return: A dict of available providers and their implementations in the
@@ -103,7 +174,7 @@ class CloudProviderFactory(object):
                                          der}
                  }
         """
-        if not self.provider_list:
+        if not self._discovered:
             self.discover_providers()
         log.debug("List of available providers: %s", self.provider_list)
         return self.provider_list
@@ -138,6 +209,23 @@ class CloudProviderFactory(object):
         log.debug("Created '%s' provider", name)
         return provider_class(config)
 
+    def create_async_provider(self, name, config, max_workers=None):
+        """
+        Creates a provider as :meth:`create_provider` does, and wraps it for
+        use from asyncio code. Requires Python 3.
+
+        :type max_workers: ``int``
+        :param max_workers: The size of the provider's thread pool. Defaults
+                            to the ``default_max_workers`` config value.
+
+        :return: an asyncio wrapper of a concrete provider instance
+        :rtype: ``object`` of
+                :class:`cloudbridge.base.async_provider.AsyncCloudProvider`
+        """
+        from cloudbridge.base.async_provider import AsyncCloudProvider
+        return AsyncCloudProvider(self.create_provider(name, config),
+                                  max_workers=max_workers)
+
     def get_provider_class(self, name):
         """
         Return a class for the requested provider.
@@ -147,7 +235,18 @@ class CloudProviderFactory(object):
                  if the provider was not found.
         """
         log.debug("Returning a class for the %s provider", name)
-        impl = self.list_providers().get(name)
+        impl = self.provider_list.get(name)
+        if not impl and not self._discovered:
+            # Import only the requested provider. Entry points are only
+            # scanned for names which are not built-in.
+            path = (PROVIDER_PATHS.get(name) or
+                    self.provider_paths.get(name))
+            try:
+                if path:
+                    self._import_provider(path)
+            except Exception as e:
+                log.warning("Could not import provider %s: %s", name, e)
+            impl = self.provider_list.get(name)
         if impl:
             log.debug("Returning provider class for %s", name)
             return impl["class"]
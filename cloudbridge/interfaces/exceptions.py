@@ -102,3 +102,16 @@ class InvalidParamException(InvalidNameException):
 
     def __init__(self, msg):
         super(InvalidParamException, self).__init__(msg)
+
+
+class RateLimitExceededException(CloudBridgeBaseException):
+    """
+    Marker interface for requests which the cloud provider throttled, and
+    which could not be completed within the configured number of retries.
+    ``retry_after`` holds the number of seconds the provider asked callers
+    to wait, if it said.
+    """
+
+    def __init__(self, msg, retry_after=None):
+        super(RateLimitExceededException, self).__init__(msg)
+        self.retry_after = retry_after
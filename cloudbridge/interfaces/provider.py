@@ -71,6 +71,48 @@ class CloudProvider(object):
         """
         pass
 
+    @abstractproperty
+    def wait_metrics(self):
+        """
+        Returns a record of the waits performed through this provider, such
+        as calls to ``wait_for()``, ``wait_till_ready()`` and
+        ``wait_for_all()``. Each completed wait records how many times the
+        resource had to be polled, how long the wait took, and whether it
+        succeeded.
+
+        Example:
+
+        .. code-block:: python
+
+            vol.wait_till_ready()
+            print(provider.wait_metrics.last.polls)
+            print(provider.wait_metrics.stats['average_polls'])
+
+        :rtype: :class:`.WaitMetrics`
+        :return: An object holding the most recent waits and running totals.
+        """
+        pass
+
+    @abstractproperty
+    def rate_limiter(self):
+        """
+        Returns the middleware which limits the rate of requests made
+        through this provider, as configured by ``rate_limit`` and
+        ``rate_limits``, and retries lookups which the cloud throttled. Its
+        counters show how often requests were throttled or held back.
+
+        Example:
+
+        .. code-block:: python
+
+            provider.compute.instances.list()
+            print(provider.rate_limiter.stats['ec2']['throttles'])
+
+        :rtype: :class:`.RateLimitingMiddleware`
+        :return: The provider's rate limiting middleware.
+        """
+        pass
+
     @abstractmethod
     def authenticate(self):
         """
@@ -119,6 +161,96 @@ class CloudProvider(object):
         """
         pass
 
+    @abstractmethod
+    def wait_for_all(self, resources, target_states, terminal_states=None,
+                     timeout=None, interval=None):
+        """
+        Wait for several objects to reach one of the desired target states.
+
+        Unlike calling ``wait_for()`` on each object, objects of the same
+        type are refreshed together, with a single batched query per polling
+        interval where the provider supports it. The method returns as soon
+        as all objects have reached a target state, and raises a
+        ``WaitStateException`` as soon as any object reaches a terminal
+        state, or if the timeout expires.
+
+        Example:
+
+        .. code-block:: python
+
+            provider.wait_for_all(
+                instances, [InstanceState.RUNNING],
+                terminal_states=[InstanceState.DELETED, InstanceState.ERROR])
+
+        :type resources: ``list`` of :class:`.ObjectLifeCycleMixin`
+        :param resources: The objects to wait for.
+
+        :type target_states: ``list`` of states
+        :param target_states: The list of target states to wait for.
+
+        :type terminal_states: ``list`` of states
+        :param terminal_states: A list of terminal states after which an
+                                object will not transition into a target
+                                state.
+
+        :type timeout: ``int``
+        :param timeout: The maximum length of time (in seconds) to wait for
+                        all objects. Defaults to the ``default_wait_timeout``
+                        in the provider config.
+
+        :type interval: ``int``
+        :param interval: How frequently to poll the objects' state (in
+                         seconds). Defaults to the ``default_wait_interval``
+                         in the provider config.
+
+        :rtype: ``True``
+        :return: Returns ``True`` if all objects reached a target state.
+        """
+        pass
+
+    @abstractmethod
+    def across_regions(self, regions=None, max_workers=None,
+                       ignore_errors=False):
+        """
+        Returns a view of this provider through which service calls are made
+        in several regions concurrently. The results of each region are
+        merged into a single :class:`.MultiRegionResultList`, which records
+        the region each result came from.
+
+        Each region is queried through its own provider, created on first use
+        with this provider's configuration and reused afterwards, so that SDK
+        sessions and clients are pooled. Middleware added to this provider,
+        such as caching or metrics, also applies to calls in other regions.
+
+        Example:
+
+        .. code-block:: python
+
+            instances = provider.across_regions(
+                ['us-east-1', 'us-west-2']).compute.instances.list()
+            for region_name, instance in instances.with_regions():
+                print(region_name, instance.name)
+
+        :type regions: ``list`` of ``str`` or :class:`.Region`
+        :param regions: The regions to query. Defaults to all regions of the
+                        provider.
+
+        :type max_workers: ``int``
+        :param max_workers: The maximum number of regions to query at once.
+                            Defaults to the ``default_max_workers`` config
+                            value.
+
+        :type ignore_errors: ``bool``
+        :param ignore_errors: If ``False``, an error in any region is raised.
+                              If ``True``, errors are logged and recorded in
+                              the ``errors`` dict of the result instead.
+
+        :rtype: :class:`cloudbridge.base.fanout.MultiRegionProvider`
+        :return: An object exposing the provider's services, whose methods
+                 return a :class:`.MultiRegionResultList`.
+        """
+        pass
+
     @abstractproperty
     def region_name(self):
         """
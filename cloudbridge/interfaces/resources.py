@@ -182,12 +182,136 @@ class Configuration(dict):
 
         The default wait interval is applied in ``wait_for()`` and
         ``wait_till_ready()`` methods if no explicit interval is specified.
+        With the default backoff wait strategy, this is the longest delay
+        between two successive polls.
 
         :rtype: ``int``
         :return: How frequently to poll the object's state.
         """
         pass
 
+    @property
+    def default_wait_strategy(self):
+        """
+        Get the strategy used to space out polls while waiting for an object
+        to reach a desired state.
+
+        Set the ``default_wait_strategy`` config value to ``backoff``
+        (the default) to start with short delays that grow exponentially,
+        with random jitter, up to the wait interval. Set it to ``fixed`` to
+        always sleep for the full wait interval, or pass a ``WaitStrategy``
+        instance to supply a custom strategy.
+
+        :rtype: :class:`.WaitStrategy`
+        :return: The strategy used when waiting.
+        """
+        pass
+
+    @property
+    def default_max_workers(self):
+        """
+        Get the default maximum number of worker threads for operations that
+        issue concurrent requests, such as ``get_many()``.
+
+        :rtype: ``int``
+        :return: The maximum number of concurrent requests per operation.
+        """
+        pass
+
+    @property
+    def default_chunk_size(self):
+        """
+        Get the default number of bytes fetched per request when a bucket
+        object's contents are streamed through ``iter_content()`` or
+        ``save_content()``. Only one chunk is held in memory at a time.
+
+        :rtype: ``int``
+        :return: The chunk size in bytes.
+        """
+        pass
+
+    @property
+    def client_pool_size(self):
+        """
+        Get the maximum number of SDK clients kept for each cloud service.
+        Providers are thread safe, and each thread uses its own clients,
+        created from credentials shared by the provider. The clients of
+        threads which have finished are reused by new threads.
+
+        :rtype: ``int``
+        :return: The maximum number of pooled clients per service.
+        """
+        pass
+
+    @property
+    def rate_limit(self):
+        """
+        Get the maximum number of requests per second made to each API of
+        the provider, such as EC2 or S3. Requests beyond the limit wait for
+        their turn instead of being throttled by the cloud. The limit can be
+        set through the ``rate_limit`` value in the config dictionary, and
+        is disabled by default.
+
+        :rtype: ``float``
+        :return: The requests per second, or 0 for no limit.
+        """
+        pass
+
+    @property
+    def rate_limit_burst(self):
+        """
+        Get the number of requests to an API which may be made at once
+        before ``rate_limit`` applies.
+
+        :rtype: ``float``
+        :return: The burst size, or ``None`` for one second's worth of
+                 requests.
+        """
+        pass
+
+    @property
+    def rate_limits(self):
+        """
+        Get per-API rate limits, which override ``rate_limit``.
+
+        Example:
+
+        .. code-block:: python
+
+            config = {'rate_limit': 20, 'rate_limits': {'s3': 100}}
+
+        :rtype: ``dict``
+        :return: A dict mapping API family names to requests per second.
+        """
+        pass
+
+    @property
+    def throttle_max_retries(self):
+        """
+        Get the number of times a lookup which the cloud throttled is
+        retried, with exponential backoff which honours any ``Retry-After``
+        delay requested by the cloud.
+
+        :rtype: ``int``
+        :return: The maximum number of retries.
+        """
+        pass
+
+    @property
+    def cache_dir(self):
+        """
+        Get the directory in which provider data, such as VM type
+        catalogues, is cached between processes.
+
+        The directory can be set through the ``cb_cache_dir`` value in the
+        config dictionary or the ``CB_CACHE_DIR`` environment variable.
+        Setting it to an empty string disables on-disk caching.
+
+        :rtype: ``str``
+        :return: The cache directory, or an empty string if disabled.
+        """
+        pass
+
     @abstractproperty
     def debug_mode(self):
         """
@@ -396,6 +520,57 @@ class PageableObjectMixin(object):
         """
         pass
 
+    @abstractmethod
+    def get_many(self, ids):
+        """
+        Returns the objects corresponding to a list of ids.
+
+        Where the provider supports it, the objects are fetched with a single
+        server-side filtered query. Otherwise, individual lookups are made
+        concurrently.
+
+        Example:
+
+        .. code-block:: python
+
+            vols = provider.storage.volumes.get_many(['vol-1', 'vol-2'])
+            for vol_id, vol in zip(['vol-1', 'vol-2'], vols):
+                if not vol:
+                    print("Volume {0} was not found".format(vol_id))
+
+        :type ids: ``list`` of ``str``
+        :param ids: The ids of the objects to return.
+
+        :rtype: ``list``
+        :return: A list of objects in the same order as the supplied ids,
+                 with ``None`` for ids that could not be found.
+        """
+        pass
+
+    @abstractmethod
+    def explain(self, **kwargs):
+        """
+        Describes how a ``find()`` with the same arguments is run: which
+        attributes are translated to a native server-side filter, and which
+        are filtered client-side after listing.
+
+        Example:
+
+        .. code-block:: python
+
+            print(provider.compute.instances.explain(label='web-*'))
+            # {'native_filters': {'tag:Name': 'web-*'},
+            #  'pushed_down': {'label': 'web-*'}, 'client_side': {}}
+
+        :rtype: ``dict``
+        :return: A dict with the ``native_filters`` sent to the server, the
+                 ``pushed_down`` attributes they were translated from and the
+                 ``client_side`` attributes. An attribute which the server
+                 can only narrow down, for example by a name prefix, appears
+                 in both.
+        """
+        pass
+
 
 class ResultList(list):
     """
@@ -609,6 +784,26 @@ class Instance(ObjectLifeCycleMixin, LabeledCloudResource):
         """
         pass
 
+    @abstractproperty
+    def subnet(self):
+        """
+        Get the subnet where this instance is placed.
+
+        :rtype: :class:`.Subnet`
+        :return: The subnet to which this instance is connected, or ``None``.
+        """
+        pass
+
+    @abstractproperty
+    def floating_ips(self):
+        """
+        Get the floating IPs attached to this instance.
+
+        :rtype: ``list`` of :class:`.FloatingIP`
+        :return: A list of FloatingIP objects attached to this instance.
+        """
+        pass
+
 #     @abstractproperty
 #     def mac_address(self):
 #         """
@@ -2173,6 +2368,66 @@ class BucketObject(CloudResource):
         """
         pass
 
+    @abstractmethod
+    def upload_stream(self, fileobj, part_size=None, concurrency=None):
+        """
+        Set the contents of the object to the data read from ``fileobj``.
+
+        Large streams are split into parts which are uploaded in parallel,
+        using the provider's multipart mechanism (S3 multipart uploads, GCS
+        composite objects, Swift static large objects or Azure block
+        blobs). Only ``concurrency`` parts are held in memory at a time,
+        and failed parts are retried. Streams no larger than a single part
+        are uploaded in one request.
+
+        Example:
+
+        .. code-block:: python
+
+            with open('/tmp/large.tar.gz', 'rb') as f:
+                stats = obj.upload_stream(f, concurrency=4)
+            print(stats.throughput)
+
+        :type fileobj: ``file``
+        :param fileobj: A file-like object opened for reading in binary mode.
+
+        :type part_size: ``int``
+        :param part_size: The size of each part in bytes. Providers may
+                          raise this to their minimum part size.
+
+        :type concurrency: ``int``
+        :param concurrency: The number of parts to upload at once. Defaults
+                            to the ``default_max_workers`` config value.
+
+        :rtype: :class:`.TransferStats`
+        :return: The number of bytes and parts transferred, the number of
+                 retries, and the elapsed time and throughput.
+        """
+        pass
+
+    @abstractmethod
+    def download_to(self, fileobj, part_size=None, concurrency=None):
+        """
+        Write the contents of this object to ``fileobj``, fetching byte
+        ranges of ``part_size`` bytes in parallel. Ranges are written in
+        order, so ``fileobj`` need not be seekable.
+
+        :type fileobj: ``file``
+        :param fileobj: A file-like object opened for writing in binary mode.
+
+        :type part_size: ``int``
+        :param part_size: The size of each range in bytes.
+
+        :type concurrency: ``int``
+        :param concurrency: The number of ranges to fetch at once. Defaults
+                            to the ``default_max_workers`` config value.
+
+        :rtype: :class:`.TransferStats`
+        :return: The number of bytes and parts transferred, the number of
+                 retries, and the elapsed time and throughput.
+        """
+        pass
+
     @abstractmethod
     def delete(self):
         """
@@ -180,7 +180,7 @@ class InstanceService(PageableObjectMixin, CloudService):
         pass
 
     @abstractmethod
-    def list(self, limit=None, marker=None):
+    def list(self, limit=None, marker=None, prefetch=None):
         """
         List available instances.
 
@@ -196,6 +196,11 @@ class InstanceService(PageableObjectMixin, CloudService):
             for instance in instlist:
                 print("Instance Data: {0}", instance)
 
+            # Resolve the firewalls and VM types of the listed instances in
+            # bulk, instead of with several calls per instance
+            instlist = provider.compute.instances.list(
+                prefetch=['vm_firewalls', 'vm_type'])
+
         :type  limit: ``int``
         :param limit: The maximum number of objects to return. Note that the
                       maximum is not guaranteed to be honoured, and a lower
@@ -209,6 +214,13 @@ class InstanceService(PageableObjectMixin, CloudService):
                        in paging through very long lists of objects. It is
                        returned on each invocation of the list method.
 
+        :type  prefetch: ``list`` of ``str``
+        :param prefetch: Relationships of the instances to resolve with one
+                         batched lookup each, and attach to the returned
+                         instances. Supported relationships: vm_firewalls,
+                         vm_type, subnet, floating_ips. Prefetched values
+                         are discarded when an instance is refreshed.
+
         :rtype: ``ResultList`` of :class:`.Instance`
         :return: A ResultList object containing a list of Instances
         """
@@ -217,9 +229,19 @@ class InstanceService(PageableObjectMixin, CloudService):
     @abstractmethod
     def create(self, label, image, vm_type, subnet, key_pair=None,
                vm_firewalls=None, user_data=None, launch_config=None,
-               **kwargs):
+               count=None, **kwargs):
         """
-        Creates a new virtual machine instance.
+        Creates a new virtual machine instance, or a group of ``count``
+        instances with the same configuration.
+
+        Example:
+
+        .. code-block:: python
+
+            # Launch 20 workers, and wait for all of them to be running
+            workers = provider.compute.instances.create(
+                'worker', image, vm_type, subnet, count=20)
+            provider.wait_for_all(workers, [InstanceState.RUNNING])
 
         :type  label: ``str``
         :param label: The label of the virtual machine instance. The instance
@@ -270,8 +292,17 @@ class InstanceService(PageableObjectMixin, CloudService):
                construct a launch configuration object, call
                provider.compute.instances.create_launch_config()
 
-        :rtype: ``object`` of :class:`.Instance`
-        :return:  an instance of Instance class
+        :type  count: ``int``
+        :param count: The number of instances to launch. The instances are
+                      launched with a single call where the cloud supports
+                      it, and concurrently otherwise. If any instance fails
+                      to launch, the others are deleted and the error is
+                      raised.
+
+        :rtype: ``object`` of :class:`.Instance`, or a ``list`` of
+                :class:`.Instance` if ``count`` is given
+        :return:  an instance of Instance class, or a list of ``count``
+                  instances once they all exist
         """
         pass
 
@@ -1227,6 +1258,44 @@ class BucketObjectService(CloudService):
         """
         pass
 
+    @abstractmethod
+    def delete_many(self, bucket, names_or_prefix):
+        """
+        Delete several bucket objects within a bucket.
+
+        Example:
+
+        .. code-block:: python
+
+            bucket = provider.storage.buckets.get('my_bucket_id')
+            # pylint:disable=protected-access
+            failures = provider.storage._bucket_objects.delete_many(
+                bucket, ['my_name', 'my_other_name'])
+
+        :type bucket: :class:`.Bucket`
+        :param bucket: A bucket object.
+
+        :type names_or_prefix: ``list`` of ``str`` or ``str``
+        :param names_or_prefix: The names of the objects to delete, or a
+                                prefix, in which case every object whose
+                                name starts with it is deleted.
+
+        :rtype: ``dict``
+        :return: The names of any objects that could not be deleted, mapped
+                 to the reason.
+        """
+        pass
+
+    @abstractmethod
+    def explain(self, bucket, **kwargs):
+        """
+        Describes how a ``find()`` in a bucket with the same arguments is run.
+        See :meth:`.PageableObjectMixin.explain`.
+
+        :rtype: ``dict``
+        """
+        pass
+
 
 class SecurityService(CloudService):
 
@@ -71,6 +71,36 @@ class BucketObjectSubService(PageableObjectMixin):
         """
         pass
 
+    @abstractmethod
+    def delete_many(self, names_or_prefix):
+        """
+        Delete several objects in this bucket, using the provider's bulk
+        delete mechanism where available. Batches of objects are deleted
+        concurrently.
+
+        Example:
+
+        .. code-block:: python
+
+            # delete specific objects
+            failures = bucket.objects.delete_many(['a.txt', 'b.txt'])
+            # delete all objects under a prefix
+            failures = bucket.objects.delete_many('logs/2018/')
+            for name, reason in failures.items():
+                print(name, reason)
+
+        :type names_or_prefix: ``list`` of ``str`` or ``str``
+        :param names_or_prefix: The names of the objects to delete, or a
+                                prefix, in which case every object whose
+                                name starts with it is deleted.
+
+        :rtype: ``dict``
+        :return: The names of any objects that could not be deleted, mapped
+                 to the reason. An empty dict means every object was
+                 deleted.
+        """
+        pass
+
 
 class GatewaySubService(PageableObjectMixin):
     """
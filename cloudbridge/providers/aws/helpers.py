@@ -1,5 +1,11 @@
 """A set of AWS-specific helper methods used by the framework."""
+import hashlib
+import json
 import logging as log
+import os
+import threading
+import time
+from collections import OrderedDict
 
 from boto3.resources.params import create_request_parameters
 
@@ -7,10 +13,35 @@ from botocore import xform_name
 from botocore.exceptions import ClientError
 from botocore.utils import merge_dicts
 
+import requests
+
+import six
+
+from cloudbridge.base import helpers as cb_helpers
+from cloudbridge.base.query import Pushdown
 from cloudbridge.base.resources import ClientPagedResultList
 from cloudbridge.base.resources import ServerPagedResultList
 
 
+def ec2_filter_pushdown(filter_name):
+    """
+    Returns a ``find()`` translator to the EC2 describe filter named
+    ``filter_name``. EC2 filter values support the ``*`` and ``?`` wildcards,
+    so glob patterns with character classes are narrowed down to their
+    literal prefix, and matched client-side.
+    """
+    def translate(value):
+        if not isinstance(value, six.string_types):
+            return None
+        if '[' not in value:
+            return Pushdown(filter_name, value)
+        prefix = cb_helpers.get_glob_prefix(value)
+        if not prefix:
+            return None
+        return Pushdown(filter_name, prefix + '*', exact=False)
+    return translate
+
+
 def trim_empty_params(params_dict):
     """
     Given a dict containing potentially null values, trims out
@@ -64,9 +95,10 @@ class BotoGenericService(object):
         :type cb_resource: :class:`CloudResource`
         :param cb_resource: CloudBridge Resource class to wrap results in
 
-        :type boto_conn: :class:`Boto3.Resource`
+        :type boto_conn: :class:`Boto3.Resource` or ``callable``
         :param boto_conn: Boto top level service resource (e.g. EC2, S3)
-                          connection.
+                          connection, or a function returning the connection
+                          of the current thread.
 
         :type boto_collection_name: ``str``
         :param boto_collection_name: Boto collection name that corresponds
@@ -74,27 +106,40 @@ class BotoGenericService(object):
         """
         self.provider = provider
         self.cb_resource = cb_resource
-        self.boto_conn = boto_conn
+        self._get_boto_conn = (boto_conn if callable(boto_conn)
+                               else lambda: boto_conn)
+        conn = self.boto_conn
         self.boto_collection_model = self._infer_collection_model(
-            boto_conn, boto_collection_name)
+            conn, boto_collection_name)
+        self._boto_resource_name = self._infer_boto_resource_name(
+            conn, self.boto_collection_model)
+
+    @property
+    def boto_conn(self):
+        return self._get_boto_conn()
+
+    @property
+    def boto_collection(self):
         # Perform an empty filter to convert to a ResourceCollection
-        self.boto_collection = (getattr(self.boto_conn, boto_collection_name)
-                                .filter())
-        self.boto_resource = self._infer_boto_resource(
-            boto_conn, self.boto_collection_model)
+        return getattr(self.boto_conn,
+                       self.boto_collection_model.name).filter()
+
+    @property
+    def boto_resource(self):
+        return getattr(self.boto_conn, self._boto_resource_name)
 
     def _infer_collection_model(self, conn, collection_name):
         log.debug("Retrieving boto model for collection: %s", collection_name)
         return next(col for col in conn.meta.resource_model.collections
                     if col.name == collection_name)
 
-    def _infer_boto_resource(self, conn, collection_model):
+    def _infer_boto_resource_name(self, conn, collection_model):
         log.debug("Retrieving resource model for collection: %s",
                   collection_model.name)
         resource_model = next(
             sr for sr in conn.meta.resource_model.subresources
             if sr.resource.model.name == collection_model.resource.model.name)
-        return getattr(self.boto_conn, resource_model.name)
+        return resource_model.name
 
     def get_raw(self, resource_id):
         """
@@ -136,6 +181,19 @@ class BotoGenericService(object):
         else:
             return None
 
+    def get_many(self, resource_ids):
+        """
+        Returns a list of resources, fetching each one concurrently.
+
+        :type resource_ids: ``list`` of ``str``
+        :param resource_ids: IDs of the boto resources to fetch
+
+        :returns A list of CloudBridge wrapped resources in the same order as
+                 resource_ids, with ``None`` for resources that were not found
+        """
+        return cb_helpers.concurrent_map(
+            self.get, resource_ids, self.provider.config.default_max_workers)
+
     def _get_list_operation(self):
         """
         This function discovers the list operation for a particular resource
@@ -250,13 +308,34 @@ class BotoGenericService(object):
         :param filters: A list of filters, where the dict key is the filter
             name and the value is the value to filter by.
         """
+        return self.list(limit=limit, marker=marker,
+                         collection=self._filter(filters, **kwargs))
+
+    def query(self, plan, filters=None, **kwargs):
+        """
+        Runs a planned ``find()`` query. The native filters of the plan are
+        sent to the server along with any extra ``filters``. If attributes
+        remain to be filtered client-side, all matching resources are listed
+        and filtered, instead of returning the first page.
+
+        :type plan: :class:`cloudbridge.base.query.QueryPlan`
+        :param plan: The plan returned by a ``QueryPlanner``.
+        """
+        filters = dict(filters or {}, **plan.native_filters)
+        if not plan.residual:
+            return self.find(filters, **kwargs)
+        objs = (self.cb_resource(self.provider, obj)
+                for obj in self._filter(filters, **kwargs))
+        return ClientPagedResultList(self.provider, list(plan.filter(objs)))
+
+    def _filter(self, filters, **kwargs):
         boto_filters = [{'Name': key, 'Values': [value]}
                         for key, value in filters.items()]
         collection = self.boto_collection
         collection = collection.filter(Filters=boto_filters)
         if kwargs:
             collection = collection.filter(**kwargs)
-        return self.list(limit=limit, marker=marker, collection=collection)
+        return collection
 
     def create(self, boto_method, **kwargs):
         """
@@ -295,6 +374,24 @@ class BotoEC2Service(BotoGenericService):
     """
     Boto EC2 service implementation
     """
+    # The describe filter which matches a resource by its id, keyed by boto
+    # collection name
+    ID_FILTER_NAMES = {
+        'images': 'image-id',
+        'instances': 'instance-id',
+        'internet_gateways': 'internet-gateway-id',
+        'key_pairs': 'key-name',
+        'route_tables': 'route-table-id',
+        'security_groups': 'group-id',
+        'snapshots': 'snapshot-id',
+        'subnets': 'subnet-id',
+        'volumes': 'volume-id',
+        'vpc_addresses': 'allocation-id',
+        'vpcs': 'vpc-id'
+    }
+    # Maximum number of values EC2 accepts in a single describe filter
+    MAX_FILTER_VALUES = 200
+
     def __init__(self, provider, cb_resource,
                  boto_collection_name):
         """
@@ -309,9 +406,38 @@ class BotoEC2Service(BotoGenericService):
                                     to the CloudBridge resource (e.g. key_pair)
         """
         super(BotoEC2Service, self).__init__(
-            provider, cb_resource, provider.ec2_conn,
+            provider, cb_resource, lambda: provider.ec2_conn,
             boto_collection_name)
 
+    def get_many(self, resource_ids):
+        """
+        Returns a list of resources using as few describe calls as possible,
+        by filtering on resource id on the server side.
+
+        :type resource_ids: ``list`` of ``str``
+        :param resource_ids: IDs of the boto resources to fetch
+
+        :returns A list of CloudBridge wrapped resources in the same order as
+                 resource_ids, with ``None`` for resources that were not found
+        """
+        filter_name = self.ID_FILTER_NAMES.get(
+            self.boto_collection_model.name)
+        if not filter_name:
+            return super(BotoEC2Service, self).get_many(resource_ids)
+        unique_ids = list(OrderedDict.fromkeys(resource_ids))
+        found = {}
+        for i in range(0, len(unique_ids), self.MAX_FILTER_VALUES):
+            chunk = unique_ids[i:i + self.MAX_FILTER_VALUES]
+            log.debug("Retrieving %s resources: %s",
+                      self.boto_collection_model.name, chunk)
+            collection = self.boto_collection.filter(
+                Filters=[{'Name': filter_name, 'Values': chunk}])
+            for obj in collection:
+                found[getattr(obj, obj.meta.identifiers[0])] = obj
+        return [self.cb_resource(self.provider, found[resource_id])
+                if resource_id in found else None
+                for resource_id in resource_ids]
+
 
 class BotoS3Service(BotoGenericService):
     """
@@ -331,5 +457,133 @@ class BotoS3Service(BotoGenericService):
                                     to the CloudBridge resource (e.g. key_pair)
         """
         super(BotoS3Service, self).__init__(
-            provider, cb_resource, provider.s3_conn,
+            provider, cb_resource, lambda: provider.s3_conn,
             boto_collection_name)
+
+
+class AWSVMTypeCatalogue(object):
+    """
+    The catalogue of EC2 instance types, indexed by region and instance type.
+
+    The catalogue is kept in an on-disk cache shared between processes. Once
+    the cached copy is older than ``ttl`` seconds, it is revalidated with a
+    conditional request using its ETag and Last-Modified headers, so an
+    unchanged catalogue is not downloaded again. If the catalogue cannot be
+    fetched, a stale cached copy is used, and failing that, the snapshot
+    bundled with cloudbridge. The snapshot is built from the EC2 instance
+    type descriptions and regional offerings, and lists the regions of each
+    type under ``pricing`` without any prices.
+    """
+
+    DEFAULT_TTL = 24 * 3600
+    REQUEST_TIMEOUT = 30
+    SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), 'data',
+                                 'vm_types.json')
+
+    _catalogues = {}
+    _catalogues_lock = threading.Lock()
+
+    def __init__(self, url, cache_dir=None, ttl=DEFAULT_TTL):
+        self.url = url
+        self.cache_dir = cache_dir
+        self.cache_name = 'aws-vm-types-{0}.json'.format(
+            hashlib.sha1(url.encode('utf-8')).hexdigest()[:12])
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = None
+        self._loaded_at = 0
+
+    @classmethod
+    def get_catalogue(cls, url, cache_dir=None):
+        """
+        Returns the catalogue for the given URL and cache directory, shared
+        by all providers in this process.
+        """
+        with cls._catalogues_lock:
+            key = (url, cache_dir)
+            if key not in cls._catalogues:
+                cls._catalogues[key] = cls(url, cache_dir)
+            return cls._catalogues[key]
+
+    def list(self, region):
+        """
+        Returns the instance type dicts available in ``region``.
+        """
+        return list(self._get_index().get(region, {}).values())
+
+    def get(self, region, instance_type):
+        """
+        Returns the dict for ``instance_type``, or ``None`` if it is not
+        available in ``region``.
+        """
+        return self._get_index().get(region, {}).get(instance_type)
+
+    def _get_index(self):
+        with self._lock:
+            if (self._index is None or
+                    time.time() - self._loaded_at > self.ttl):
+                self._index = self._build_index(self._load())
+                self._loaded_at = time.time()
+            return self._index
+
+    @staticmethod
+    def _parse(vm_types_list):
+        # Some instances are only available in certain regions. Use pricing
+        # info to determine the regions each instance type is available in.
+        regions = OrderedDict()
+        for vm_type in vm_types_list:
+            for region in vm_type.get('pricing', {}):
+                regions.setdefault(region, []).append(
+                    vm_type['instance_type'])
+        return {'vm_types': OrderedDict((vm_type['instance_type'], vm_type)
+                                        for vm_type in vm_types_list),
+                'regions': regions}
+
+    @staticmethod
+    def _build_index(catalogue):
+        vm_types = catalogue['vm_types']
+        return {region: OrderedDict((name, vm_types[name]) for name in names)
+                for region, names in catalogue['regions'].items()}
+
+    def _load(self):
+        cached = cb_helpers.read_cached_json(self.cache_dir, self.cache_name)
+        if cached and time.time() - cached.get('fetched_at', 0) < self.ttl:
+            return cached
+        try:
+            catalogue = self._fetch(cached)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            if cached:
+                log.warning("Could not refresh the VM type catalogue from"
+                            " %s, using a cached copy: %s", self.url, e)
+                return cached
+            if not os.path.exists(self.SNAPSHOT_PATH):
+                raise
+            log.warning("Could not fetch the VM type catalogue from %s,"
+                        " using the bundled snapshot: %s", self.url, e)
+            return self._load_snapshot()
+        cb_helpers.write_cached_json(self.cache_dir, self.cache_name,
+                                     catalogue)
+        return catalogue
+
+    def _fetch(self, cached=None):
+        headers = {}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        r = requests.get(self.url, headers=headers,
+                         timeout=self.REQUEST_TIMEOUT)
+        if r.status_code == 304 and cached:
+            log.debug("VM type catalogue at %s has not changed", self.url)
+            cached['fetched_at'] = time.time()
+            return cached
+        r.raise_for_status()
+        catalogue = self._parse(r.json())
+        catalogue.update({'etag': r.headers.get('ETag'),
+                          'last_modified': r.headers.get('Last-Modified'),
+                          'fetched_at': time.time()})
+        return catalogue
+
+    def _load_snapshot(self):
+        with open(self.SNAPSHOT_PATH) as f:
+            return self._parse(json.load(f, object_pairs_hook=OrderedDict))
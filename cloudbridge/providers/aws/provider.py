@@ -1,11 +1,13 @@
 """Provider implementation based on boto library for AWS-compatible clouds."""
 import logging as log
+import threading
 
 import boto3
 
 from botocore.client import Config
 
 from cloudbridge.base import BaseCloudProvider
+from cloudbridge.base.clients import ClientPool
 from cloudbridge.base.helpers import get_env
 
 from .services import AWSComputeService
@@ -18,6 +20,13 @@ from .services import AWSStorageService
 class AWSCloudProvider(BaseCloudProvider):
     '''AWS cloud provider interface'''
     PROVIDER_ID = 'aws'
+    REGION_CONFIG_KEY = 'aws_region_name'
+    API_FAMILIES = (
+        ('provider.storage.buckets', 's3'),
+        ('provider.storage._bucket_objects', 's3'),
+        ('provider.dns', 'route53'),
+        ('provider', 'ec2')
+    )
     AWS_INSTANCE_DATA_DEFAULT_URL = "http://cloudve.org/cb-aws-vmtypes.json"
 
     def __init__(self, config):
@@ -52,9 +61,14 @@ class AWSCloudProvider(BaseCloudProvider):
 
         # service connections, lazily initialized
         self._session = None
-        self._ec2_conn = None
-        self._vpc_conn = None
-        self._s3_conn = None
+        # Sessions are not thread safe, so the session and clients are
+        # created under a lock. Resources are not thread safe either, so
+        # each thread uses its own, from a pool.
+        self._session_lock = threading.Lock()
+        self._ec2_pool = ClientPool(self._connect_ec2,
+                                    self.config.client_pool_size)
+        self._s3_pool = ClientPool(self._connect_s3,
+                                   self.config.client_pool_size)
 
         # Initialize provider services
         self._compute = AWSComputeService(self)
@@ -67,23 +81,23 @@ class AWSCloudProvider(BaseCloudProvider):
     def session(self):
         '''Get a low-level session object or create one if needed'''
         if not self._session:
-            if self.config.debug_mode:
-                boto3.set_stream_logger(level=log.DEBUG)
-            self._session = boto3.session.Session(
-                region_name=self.region_name, **self.session_cfg)
+            with self._session_lock:
+                if not self._session:
+                    if self.config.debug_mode:
+                        boto3.set_stream_logger(level=log.DEBUG)
+                    self._session = boto3.session.Session(
+                        region_name=self.region_name, **self.session_cfg)
         return self._session
 
     @property
     def ec2_conn(self):
-        if not self._ec2_conn:
-            self._ec2_conn = self._connect_ec2()
-        return self._ec2_conn
+        '''The EC2 resource object of the current thread'''
+        return self._ec2_pool.get()
 
     @property
     def s3_conn(self):
-        if not self._s3_conn:
-            self._s3_conn = self._connect_s3()
-        return self._s3_conn
+        '''The S3 resource object of the current thread'''
+        return self._s3_pool.get()
 
     @property
     def compute(self):
@@ -113,10 +127,23 @@ class AWSCloudProvider(BaseCloudProvider):
 
     def _connect_ec2_region(self, region_name=None):
         '''Get an EC2 resource object'''
-        return self.session.resource(
-            'ec2', region_name=region_name, **self.ec2_cfg)
+        session = self.session
+        with self._session_lock:
+            return session.resource(
+                'ec2', region_name=region_name, **self.ec2_cfg)
 
     def _connect_s3(self):
         '''Get an S3 resource object'''
-        return self.session.resource(
-            's3', region_name=self.region_name, **self.s3_cfg)
+        session = self.session
+        with self._session_lock:
+            return session.resource(
+                's3', region_name=self.region_name, **self.s3_cfg)
+
+    def _create_region_provider(self, region_name, provider_class=None):
+        provider = super(AWSCloudProvider, self)._create_region_provider(
+            region_name, provider_class)
+        # Share one session, and with it the credentials and loaded service
+        # models. Each region still gets its own clients.
+        provider._session = self.session
+        provider._session_lock = self._session_lock
+        return provider
@@ -28,6 +28,7 @@ from cloudbridge.base.resources import BaseVMFirewall
 from cloudbridge.base.resources import BaseVMFirewallRule
 from cloudbridge.base.resources import BaseVMType
 from cloudbridge.base.resources import BaseVolume
+from cloudbridge.base.resources import prefetchable
 from cloudbridge.interfaces.resources import GatewayState
 from cloudbridge.interfaces.resources import InstanceState
 from cloudbridge.interfaces.resources import MachineImageState
@@ -274,6 +275,7 @@ class AWSInstance(BaseInstance):
         return self._ec2_instance.instance_type
 
     @property
+    @prefetchable
     def vm_type(self):
         return self._provider.compute.vm_types.find(
             name=self._ec2_instance.instance_type)[0]
@@ -294,6 +296,7 @@ class AWSInstance(BaseInstance):
         return self._ec2_instance.subnet_id
 
     @property
+    @prefetchable
     def vm_firewalls(self):
         return [
             self._provider.security.vm_firewalls.get(fw_id)
@@ -374,6 +377,7 @@ class AWSInstance(BaseInstance):
             return InstanceState.UNKNOWN
 
     def refresh(self):
+        self._prefetched.clear()
         try:
             self._ec2_instance.reload()
             self._unknown_state = False
@@ -382,6 +386,20 @@ class AWSInstance(BaseInstance):
             # set the state to unknown
             self._unknown_state = True
 
+    @classmethod
+    def _refresh_many(cls, instances):
+        # Refresh all instances with a single describe call
+        # pylint:disable=protected-access
+        latest = instances[0]._provider.compute.instances.get_many(
+            [inst.id for inst in instances])
+        for inst, latest_inst in zip(instances, latest):
+            inst._prefetched.clear()
+            if latest_inst:
+                inst._ec2_instance = latest_inst._ec2_instance
+                inst._unknown_state = False
+            else:
+                inst._unknown_state = True
+
     # pylint:disable=unused-argument
     def _wait_till_exists(self, timeout=None, interval=None):
         self._ec2_instance.wait_until_exists()
@@ -512,6 +530,19 @@ class AWSVolume(BaseVolume):
             # set the status to unknown
             self._unknown_state = True
 
+    @classmethod
+    def _refresh_many(cls, volumes):
+        # Refresh all volumes with a single describe call
+        # pylint:disable=protected-access
+        latest = volumes[0]._provider.storage.volumes.get_many(
+            [vol.id for vol in volumes])
+        for vol, latest_vol in zip(volumes, latest):
+            if latest_vol:
+                vol._volume = latest_vol._volume
+                vol._unknown_state = False
+            else:
+                vol._unknown_state = True
+
 
 class AWSSnapshot(BaseSnapshot):
 
@@ -593,6 +624,19 @@ class AWSSnapshot(BaseSnapshot):
             # set the status to unknown
             self._unknown_state = True
 
+    @classmethod
+    def _refresh_many(cls, snapshots):
+        # Refresh all snapshots with a single describe call
+        # pylint:disable=protected-access
+        latest = snapshots[0]._provider.storage.snapshots.get_many(
+            [snap.id for snap in snapshots])
+        for snap, latest_snap in zip(snapshots, latest):
+            if latest_snap:
+                snap._snapshot = latest_snap._snapshot
+                snap._unknown_state = False
+            else:
+                snap._unknown_state = True
+
     def create_volume(self, size=None, volume_type=None, iops=None):
         label = "from-snap-{0}".format(self.label or self.id)
         cb_vol = self._provider.storage.volumes.create(
@@ -759,6 +803,9 @@ class AWSBucketObject(BaseBucketObject):
         def close(self):
             return self.body.close()
 
+    # S3 rejects multipart uploads with parts (other than the last) below 5MB
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
     def __init__(self, provider, obj):
         super(AWSBucketObject, self).__init__(provider)
         self._obj = obj
@@ -803,6 +850,36 @@ class AWSBucketObject(BaseBucketObject):
     def refresh(self):
         self._obj.load()
 
+    @property
+    def _s3_client(self):
+        return self._provider.s3_conn.meta.client
+
+    def _begin_multipart_upload(self):
+        response = self._s3_client.create_multipart_upload(
+            Bucket=self._obj.bucket_name, Key=self.id)
+        return response['UploadId']
+
+    def _upload_part(self, upload_id, part_number, data):
+        response = self._s3_client.upload_part(
+            Bucket=self._obj.bucket_name, Key=self.id, UploadId=upload_id,
+            PartNumber=part_number, Body=data)
+        return {'ETag': response['ETag'], 'PartNumber': part_number}
+
+    def _complete_multipart_upload(self, upload_id, parts):
+        self._s3_client.complete_multipart_upload(
+            Bucket=self._obj.bucket_name, Key=self.id, UploadId=upload_id,
+            MultipartUpload={'Parts': parts})
+
+    def _abort_multipart_upload(self, upload_id):
+        self._s3_client.abort_multipart_upload(
+            Bucket=self._obj.bucket_name, Key=self.id, UploadId=upload_id)
+
+    def _read_range(self, start, end):
+        response = self._s3_client.get_object(
+            Bucket=self._obj.bucket_name, Key=self.id,
+            Range='bytes={0}-{1}'.format(start, end))
+        return response['Body'].read()
+
 
 class AWSBucket(BaseBucket):
 
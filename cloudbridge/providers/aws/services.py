@@ -3,15 +3,15 @@ import ipaddress
 import logging
 import string
 import uuid
+from collections import OrderedDict
 
 from botocore.exceptions import ClientError
 
-import cachetools
-
-import requests
-
 import cloudbridge.base.helpers as cb_helpers
 from cloudbridge.base.middleware import dispatch
+from cloudbridge.base.query import QueryPlan
+from cloudbridge.base.query import QueryPlanner
+from cloudbridge.base.query import prefix_pushdown
 from cloudbridge.base.resources import ClientPagedResultList
 from cloudbridge.base.resources import ServerPagedResultList
 from cloudbridge.base.services import BaseBucketObjectService
@@ -40,7 +40,6 @@ from cloudbridge.base.services import BaseVolumeService
 from cloudbridge.interfaces.exceptions import DuplicateResourceException
 from cloudbridge.interfaces.exceptions import \
     InvalidConfigurationException
-from cloudbridge.interfaces.exceptions import InvalidParamException
 from cloudbridge.interfaces.exceptions import InvalidValueException
 from cloudbridge.interfaces.resources import KeyPair
 from cloudbridge.interfaces.resources import MachineImage
@@ -51,8 +50,10 @@ from cloudbridge.interfaces.resources import VMFirewall
 from cloudbridge.interfaces.resources import VMType
 from cloudbridge.interfaces.resources import Volume
 
+from .helpers import AWSVMTypeCatalogue
 from .helpers import BotoEC2Service
 from .helpers import BotoS3Service
+from .helpers import ec2_filter_pushdown
 from .helpers import trim_empty_params
 from .resources import AWSBucket
 from .resources import AWSBucketObject
@@ -102,6 +103,9 @@ class AWSSecurityService(BaseSecurityService):
 
 class AWSKeyPairService(BaseKeyPairService):
 
+    _find_planner = QueryPlanner(['name'],
+                                 {'name': ec2_filter_pushdown('key-name')})
+
     def __init__(self, provider):
         super(AWSKeyPairService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -114,6 +118,11 @@ class AWSKeyPairService(BaseKeyPairService):
         log.debug("Getting Key Pair Service %s", key_pair_id)
         return self.svc.get(key_pair_id)
 
+    @dispatch(event="provider.security.key_pairs.get_many",
+              priority=BaseKeyPairService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, key_pair_ids):
+        return self.svc.get_many(key_pair_ids)
+
     @dispatch(event="provider.security.key_pairs.list",
               priority=BaseKeyPairService.STANDARD_EVENT_PRIORITY)
     def list(self, limit=None, marker=None):
@@ -122,16 +131,9 @@ class AWSKeyPairService(BaseKeyPairService):
     @dispatch(event="provider.security.key_pairs.find",
               priority=BaseKeyPairService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        name = kwargs.pop('name', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'name'))
-
-        log.debug("Searching for Key Pair %s", name)
-        return self.svc.find(filters={'key-name': name})
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for Key Pair %s", plan)
+        return self.svc.query(plan)
 
     @dispatch(event="provider.security.key_pairs.create",
               priority=BaseKeyPairService.STANDARD_EVENT_PRIORITY)
@@ -164,6 +166,9 @@ class AWSKeyPairService(BaseKeyPairService):
 
 class AWSVMFirewallService(BaseVMFirewallService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': ec2_filter_pushdown('tag:Name')})
+
     def __init__(self, provider):
         super(AWSVMFirewallService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -176,6 +181,11 @@ class AWSVMFirewallService(BaseVMFirewallService):
         log.debug("Getting Firewall Service with the id: %s", vm_firewall_id)
         return self.svc.get(vm_firewall_id)
 
+    @dispatch(event="provider.security.vm_firewalls.get_many",
+              priority=BaseVMFirewallService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, vm_firewall_ids):
+        return self.svc.get_many(vm_firewall_ids)
+
     @dispatch(event="provider.security.vm_firewalls.list",
               priority=BaseVMFirewallService.STANDARD_EVENT_PRIORITY)
     def list(self, limit=None, marker=None):
@@ -198,15 +208,9 @@ class AWSVMFirewallService(BaseVMFirewallService):
     @dispatch(event="provider.security.vm_firewalls.find",
               priority=BaseVMFirewallService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        # Filter by name or label
-        label = kwargs.pop('label', None)
-        log.debug("Searching for Firewall Service %s", label)
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-        return self.svc.find(filters={'tag:Name': label})
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for Firewall Service %s", plan)
+        return self.svc.query(plan)
 
     @dispatch(event="provider.security.vm_firewalls.delete",
               priority=BaseVMFirewallService.STANDARD_EVENT_PRIORITY)
@@ -324,6 +328,9 @@ class AWSStorageService(BaseStorageService):
 
 class AWSVolumeService(BaseVolumeService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': ec2_filter_pushdown('tag:Name')})
+
     def __init__(self, provider):
         super(AWSVolumeService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -335,21 +342,18 @@ class AWSVolumeService(BaseVolumeService):
     def get(self, volume_id):
         return self.svc.get(volume_id)
 
+    @dispatch(event="provider.storage.volumes.get_many",
+              priority=BaseVolumeService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, volume_ids):
+        return self.svc.get_many(volume_ids)
+
     @dispatch(event="provider.storage.volumes.find",
               priority=BaseVolumeService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        log.debug("Searching for AWS Volume Service %s", label)
-        return self.svc.find(
-            filters={'tag:Name': label,
-                     'availability-zone': self.provider.zone_name})
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for AWS Volume Service %s", plan)
+        return self.svc.query(
+            plan, filters={'availability-zone': self.provider.zone_name})
 
     @dispatch(event="provider.storage.volumes.list",
               priority=BaseVolumeService.STANDARD_EVENT_PRIORITY)
@@ -387,6 +391,9 @@ class AWSVolumeService(BaseVolumeService):
 
 class AWSSnapshotService(BaseSnapshotService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': ec2_filter_pushdown('tag:Name')})
+
     def __init__(self, provider):
         super(AWSSnapshotService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -398,21 +405,17 @@ class AWSSnapshotService(BaseSnapshotService):
     def get(self, snapshot_id):
         return self.svc.get(snapshot_id)
 
+    @dispatch(event="provider.storage.snapshots.get_many",
+              priority=BaseSnapshotService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, snapshot_ids):
+        return self.svc.get_many(snapshot_ids)
+
     @dispatch(event="provider.storage.snapshots.find",
               priority=BaseSnapshotService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        # Filter by description or label
-        label = kwargs.get('label', None)
-
-        obj_list = []
-        if label:
-            log.debug("Searching for AWS Snapshot with label %s", label)
-            obj_list.extend(self.svc.find(filters={'tag:Name': label},
-                                          OwnerIds=['self']))
-        else:
-            obj_list = list(self)
-        filters = ['label']
-        return cb_helpers.generic_find(filters, kwargs, obj_list)
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for AWS Snapshot %s", plan)
+        return self.svc.query(plan, OwnerIds=['self'])
 
     @dispatch(event="provider.storage.snapshots.list",
               priority=BaseSnapshotService.STANDARD_EVENT_PRIORITY)
@@ -534,6 +537,12 @@ class AWSBucketService(BaseBucketService):
 
 class AWSBucketObjectService(BaseBucketObjectService):
 
+    # The DeleteObjects API accepts up to 1000 keys per request
+    DELETE_BATCH_SIZE = 1000
+    # Name patterns are searched for, so they can match anywhere in a key,
+    # and S3 only filters by an explicit Prefix
+    _find_planner = QueryPlanner(['name'], {'name': prefix_pushdown('Prefix')})
+
     def __init__(self, provider):
         super(AWSBucketObjectService, self).__init__(provider)
 
@@ -547,24 +556,46 @@ class AWSBucketObjectService(BaseBucketObjectService):
         except ClientError:
             return None
 
+    def _to_bucket_object(self, bucket, item):
+        # Build an ObjectSummary from a list_objects_v2 entry, the same way
+        # boto3 collections do, so that no further requests are needed
+        obj = self.provider.s3_conn.ObjectSummary(bucket.name, item['Key'])
+        obj.meta.data = item
+        return AWSBucketObject(self.provider, obj)
+
+    def _iter_objects(self, bucket, prefix=None):
+        paginator = self.provider.s3_conn.meta.client.get_paginator(
+            'list_objects_v2')
+        params = {'Bucket': bucket.name}
+        if prefix:
+            params['Prefix'] = prefix
+        for page in paginator.paginate(**params):
+            for item in page.get('Contents', []):
+                yield self._to_bucket_object(bucket, item)
+
     def list(self, bucket, limit=None, marker=None, prefix=None):
+        limit = limit or self.provider.config.default_result_limit
+        params = {'Bucket': bucket.name, 'MaxKeys': limit}
         if prefix:
-            # pylint:disable=protected-access
-            boto_objs = bucket._bucket.objects.filter(Prefix=prefix)
-        else:
-            # pylint:disable=protected-access
-            boto_objs = bucket._bucket.objects.all()
-        objects = [AWSBucketObject(self.provider, obj) for obj in boto_objs]
-        return ClientPagedResultList(self.provider, objects,
-                                     limit=limit, marker=marker)
+            params['Prefix'] = prefix
+        if marker:
+            # Object ids are keys, and S3 lists keys in order
+            params['StartAfter'] = marker
+        response = self.provider.s3_conn.meta.client.list_objects_v2(
+            **params)
+        objects = [self._to_bucket_object(bucket, item)
+                   for item in response.get('Contents', [])]
+        is_truncated = response.get('IsTruncated', False) and bool(objects)
+        return ServerPagedResultList(
+            is_truncated, objects[-1].id if is_truncated else None, False,
+            data=objects)
 
     def find(self, bucket, **kwargs):
-        # pylint:disable=protected-access
-        obj_list = [AWSBucketObject(self.provider, o)
-                    for o in bucket._bucket.objects.all()]
-        filters = ['name']
-        matches = cb_helpers.generic_find(filters, kwargs, obj_list)
-        return ClientPagedResultList(self.provider, list(matches),
+        plan = self._plan_find(bucket, **kwargs)
+        obj_list = self._iter_objects(
+            bucket, prefix=plan.native_filters.get('Prefix'))
+        return ClientPagedResultList(self.provider,
+                                     list(plan.filter(obj_list)),
                                      limit=None, marker=None)
 
     def create(self, bucket, name):
@@ -572,6 +603,14 @@ class AWSBucketObjectService(BaseBucketObjectService):
         obj = bucket._bucket.Object(name)
         return AWSBucketObject(self.provider, obj)
 
+    def _delete_batch(self, bucket, names):
+        response = self.provider.s3_conn.meta.client.delete_objects(
+            Bucket=bucket.name,
+            Delete={'Objects': [{'Key': name} for name in names],
+                    'Quiet': True})
+        return {error['Key']: error.get('Message', error.get('Code'))
+                for error in response.get('Errors', [])}
+
 
 class AWSComputeService(BaseComputeService):
 
@@ -601,6 +640,9 @@ class AWSComputeService(BaseComputeService):
 
 class AWSImageService(BaseImageService):
 
+    _find_planner = QueryPlanner(['label'],
+                                 {'label': ec2_filter_pushdown('name')})
+
     def __init__(self, provider):
         super(AWSImageService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -611,34 +653,45 @@ class AWSImageService(BaseImageService):
         log.debug("Getting AWS Image Service with the id: %s", image_id)
         return self.svc.get(image_id)
 
-    def find(self, **kwargs):
-        # Filter by name or label
-        label = kwargs.pop('label', None)
-        # Popped here, not used in the generic find
-        owner = kwargs.pop('owners', None)
+    @dispatch(event="provider.compute.images.get_many",
+              priority=BaseImageService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, image_ids):
+        return self.svc.get_many(image_ids)
 
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
+    def _plan_find(self, owners=None, **kwargs):
+        # Owners are passed to EC2 as is, and are not a filter attribute
+        return super(AWSImageService, self)._plan_find(**kwargs)
 
-        extra_args = {}
-        if owner:
-            extra_args.update(Owners=owner)
-
-        # The original list is made by combining both searches by "tag:Name"
-        # and "AMI name" to allow for searches of public images
-        if label:
-            log.debug("Searching for AWS Image Service %s", label)
-            obj_list = []
-            obj_list.extend(
-                self.svc.find(filters={'name': label}, **extra_args))
-            obj_list.extend(
-                self.svc.find(filters={'tag:Name': label}, **extra_args))
-            return obj_list
-        else:
+    def find(self, owners=None, **kwargs):
+        plan = self._plan_find(**kwargs)
+        if not (plan.pushed_down or plan.residual):
             return []
+        if not plan.native_filters:
+            # Without a name filter EC2 would list every public image, so
+            # predicates are only matched against the owners' images
+            log.debug("Searching for AWS Image Service %s in images owned by"
+                      " %s", plan, owners or ['self'])
+            return self.svc.query(plan, Owners=owners or ['self'])
+        extra_args = {}
+        if owners:
+            extra_args.update(Owners=owners)
+
+        # The list is made by combining searches by "AMI name" and by
+        # "tag:Name" to allow for searches of public images. EC2 cannot
+        # match either of two filters in one call, so both are made
+        # concurrently.
+        log.debug("Searching for AWS Image Service %s", plan)
+        tag_plan = QueryPlan(
+            OrderedDict(('tag:Name', value)
+                        for value in plan.native_filters.values()),
+            plan.pushed_down, plan.residual)
+        matches = OrderedDict()
+        for obj_list in cb_helpers.concurrent_map(
+                lambda p: self.svc.query(p, **extra_args), [plan, tag_plan],
+                self.provider.config.default_max_workers):
+            for image in obj_list:
+                matches.setdefault(image.id, image)
+        return list(matches.values())
 
     def list(self, filter_by_owner=True, limit=None, marker=None):
         return self.svc.list(Owners=['self'] if filter_by_owner else
@@ -648,6 +701,9 @@ class AWSImageService(BaseImageService):
 
 class AWSInstanceService(BaseInstanceService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': ec2_filter_pushdown('tag:Name')})
+
     def __init__(self, provider):
         super(AWSInstanceService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -743,8 +799,9 @@ class AWSInstanceService(BaseInstanceService):
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def create(self, label, image, vm_type, subnet,
                key_pair=None, vm_firewalls=None, user_data=None,
-               launch_config=None, **kwargs):
+               launch_config=None, count=None, **kwargs):
         AWSInstance.assert_valid_resource_label(label)
+        self._check_count(count)
         image_id = image.id if isinstance(image, MachineImage) else image
         vm_size = vm_type.id if \
             isinstance(vm_type, VMType) else vm_type
@@ -766,8 +823,9 @@ class AWSInstanceService(BaseInstanceService):
         inst = self.svc.create(
             'create_instances',
             ImageId=image_id,
-            MinCount=1,
-            MaxCount=1,
+            # Launch all instances or none of them
+            MinCount=count or 1,
+            MaxCount=count or 1,
             KeyName=key_pair_name,
             SecurityGroupIds=vm_firewall_ids or None,
             UserData=str(user_data) or None,
@@ -777,6 +835,8 @@ class AWSInstanceService(BaseInstanceService):
             SubnetId=subnet_id,
             IamInstanceProfile=kwargs.pop('iam_instance_profile', None)
         )
+        if count is not None:
+            return self._wait_till_launched(inst, label)
         if inst and len(inst) == 1:
             # Wait until the resource exists
             # pylint:disable=protected-access
@@ -787,32 +847,57 @@ class AWSInstanceService(BaseInstanceService):
         raise ValueError(
             'Expected a single object response, got a list: %s' % inst)
 
+    def _wait_till_launched(self, instances, label):
+        """
+        Waits for a group of launched instances to exist, and labels them,
+        with a single call each.
+        """
+        instance_ids = [inst.id for inst in instances]
+        ec2_client = self.provider.ec2_conn.meta.client
+        ec2_client.get_waiter('instance_exists').wait(
+            InstanceIds=instance_ids)
+        ec2_client.create_tags(Resources=instance_ids,
+                               Tags=[{'Key': 'Name', 'Value': label or ""}])
+        # Load the latest state and tags of all instances at once
+        # pylint:disable=protected-access
+        AWSInstance._refresh_many(instances)
+        return instances
+
     @dispatch(event="provider.compute.instances.get",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def get(self, instance_id):
         return self.svc.get(instance_id)
 
+    @dispatch(event="provider.compute.instances.get_many",
+              priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, instance_ids):
+        return self.svc.get_many(instance_ids)
+
     @dispatch(event="provider.compute.instances.find",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        return self.svc.find(
-            filters={'tag:Name': label,
-                     'availability-zone': self.provider.zone_name})
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for AWS Instance Service %s", plan)
+        return self.svc.query(
+            plan, filters={'availability-zone': self.provider.zone_name})
 
     @dispatch(event="provider.compute.instances.list",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
-    def list(self, limit=None, marker=None):
-        return self.svc.find(
+    def list(self, limit=None, marker=None, prefetch=None):
+        instances = self.svc.find(
             filters={'availability-zone': self.provider.zone_name},
             limit=limit, marker=marker)
+        return self._prefetch(instances, prefetch)
+
+    def _resolve_floating_ips(self, instances):
+        # Elastic IPs record the instance they are associated with
+        attached = {}
+        for fip in self._list_floating_ips():
+            # pylint:disable=protected-access
+            if fip._ip.instance_id:
+                attached.setdefault(fip._ip.instance_id, []).append(fip)
+        return dict((inst.id, attached.get(inst.id, []))
+                    for inst in instances)
 
     @dispatch(event="provider.compute.instances.delete",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
@@ -830,8 +915,7 @@ class AWSVMTypeService(BaseVMTypeService):
         super(AWSVMTypeService, self).__init__(provider)
 
     @property
-    @cachetools.cached(cachetools.TTLCache(maxsize=1, ttl=24*3600))
-    def instance_data(self):
+    def _catalogue(self):
         """
         Fetch info about the available instances.
 
@@ -842,15 +926,21 @@ class AWSVMTypeService(BaseVMTypeService):
         file: https://raw.githubusercontent.com/powdahound/ec2instances.info/
         master/www/instances.json).
         """
-        r = requests.get(self.provider.config.get(
-            "aws_instance_info_url",
-            self.provider.AWS_INSTANCE_DATA_DEFAULT_URL))
-        # Some instances are only available in certain regions. Use pricing
-        # info to determine and filter out instance types that are not
-        # available in the current region
-        vm_types_list = r.json()
-        return [vm_type for vm_type in vm_types_list
-                if vm_type.get('pricing', {}).get(self.provider.region_name)]
+        return AWSVMTypeCatalogue.get_catalogue(
+            self.provider.config.get(
+                "aws_instance_info_url",
+                self.provider.AWS_INSTANCE_DATA_DEFAULT_URL),
+            self.provider.config.cache_dir)
+
+    @property
+    def instance_data(self):
+        return self._catalogue.list(self.provider.region_name)
+
+    @dispatch(event="provider.compute.vm_types.get",
+              priority=BaseVMTypeService.STANDARD_EVENT_PRIORITY)
+    def get(self, vm_type_id):
+        vm_type = self._catalogue.get(self.provider.region_name, vm_type_id)
+        return AWSVMType(self.provider, vm_type) if vm_type else None
 
     @dispatch(event="provider.compute.vm_types.list",
               priority=BaseVMTypeService.STANDARD_EVENT_PRIORITY)
@@ -925,6 +1015,9 @@ class AWSNetworkingService(BaseNetworkingService):
 
 class AWSNetworkService(BaseNetworkService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': ec2_filter_pushdown('tag:Name')})
+
     def __init__(self, provider):
         super(AWSNetworkService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -936,6 +1029,11 @@ class AWSNetworkService(BaseNetworkService):
     def get(self, network_id):
         return self.svc.get(network_id)
 
+    @dispatch(event="provider.networking.networks.get_many",
+              priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, network_ids):
+        return self.svc.get_many(network_ids)
+
     @dispatch(event="provider.networking.networks.list",
               priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
     def list(self, limit=None, marker=None):
@@ -944,16 +1042,9 @@ class AWSNetworkService(BaseNetworkService):
     @dispatch(event="provider.networking.networks.find",
               priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        log.debug("Searching for AWS Network Service %s", label)
-        return self.svc.find(filters={'tag:Name': label})
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for AWS Network Service %s", plan)
+        return self.svc.query(plan)
 
     @dispatch(event="provider.networking.networks.create",
               priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
@@ -978,6 +1069,8 @@ class AWSNetworkService(BaseNetworkService):
             # pylint:disable=protected-access
             network._vpc.delete()
 
+    @dispatch(event="provider.networking.networks.get_or_create_default",
+              priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self):
         # # Look for provided default network
         # for net in self.provider.networking.networks:
@@ -1001,6 +1094,9 @@ class AWSNetworkService(BaseNetworkService):
 
 class AWSSubnetService(BaseSubnetService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': ec2_filter_pushdown('tag:Name')})
+
     def __init__(self, provider):
         super(AWSSubnetService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -1012,6 +1108,11 @@ class AWSSubnetService(BaseSubnetService):
     def get(self, subnet_id):
         return self.svc.get(subnet_id)
 
+    @dispatch(event="provider.networking.subnets.get_many",
+              priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, subnet_ids):
+        return self.svc.get_many(subnet_ids)
+
     @dispatch(event="provider.networking.subnets.list",
               priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
     def list(self, network=None, limit=None, marker=None):
@@ -1029,18 +1130,13 @@ class AWSSubnetService(BaseSubnetService):
     @dispatch(event="provider.networking.subnets.find",
               priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
     def find(self, network=None, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        log.debug("Searching for AWS Subnet Service %s", label)
-        return self.svc.find(
-            filters={'tag:Name': label,
-                     'availability-zone': self.provider.zone_name})
+        plan = self._plan_find(network, **kwargs)
+        log.debug("Searching for AWS Subnet Service %s", plan)
+        filters = {'availability-zone': self.provider.zone_name}
+        if network:
+            filters['vpc-id'] = (network.id if isinstance(network, AWSNetwork)
+                                 else network)
+        return self.svc.query(plan, filters=filters)
 
     @dispatch(event="provider.networking.subnets.create",
               priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
@@ -1066,6 +1162,8 @@ class AWSSubnetService(BaseSubnetService):
             # pylint:disable=protected-access
             sn._subnet.delete()
 
+    @dispatch(event="provider.networking.subnets.get_or_create_default",
+              priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self):
         zone_name = self.provider.zone_name
 
@@ -1171,6 +1269,9 @@ class AWSSubnetService(BaseSubnetService):
 class AWSRouterService(BaseRouterService):
     """For AWS, a CloudBridge router corresponds to an AWS Route Table."""
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': ec2_filter_pushdown('tag:Name')})
+
     def __init__(self, provider):
         super(AWSRouterService, self).__init__(provider)
         self.svc = BotoEC2Service(provider=self.provider,
@@ -1182,19 +1283,17 @@ class AWSRouterService(BaseRouterService):
     def get(self, router_id):
         return self.svc.get(router_id)
 
+    @dispatch(event="provider.networking.routers.get_many",
+              priority=BaseRouterService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, router_ids):
+        return self.svc.get_many(router_ids)
+
     @dispatch(event="provider.networking.routers.find",
               priority=BaseRouterService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        log.debug("Searching for AWS Router Service %s", label)
-        return self.svc.find(filters={'tag:Name': label})
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for AWS Router Service %s", plan)
+        return self.svc.query(plan)
 
     @dispatch(event="provider.networking.routers.list",
               priority=BaseRouterService.STANDARD_EVENT_PRIORITY)
@@ -11,6 +11,7 @@ from azure.mgmt.network import NetworkManagementClient
 from azure.mgmt.resource import ResourceManagementClient
 from azure.mgmt.resource.subscriptions import SubscriptionClient
 from azure.mgmt.storage import StorageManagementClient
+from azure.storage.blob import BlobBlock
 from azure.storage.blob import BlobPermissions
 from azure.storage.blob import BlockBlobService
 from azure.storage.common import TokenCredential
@@ -453,6 +454,20 @@ class AzureClient(object):
     def delete_blob(self, container_name, blob_name):
         self.blob_service.delete_blob(container_name, blob_name)
 
+    def put_block(self, container_name, blob_name, block, block_id):
+        self.blob_service.put_block(container_name, blob_name, block,
+                                    block_id)
+
+    def put_block_list(self, container_name, blob_name, block_ids):
+        self.blob_service.put_block_list(
+            container_name, blob_name,
+            [BlobBlock(id=block_id) for block_id in block_ids])
+
+    def get_blob_range(self, container_name, blob_name, start, end):
+        return self.blob_service.get_blob_to_bytes(
+            container_name, blob_name, start_range=start,
+            end_range=end).content
+
     def get_blob_url(self, container_name, blob_name, expiry_time):
         expiry_date = datetime.datetime.utcnow() + datetime.timedelta(
             seconds=expiry_time)
@@ -462,11 +477,20 @@ class AzureClient(object):
         return self.blob_service.make_blob_url(container_name, blob_name,
                                                sas_token=sas)
 
-    def get_blob_content(self, container_name, blob_name):
+    def iter_blob_content(self, container_name, blob_name, size,
+                          chunk_size):
+        """
+        Downloads a blob one ranged request at a time, yielding each chunk
+        so that only one is held in memory.
+        """
         out_stream = BytesIO()
-        self.blob_service.get_blob_to_stream(container_name,
-                                             blob_name, out_stream)
-        return out_stream
+        for start in range(0, size, chunk_size):
+            self.blob_service.get_blob_to_stream(
+                container_name, blob_name, out_stream, start_range=start,
+                end_range=min(start + chunk_size, size) - 1)
+            yield out_stream.getvalue()
+            out_stream.seek(0)
+            out_stream.truncate()
 
     def create_empty_disk(self, disk_name, params):
         return self.compute_client.disks.create_or_update(
@@ -809,6 +833,10 @@ class AzureClient(object):
             network_interfaces.delete(self.resource_group,
                                       nic_name).wait()
 
+    def list_nics(self):
+        return self.network_management_client.network_interfaces.list(
+            self.resource_group)
+
     def get_nic(self, nic_id):
         nic_params = azure_helpers.\
             parse_url(NETWORK_INTERFACE_RESOURCE_ID, nic_id)
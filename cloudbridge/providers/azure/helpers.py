@@ -1,5 +1,16 @@
+import threading
+
+import cachetools
+
 from cloudbridge.interfaces.exceptions import InvalidValueException
 
+# The number of parsed resource IDs to remember
+PARSE_CACHE_SIZE = 4096
+
+_compiled_templates = {}
+_parsed_ids = cachetools.LRUCache(maxsize=PARSE_CACHE_SIZE)
+_parsed_ids_lock = threading.Lock()
+
 
 # def filter_by_tag(list_items, filters):
 #     """
@@ -20,6 +31,33 @@ from cloudbridge.interfaces.exceptions import InvalidValueException
 #         return list_items
 
 
+def _split_resource_id(resource_id):
+    parts = resource_id.split('/')
+    if len(parts) == 1:
+        parts = resource_id.split(':')
+    return parts
+
+
+def _compile_templates(template_urls):
+    """
+    Compiles a list of resource ID templates into a dict, which maps a
+    number of segments to the positions and names of the parameters in the
+    first template with that many segments.
+    """
+    key = tuple(template_urls)
+    matchers = _compiled_templates.get(key)
+    if matchers is None:
+        matchers = {}
+        for each_template in template_urls:
+            parts = _split_resource_id(each_template)
+            if len(parts) not in matchers:
+                matchers[len(parts)] = tuple(
+                    (index, part[1:-1]) for index, part in enumerate(parts)
+                    if part.startswith('{') and part.endswith('}'))
+        _compiled_templates[key] = matchers
+    return matchers
+
+
 def parse_url(template_urls, original_url):
     """
     In Azure all the resource IDs are returned as URIs.
@@ -32,25 +70,27 @@ def parse_url(template_urls, original_url):
     The only exception to that format are image URN's which are used for
     public gallery references:
     https://docs.microsoft.com/en-us/azure/virtual-machines/linux/cli-ps-findimage
+
+    Templates are compiled once, and parsed IDs are kept in a bounded LRU
+    cache, since the same IDs are parsed for most operations on a resource.
     """
     if not original_url:
         raise InvalidValueException(template_urls, original_url)
-    original_url_parts = original_url.split('/')
-    if len(original_url_parts) == 1:
-        original_url_parts = original_url.split(':')
-    for each_template in template_urls:
-        template_url_parts = each_template.split('/')
-        if len(template_url_parts) == 1:
-            template_url_parts = each_template.split(':')
-        if len(template_url_parts) == len(original_url_parts):
-            break
-    if len(template_url_parts) != len(original_url_parts):
-        raise InvalidValueException(template_urls, original_url)
-    resource_param = {}
-    for key, value in zip(template_url_parts, original_url_parts):
-        if key.startswith('{') and key.endswith('}'):
-            resource_param.update({key[1:-1]: value})
-    return resource_param
+    matchers = _compile_templates(template_urls)
+    key = (id(matchers), original_url)
+    with _parsed_ids_lock:
+        resource_param = _parsed_ids.get(key)
+    if resource_param is None:
+        original_url_parts = _split_resource_id(original_url)
+        parameters = matchers.get(len(original_url_parts))
+        if parameters is None:
+            raise InvalidValueException(template_urls, original_url)
+        resource_param = dict((name, original_url_parts[index])
+                              for index, name in parameters)
+        with _parsed_ids_lock:
+            _parsed_ids[key] = resource_param
+    # Return a copy, since callers may modify it
+    return dict(resource_param)
 
 
 def generate_urn(gallery_image):
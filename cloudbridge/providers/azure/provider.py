@@ -23,6 +23,12 @@ log = logging.getLogger(__name__)
 
 class AzureCloudProvider(BaseCloudProvider):
     PROVIDER_ID = 'azure'
+    REGION_CONFIG_KEY = 'azure_region_name'
+    API_FAMILIES = (
+        ('provider.storage.buckets', 'blob'),
+        ('provider.storage._bucket_objects', 'blob'),
+        ('provider', 'arm')
+    )
 
     def __init__(self, config):
         super(AzureCloudProvider, self).__init__(config)
@@ -12,6 +12,7 @@ from msrestazure.azure_exceptions import CloudError
 
 import pysftp
 
+from cloudbridge.base import transfer as cb_transfer
 from cloudbridge.base.resources import BaseAttachmentInfo
 from cloudbridge.base.resources import BaseBucket
 from cloudbridge.base.resources import BaseBucketObject
@@ -31,6 +32,7 @@ from cloudbridge.base.resources import BaseVMFirewall
 from cloudbridge.base.resources import BaseVMFirewallRule
 from cloudbridge.base.resources import BaseVMType
 from cloudbridge.base.resources import BaseVolume
+from cloudbridge.base.resources import prefetchable
 from cloudbridge.interfaces import InstanceState
 from cloudbridge.interfaces import VolumeState
 from cloudbridge.interfaces.resources import Instance
@@ -211,11 +213,14 @@ class AzureBucketObject(BaseBucketObject):
         Returns this object's content as an
         iterable.
         """
-        content_stream = self._provider.azure_client. \
-            get_blob_content(self._container.id, self._key.name)
-        if content_stream:
-            content_stream.seek(0)
-        return content_stream
+        # Look up the current size, since the blob may have been written to
+        # after this object was fetched
+        size = self._provider.azure_client.get_blob(
+            self._container.id, self.id).properties.content_length
+        return cb_transfer.ChunkedReader(
+            self._provider.azure_client.iter_blob_content(
+                self._container.id, self.id, size,
+                self._provider.config.default_chunk_size))
 
     def upload(self, data):
         """
@@ -252,6 +257,26 @@ class AzureBucketObject(BaseBucketObject):
         self._provider.azure_client.delete_blob(self._container.id,
                                                 self.id)
 
+    def _begin_multipart_upload(self):
+        # Blocks are staged against the blob itself and only become visible
+        # once the block list is committed
+        return None
+
+    def _upload_part(self, upload, part_number, data):
+        # Block ids within a blob must all have the same length
+        block_id = '{0:08d}'.format(part_number)
+        self._provider.azure_client.put_block(
+            self._container.id, self.id, data, block_id)
+        return block_id
+
+    def _complete_multipart_upload(self, upload, parts):
+        self._provider.azure_client.put_block_list(
+            self._container.id, self.id, parts)
+
+    def _read_range(self, start, end):
+        return self._provider.azure_client.get_blob_range(
+            self._container.id, self.id, start, end)
+
     def generate_url(self, expires_in):
         """
         Generate a URL to this object.
@@ -1026,6 +1051,7 @@ class AzureInstance(BaseInstance):
         return (nic.id for nic in self._vm.network_profile.network_interfaces)
 
     @property
+    @prefetchable
     def _nics(self):
         return (self._provider.azure_client.get_nic(nic_id)
                 for nic_id in self._nic_ids)
@@ -1101,6 +1127,7 @@ class AzureInstance(BaseInstance):
         return self._vm.hardware_profile.vm_size
 
     @property
+    @prefetchable
     def vm_type(self):
         """
         Get the instance type.
@@ -1151,6 +1178,7 @@ class AzureInstance(BaseInstance):
                 return ipc.subnet.id
 
     @property
+    @prefetchable
     def vm_firewalls(self):
         return [self._provider.security.vm_firewalls.get(group_id)
                 for group_id in self.vm_firewall_ids]
@@ -1322,6 +1350,7 @@ class AzureInstance(BaseInstance):
         Refreshes the state of this instance by re-querying the cloud provider
         for its latest state.
         """
+        self._prefetched.clear()
         try:
             self._vm = self._provider.azure_client.get_vm(self.id)
             if not self._vm.tags:
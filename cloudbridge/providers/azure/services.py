@@ -9,7 +9,10 @@ from msrestazure.azure_exceptions import CloudError
 
 import cloudbridge.base.helpers as cb_helpers
 from cloudbridge.base.middleware import dispatch
+from cloudbridge.base.query import QueryPlanner
+from cloudbridge.base.query import prefix_pushdown
 from cloudbridge.base.resources import ClientPagedResultList
+from cloudbridge.base.resources import LazyClientPagedResultList
 from cloudbridge.base.resources import ServerPagedResultList
 from cloudbridge.base.services import BaseBucketObjectService
 from cloudbridge.base.services import BaseBucketService
@@ -569,6 +572,9 @@ class AzureBucketService(BaseBucketService):
 
 
 class AzureBucketObjectService(BaseBucketObjectService):
+
+    _find_planner = QueryPlanner(['name'], {'name': prefix_pushdown('prefix')})
+
     def __init__(self, provider):
         super(AzureBucketObjectService, self).__init__(provider)
 
@@ -591,26 +597,41 @@ class AzureBucketObjectService(BaseBucketObjectService):
         :rtype: BucketObject
         :return: List of all available BucketObjects within this bucket.
         """
-        objects = [AzureBucketObject(self.provider, bucket, obj)
-                   for obj in
-                   self.provider.azure_client.list_blobs(
-                       bucket.name, prefix=prefix)]
-        return ClientPagedResultList(self.provider, objects,
-                                     limit=limit, marker=marker)
+        def objects(_):
+            # Blob listings are fetched a page at a time as they are
+            # iterated, but cannot start from an arbitrary blob name.
+            return (AzureBucketObject(self.provider, bucket, obj)
+                    for obj in self.provider.azure_client.list_blobs(
+                        bucket.name, prefix=prefix))
+        return LazyClientPagedResultList(self.provider, objects,
+                                         limit=limit, marker=marker,
+                                         seekable=False)
 
     def find(self, bucket, **kwargs):
-        obj_list = [AzureBucketObject(self.provider, bucket, obj)
-                    for obj in
-                    self.provider.azure_client.list_blobs(bucket.name)]
-        filters = ['name']
-        matches = cb_helpers.generic_find(filters, kwargs, obj_list)
-        return ClientPagedResultList(self.provider, list(matches))
+        plan = self._plan_find(bucket, **kwargs)
+        obj_list = (AzureBucketObject(self.provider, bucket, obj)
+                    for obj in self.provider.azure_client.list_blobs(
+                        bucket.name,
+                        prefix=plan.native_filters.get('prefix')))
+        return ClientPagedResultList(self.provider,
+                                     list(plan.filter(obj_list)))
 
     def create(self, bucket, name):
         self.provider.azure_client.create_blob_from_text(
             bucket.name, name, '')
         return self.get(bucket, name)
 
+    def _delete_batch(self, bucket, names):
+        # The blob service has no batch delete, so blobs are deleted
+        # individually, with batches of one blob running concurrently
+        failures = {}
+        for name in names:
+            try:
+                self.provider.azure_client.delete_blob(bucket.name, name)
+            except AzureException as e:
+                failures[name] = str(e)
+        return failures
+
 
 class AzureComputeService(BaseComputeService):
     def __init__(self, provider):
@@ -825,8 +846,15 @@ class AzureInstanceService(BaseInstanceService):
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def create(self, label, image, vm_type, subnet,
                key_pair=None, vm_firewalls=None, user_data=None,
-               launch_config=None, **kwargs):
+               launch_config=None, count=None, **kwargs):
         AzureInstance.assert_valid_resource_label(label)
+        if count is not None:
+            # Azure has no multiple create for standalone VMs, so each VM
+            # and its network interface are created concurrently
+            return self._create_concurrently(
+                count, label, image, vm_type, subnet, key_pair=key_pair,
+                vm_firewalls=vm_firewalls, user_data=user_data,
+                launch_config=launch_config, **kwargs)
         instance_name = AzureInstance._generate_name_from_label(label,
                                                                 "cb-ins")
 
@@ -954,14 +982,52 @@ class AzureInstanceService(BaseInstanceService):
 
     @dispatch(event="provider.compute.instances.list",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
-    def list(self, limit=None, marker=None):
+    def list(self, limit=None, marker=None, prefetch=None):
         """
         List all instances.
         """
         instances = [AzureInstance(self.provider, inst)
                      for inst in self.provider.azure_client.list_vm()]
-        return ClientPagedResultList(self.provider, instances,
-                                     limit=limit, marker=marker)
+        return self._prefetch(
+            ClientPagedResultList(self.provider, instances,
+                                  limit=limit, marker=marker),
+            prefetch)
+
+    # The relationships which are resolved through the network interfaces
+    # of an instance
+    NIC_RELATIONS = ('vm_firewalls', 'subnet', 'floating_ips')
+
+    def _prefetch(self, instances, relations):
+        if (instances and relations and
+                any(r in self.NIC_RELATIONS for r in relations)):
+            # Fetch the network interfaces of all instances with a single
+            # listing, instead of one call per interface per instance
+            nics = dict((nic.id.lower(), nic) for nic
+                        in self.provider.azure_client.list_nics())
+            for inst in instances:
+                # pylint:disable=protected-access
+                inst._prefetched['_nics'] = [
+                    nics.get(nic_id.lower()) or
+                    self.provider.azure_client.get_nic(nic_id)
+                    for nic_id in inst._nic_ids]
+        return super(AzureInstanceService, self)._prefetch(instances,
+                                                           relations)
+
+    def _resolve_vm_firewalls(self, instances):
+        firewalls = dict((fw.id.lower(), fw)
+                         for fw in self.provider.security.vm_firewalls)
+        return dict((inst.id, [firewalls[fw_id.lower()]
+                               for fw_id in inst.vm_firewall_ids
+                               if fw_id.lower() in firewalls])
+                    for inst in instances)
+
+    def _resolve_floating_ips(self, instances):
+        fips = dict((fip.id.lower(), fip) for fip in self._list_floating_ips())
+        # pylint:disable=protected-access
+        return dict((inst.id, [fips[pip_id.lower()]
+                               for pip_id in inst._public_ip_ids
+                               if pip_id.lower() in fips])
+                    for inst in instances)
 
     @dispatch(event="provider.compute.instances.get",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
@@ -2,10 +2,17 @@ import re
 
 from googleapiclient.errors import HttpError
 
+import six
+
 import tenacity
 
+from cloudbridge.base.query import Pushdown
+from cloudbridge.base.query import glob_to_regex
 from cloudbridge.interfaces.exceptions import ProviderInternalException
 
+# Filter values which can be written in a list filter without quoting
+_FILTER_VALUE_REGEX = re.compile(r'^[-\w.*?]+$')
+
 
 def gcp_projects(provider):
     return provider.gcp_compute.projects()
@@ -22,6 +29,58 @@ def iter_all(resource, **kwargs):
         token = response['nextPageToken']
 
 
+def filter_pushdown(field, search=False):
+    """
+    Returns a ``find()`` translator to a ``field eq regex`` expression in a
+    GCE list filter. Values which cannot be written in a filter without
+    quoting are left to the client.
+
+    GCE matches the expression against the whole field. For services which
+    have always searched for patterns client-side, ``search`` should be
+    ``True``, so that the filter also selects longer values which end with
+    a match. Patterns are also filtered client-side, as the RE2 dialect of
+    the server differs from Python's, but a literal value matched against
+    the whole field is an exact filter.
+    """
+    def translate(value):
+        if not (isinstance(value, six.string_types) and
+                _FILTER_VALUE_REGEX.match(value)):
+            return None
+        regex = glob_to_regex(value)
+        if search:
+            return Pushdown(field, '.*' + regex, exact=False)
+        return Pushdown(field, regex,
+                        exact=not any(c in value for c in '*?'))
+    return translate
+
+
+def to_list_filter(native_filters):
+    """
+    Combines native filters into a GCE list filter, or returns ``None`` if
+    there are none.
+    """
+    return ' '.join('({0} eq {1})'.format(field, regex)
+                    for field, regex in native_filters.items()) or None
+
+
+def get_many_in_zone(service, resource_ids):
+    """
+    Returns the resources corresponding to a list of ids (selfLinks or names)
+    for a zonal resource service. Resources in the provider's zone are
+    fetched with a single zone-scoped listing, and only ids that refer to
+    another zone are fetched individually.
+    """
+    zone_resources = {}
+    for res in service:
+        zone_resources[res.id] = res
+        zone_resources[res.name] = res
+    zone_path = '/zones/{0}/'.format(service.provider.zone_name)
+    return [zone_resources.get(res_id)
+            if res_id in zone_resources or '/' not in res_id
+            or zone_path in res_id else service.get(res_id)
+            for res_id in resource_ids]
+
+
 def get_common_metadata(provider):
     """
     Get a project's commonInstanceMetadata entry
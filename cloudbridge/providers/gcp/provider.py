@@ -6,17 +6,26 @@ import json
 import logging
 import os
 import re
+import threading
 import time
+from collections import OrderedDict
 from string import Template
 
+import cachetools
+
 import googleapiclient
 from googleapiclient import discovery
 
+import httplib2
+
 from oauth2client.client import GoogleCredentials
 from oauth2client.service_account import ServiceAccountCredentials
 
 from cloudbridge.base import BaseCloudProvider
+from cloudbridge.base import helpers as cb_helpers
+from cloudbridge.base.clients import ClientPool
 from cloudbridge.interfaces.exceptions import ProviderConnectionException
+from cloudbridge.interfaces.exceptions import WaitStateException
 
 from .services import GCPComputeService
 from .services import GCPDnsService
@@ -61,12 +70,112 @@ class GCPResourceUrl(object):
         return discovery_object.get(**self.parameters).execute()
 
 
+class _RouteNode(object):
+    """
+    A node in the segment trie used by :class:`GCPResources` to route URL
+    paths. Literal path segments lead to ``children``, parameters lead to
+    ``wildcard``, and ``resources`` holds the resources whose path ends here.
+    """
+    __slots__ = ('children', 'wildcard', 'resources')
+
+    def __init__(self):
+        self.children = {}
+        self.wildcard = None
+        self.resources = []
+
+
 class GCPResources(object):
 
-    def __init__(self, connection, **kwargs):
-        self._connection = connection
+    # The number of parsed URLs to remember. Resources refer to a small set
+    # of zones, regions, networks and machine types, so this is plenty.
+    PARSE_CACHE_SIZE = 1024
+
+    # Parameter patterns which may match a "/", so that a resource using
+    # them cannot be routed by path segment.
+    _MULTI_SEGMENT_REGEX = re.compile(
+        r'/|(?<!\\)\.|\\S|\\W|\\D|\[\^(?![^\]]*/)')
+
+    def __init__(self, connection, resource_table=None, **kwargs):
+        """
+        ``connection`` is a discovery service object, or a function
+        returning the service object of the calling thread.
+        """
+        self._get_connection = (connection if callable(connection)
+                                else lambda: connection)
         self._parameter_defaults = kwargs
 
+        # pylint:disable=protected-access
+        desc = self._connection._resourceDesc
+        self.RESOURCE_REGEX = re.compile(
+            r"(https://.*\.googleapis\.com/{0})(.*)".format(
+                desc['servicePath']))
+        if resource_table is None:
+            resource_table = self.compile_table(self.build_table(desc))
+        self._resources = resource_table
+        self._router, self._unrouted = self._build_router(resource_table)
+        self._parse_cache = cachetools.LRUCache(maxsize=self.PARSE_CACHE_SIZE)
+        self._parse_cache_lock = threading.Lock()
+
+    @property
+    def _connection(self):
+        return self._get_connection()
+
+    @classmethod
+    def _build_router(cls, resources):
+        """
+        Builds a trie of the resource paths, split into segments. Returns the
+        trie, and the resources which could not be added to it because their
+        parameters may span several segments, in table order.
+        """
+        root = _RouteNode()
+        unrouted = []
+        for order, (resource, entry) in enumerate(resources.items()):
+            path = entry.get('path')
+            if not path or '{+' in path or cls._MULTI_SEGMENT_REGEX.search(
+                    entry.get('parameter_patterns', '')):
+                unrouted.append((order, resource))
+                continue
+            node = root
+            for segment in path.split('/'):
+                if '{' in segment:
+                    if node.wildcard is None:
+                        node.wildcard = _RouteNode()
+                    node = node.wildcard
+                else:
+                    node = node.children.setdefault(segment, _RouteNode())
+            node.resources.append((order, resource))
+        return root, unrouted
+
+    def _route(self, path):
+        """
+        Returns the resources whose path template fits the given path, in
+        table order.
+        """
+        segments = path.split('/')
+        candidates = list(self._unrouted)
+        nodes = [self._router]
+        for segment in segments:
+            next_nodes = []
+            for node in nodes:
+                child = node.children.get(segment)
+                if child is not None:
+                    next_nodes.append(child)
+                if node.wildcard is not None:
+                    next_nodes.append(node.wildcard)
+            nodes = next_nodes
+            if not nodes:
+                break
+        for node in nodes:
+            candidates.extend(node.resources)
+        return [resource for _, resource in sorted(candidates)]
+
+    @staticmethod
+    def build_table(desc):
+        """
+        Builds the URL table for the resources in a discovery document. The
+        table maps each resource with a ``get`` method to its parameters and
+        to the regex pattern of its URL path, and can be stored as JSON.
+        """
         # Resource descriptions are already pulled into the internal
         # _resourceDesc field of the connection.
         #
@@ -103,14 +212,8 @@ class GCPResources(object):
         #   }
         #   ...
         # }
-        # pylint:disable=protected-access
-        desc = connection._resourceDesc
-        self.RESOURCE_REGEX = re.compile(
-            r"(https://.*\.googleapis\.com/{0})(.*)".format(
-                desc['servicePath']))
-        self._resources = {}
-
-        # We will not mutate self._desc; it's OK to use items() in Python 2.x.
+        table = {}
+        # We will not mutate desc; it's OK to use items() in Python 2.x.
         for resource, resource_desc in desc['resources'].items():
             methods = resource_desc.get('methods', {})
             if not methods.get('get'):
@@ -121,19 +224,41 @@ class GCPResources(object):
             # We would like to change a path like
             # {project}/regions/{region}/addresses/{address} to a pattern like
             # (PROJECT REGEX)/regions/(REGION REGEX)/addresses/(ADDRESS REGEX).
-            template = Template('${'.join(method['path'].split('{')))
+            # Parameters written as {+name} are expanded as is, and may
+            # contain slashes.
+            path = method['path']
+            reserved = set(re.findall(r'{\+(\w+)}', path))
+            template = Template('${'.join(path.replace('{+', '{').split('{')))
             mapping = {}
             for parameter in parameters:
                 parameter_desc = method['parameters'][parameter]
                 if 'pattern' in parameter_desc:
                     mapping[parameter] = '(%s)' % parameter_desc['pattern']
+                elif parameter in reserved:
+                    mapping[parameter] = '(.+)'
                 else:
                     mapping[parameter] = '([^/]+)'
-            pattern = template.substitute(**mapping)
 
-            # Store the parameters and the regex pattern of this resource.
-            self._resources[resource] = {'parameters': parameters,
-                                         'pattern': re.compile(pattern)}
+            # Store the parameters and the regex pattern of this resource,
+            # along with its path template and the parameter patterns, which
+            # are used to route URLs by path segment.
+            table[resource] = {
+                'parameters': parameters,
+                'pattern': template.substitute(**mapping),
+                'path': method['path'],
+                'parameter_patterns': ' '.join(
+                    method['parameters'][parameter].get('pattern', '')
+                    for parameter in parameters)}
+        return table
+
+    @staticmethod
+    def compile_table(table):
+        """
+        Compiles the patterns of a table returned by :meth:`build_table`.
+        """
+        return OrderedDict(
+            (resource, dict(entry, pattern=re.compile(entry['pattern'])))
+            for resource, entry in table.items())
 
     def parse_url(self, url):
         """
@@ -154,18 +279,38 @@ class GCPResources(object):
              'subnetwork': 'testsubnet-2'}
         """
         url = url.strip()
+        with self._parse_cache_lock:
+            parsed = self._parse_cache.get(url, False)
+        if parsed is False:
+            parsed = self._parse_path(url)
+            with self._parse_cache_lock:
+                self._parse_cache[url] = parsed
+        if parsed is None:
+            return None
+        # Return a new object each time, since callers may modify it
+        resource, parameters = parsed
+        out = GCPResourceUrl(resource, self._connection)
+        out.parameters.update(parameters)
+        return out
+
+    def _parse_path(self, url):
+        """
+        Returns the resource name and parameters for a URL, or ``None`` if
+        it does not refer to a known resource.
+        """
         m = self.RESOURCE_REGEX.match(url)
         if m:
             url = m.group(2)
 
-        for resource, desc in self._resources.items():
-            m = re.match(desc['pattern'], url)
+        for resource in self._route(url):
+            desc = self._resources[resource]
+            m = desc['pattern'].match(url)
             if m is None or len(m.group(0)) < len(url):
                 continue
-            out = GCPResourceUrl(resource, self._connection)
-            for index, parameter in enumerate(desc['parameters']):
-                out.parameters[parameter] = m.group(index + 1)
-            return out
+            return resource, dict(
+                (parameter, m.group(index + 1))
+                for index, parameter in enumerate(desc['parameters']))
+        return None
 
     def get_resource_url_with_default(self, resource, url_or_name, **kwargs):
         """
@@ -193,9 +338,113 @@ class GCPResources(object):
         return parsed_url
 
 
+class GCPDiscoveryCache(object):
+    """
+    Discovery documents for the GCP APIs, together with the URL tables of
+    :class:`GCPResources` derived from them.
+
+    Documents are kept in an on-disk cache shared between processes, keyed by
+    API name, API version, googleapiclient version and entry format, so that
+    building a service needs no discovery round-trip once the cache is warm.
+    Within a process, documents and compiled URL tables are also shared
+    between providers. A cached document older than ``ttl`` seconds is fetched
+    again, falling back to the stale copy if that fails.
+    """
+
+    DEFAULT_TTL = 24 * 3600
+    # The version of the cache entry format, which must be changed whenever
+    # the URL tables built by GCPResources change, so that entries written
+    # by other versions of cloudbridge are not used.
+    CACHE_FORMAT = 2
+
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, cache_dir=None, ttl=DEFAULT_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @classmethod
+    def get_cache(cls, cache_dir=None):
+        """
+        Returns the discovery cache for the given cache directory, shared by
+        all providers in this process.
+        """
+        with cls._caches_lock:
+            if cache_dir not in cls._caches:
+                cls._caches[cache_dir] = cls(cache_dir)
+            return cls._caches[cache_dir]
+
+    @classmethod
+    def _cache_name(cls, api, version):
+        return 'gcp-discovery-v{0}-{1}-{2}-{3}.json'.format(
+            cls.CACHE_FORMAT, api, version, googleapiclient.__version__)
+
+    def _is_fresh(self, entry):
+        return bool(entry and
+                    time.time() - entry.get('fetched_at', 0) < self.ttl)
+
+    def build(self, api, version, credentials):
+        """
+        Returns a googleapiclient service object for the given API, and its
+        compiled URL table.
+        """
+        service = None
+        with self._lock:
+            entry = self._entries.get((api, version))
+            if not self._is_fresh(entry):
+                entry, service = self._load(api, version, credentials)
+                self._entries[(api, version)] = entry
+        if service is None:
+            service = discovery.build_from_document(entry['document'],
+                                                    credentials=credentials)
+        return service, entry['compiled']
+
+    def _load(self, api, version, credentials):
+        """
+        Returns the cache entry for an API, and the service object if one
+        had to be built to fetch its discovery document.
+        """
+        name = self._cache_name(api, version)
+        entry = cb_helpers.read_cached_json(self.cache_dir, name)
+        service = None
+        if self._is_fresh(entry):
+            log.debug("Using the cached discovery document for %s %s",
+                      api, version)
+        else:
+            try:
+                service = discovery.build(api, version,
+                                          credentials=credentials,
+                                          cache_discovery=False)
+            except Exception as e:
+                if not entry:
+                    raise
+                log.warning("Could not refresh the discovery document for"
+                            " %s %s, using a cached copy: %s",
+                            api, version, e)
+            else:
+                # pylint:disable=protected-access
+                document = service._resourceDesc
+                entry = {'fetched_at': time.time(),
+                         'document': document,
+                         'resources': GCPResources.build_table(document)}
+                cb_helpers.write_cached_json(self.cache_dir, name, entry)
+        entry['compiled'] = GCPResources.compile_table(entry['resources'])
+        return entry, service
+
+
 class GCPCloudProvider(BaseCloudProvider):
 
     PROVIDER_ID = 'gcp'
+    REGION_CONFIG_KEY = 'gcp_region_name'
+    API_FAMILIES = (
+        ('provider.storage.buckets', 'storage'),
+        ('provider.storage._bucket_objects', 'storage'),
+        ('provider.dns', 'dns'),
+        ('provider', 'compute')
+    )
 
     def __init__(self, config):
         super(GCPCloudProvider, self).__init__(config)
@@ -234,10 +483,17 @@ class GCPCloudProvider(BaseCloudProvider):
         else:
             self.project_name = os.environ.get('GCP_PROJECT_NAME')
 
-        # service connections, lazily initialized
-        self._gcp_compute = None
-        self._gcp_storage = None
-        self._gcp_dns = None
+        # service connections, lazily initialized. Service objects share
+        # one set of credentials, but each has its own HTTP connection, which
+        # is not thread safe, so each thread uses its own, from a pool.
+        self._credentials_lock = threading.Lock()
+        self._gcp_compute_pool = ClientPool(self._connect_gcp_compute,
+                                            self.config.client_pool_size)
+        self._gcp_storage_pool = ClientPool(self._connect_gcp_storage,
+                                            self.config.client_pool_size)
+        self._gcp_dns_pool = ClientPool(self._connect_gcp_dns,
+                                        self.config.client_pool_size)
+        self._resource_tables = {}
         self._compute_resources_cache = None
         self._storage_resources_cache = None
         self._dns_resources_cache = None
@@ -255,6 +511,17 @@ class GCPCloudProvider(BaseCloudProvider):
     def zone_name(self):
         return self._zone_name
 
+    def _create_region_provider(self, region_name, provider_class=None):
+        provider = super(GCPCloudProvider, self)._create_region_provider(
+            region_name, provider_class)
+        # Services are scoped to a zone, which is not derived from the region
+        # on demand, so use the region's default zone.
+        region = self.compute.regions.get(region_name)
+        zone = region.default_zone if region else None
+        provider._zone_name = zone.name if zone else None
+        provider.credentials_obj = self._credentials
+        return provider
+
     @property
     def compute(self):
         return self._compute
@@ -277,27 +544,32 @@ class GCPCloudProvider(BaseCloudProvider):
 
     @property
     def gcp_compute(self):
-        if not self._gcp_compute:
-            self._gcp_compute = self._connect_gcp_compute()
-        return self._gcp_compute
+        return self._gcp_compute_pool.get()
 
     @property
     def gcp_storage(self):
-        if not self._gcp_storage:
-            self._gcp_storage = self._connect_gcp_storage()
-        return self._gcp_storage
+        return self._gcp_storage_pool.get()
 
     @property
     def gcp_dns(self):
-        if not self._gcp_dns:
-            self._gcp_dns = self._connect_gcp_dns()
-        return self._gcp_dns
+        return self._gcp_dns_pool.get()
+
+    def _build_resources(self, api, pool, **kwargs):
+        """
+        Returns the URL table of an API, which looks up resources with the
+        service object of the calling thread.
+        """
+        # Building a service object loads the resource table of its API
+        pool.get()
+        return GCPResources(pool.get,
+                            resource_table=self._resource_tables.get(api),
+                            **kwargs)
 
     @property
     def _compute_resources(self):
         if not self._compute_resources_cache:
-            self._compute_resources_cache = GCPResources(
-                    self.gcp_compute,
+            self._compute_resources_cache = self._build_resources(
+                    'compute', self._gcp_compute_pool,
                     project=self.project_name,
                     region=self.region_name,
                     zone=self.zone_name)
@@ -306,29 +578,39 @@ class GCPCloudProvider(BaseCloudProvider):
     @property
     def _storage_resources(self):
         if not self._storage_resources_cache:
-            self._storage_resources_cache = GCPResources(self.gcp_storage)
+            self._storage_resources_cache = self._build_resources(
+                'storage', self._gcp_storage_pool)
         return self._storage_resources_cache
 
     @property
     def _dns_resources(self):
         if not self._dns_resources_cache:
-            self._dns_resources_cache = GCPResources(
-                self.gcp_dns,
-                project=self.project_name)
+            self._dns_resources_cache = self._build_resources(
+                'dns', self._gcp_dns_pool, project=self.project_name)
         return self._dns_resources_cache
 
     @property
     def _credentials(self):
         if not self.credentials_obj:
-            if self.credentials_dict:
-                self.credentials_obj = (
-                        ServiceAccountCredentials.from_json_keyfile_dict(
-                                self.credentials_dict))
-            else:
-                self.credentials_obj = (
-                        GoogleCredentials.get_application_default())
+            with self._credentials_lock:
+                if not self.credentials_obj:
+                    self.credentials_obj = self._load_credentials()
         return self.credentials_obj
 
+    def _load_credentials(self):
+        if self.credentials_dict:
+            return ServiceAccountCredentials.from_json_keyfile_dict(
+                self.credentials_dict)
+        return GoogleCredentials.get_application_default()
+
+    def _authorized_http(self):
+        """
+        Returns a new authorized HTTP connection. httplib2 connections are
+        not thread safe, so requests issued concurrently must each use their
+        own.
+        """
+        return self._credentials.authorize(httplib2.Http())
+
     def sign_blob(self, string_to_sign):
         return self._credentials.sign_blob(string_to_sign)[1]
 
@@ -336,17 +618,20 @@ class GCPCloudProvider(BaseCloudProvider):
     def client_id(self):
         return self._credentials.service_account_email
 
+    def _build_service(self, api, version):
+        service, resource_table = GCPDiscoveryCache.get_cache(
+            self.config.cache_dir).build(api, version, self._credentials)
+        self._resource_tables[api] = resource_table
+        return service
+
     def _connect_gcp_storage(self):
-        return discovery.build('storage', 'v1', credentials=self._credentials,
-                               cache_discovery=False)
+        return self._build_service('storage', 'v1')
 
     def _connect_gcp_compute(self):
-        return discovery.build('compute', 'v1', credentials=self._credentials,
-                               cache_discovery=False)
+        return self._build_service('compute', 'v1')
 
     def _connect_gcp_dns(self):
-        return discovery.build('dns', 'v1', credentials=self._credentials,
-                               cache_discovery=False)
+        return self._build_service('dns', 'v1')
 
     def wait_for_operation(self, operation, region=None, zone=None):
         args = {'project': self.project_name, 'operation': operation['name']}
@@ -359,14 +644,20 @@ class GCPCloudProvider(BaseCloudProvider):
             operations = self.gcp_compute.regionOperations()
             args['region'] = region
 
-        while True:
-            result = operations.get(**args).execute()
-            if result['status'] == 'DONE':
-                if 'error' in result:
-                    raise Exception(result['error'])
-                return result
-
-            time.sleep(0.5)
+        waiter = self._create_waiter(
+            description="operation {0}".format(operation['name']))
+        with waiter:
+            while True:
+                result = operations.get(**args).execute()
+                if result['status'] == 'DONE':
+                    if 'error' in result:
+                        raise Exception(result['error'])
+                    return result
+
+                if not waiter.next_poll():
+                    raise WaitStateException(
+                        "Waited too long for operation: {0} to"
+                        " complete".format(operation['name']))
 
     def parse_url(self, url):
         out = self._compute_resources.parse_url(url)
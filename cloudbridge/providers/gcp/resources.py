@@ -15,6 +15,7 @@ from collections import namedtuple
 
 import googleapiclient
 
+from cloudbridge.base import transfer as cb_transfer
 from cloudbridge.base.resources import BaseAttachmentInfo
 from cloudbridge.base.resources import BaseBucket
 from cloudbridge.base.resources import BaseBucketObject
@@ -36,6 +37,7 @@ from cloudbridge.base.resources import BaseVMFirewall
 from cloudbridge.base.resources import BaseVMFirewallRule
 from cloudbridge.base.resources import BaseVMType
 from cloudbridge.base.resources import BaseVolume
+from cloudbridge.base.resources import prefetchable
 from cloudbridge.interfaces.resources import GatewayState
 from cloudbridge.interfaces.resources import InstanceState
 from cloudbridge.interfaces.resources import MachineImageState
@@ -875,6 +877,7 @@ class GCPInstance(BaseInstance):
         return self._gcp_instance.get('machineType')
 
     @property
+    @prefetchable
     def vm_type(self):
         """
         Get the instance type.
@@ -951,6 +954,7 @@ class GCPInstance(BaseInstance):
         return self._provider.parse_url(self.zone_id).parameters['zone']
 
     @property
+    @prefetchable
     def vm_firewalls(self):
         """
         Get the VM firewalls associated with this instance.
@@ -1236,6 +1240,7 @@ class GCPInstance(BaseInstance):
         Refreshes the state of this instance by re-querying the cloud provider
         for its latest state.
         """
+        self._prefetched.clear()
         inst = self._provider.compute.instances.get(self.id)
         if inst:
             # pylint:disable=protected-access
@@ -1244,6 +1249,20 @@ class GCPInstance(BaseInstance):
             # instance no longer exists
             self._gcp_instance['status'] = InstanceState.UNKNOWN
 
+    @classmethod
+    def _refresh_many(cls, instances):
+        # Refresh all instances with a single zone-scoped listing
+        # pylint:disable=protected-access
+        latest = instances[0]._provider.compute.instances.get_many(
+            [inst.id for inst in instances])
+        for inst, latest_inst in zip(instances, latest):
+            inst._prefetched.clear()
+            if latest_inst:
+                inst._gcp_instance = latest_inst._gcp_instance
+            else:
+                # instance no longer exists
+                inst._gcp_instance['status'] = InstanceState.UNKNOWN
+
     def add_vm_firewall(self, sg):
         tag = sg.name if isinstance(sg, GCPVMFirewall) else sg
         tags = self._gcp_instance.get('tags', {}).get('items', [])
@@ -1785,6 +1804,19 @@ class GCPVolume(BaseVolume):
             # volume no longer exists
             self._volume['status'] = VolumeState.UNKNOWN
 
+    @classmethod
+    def _refresh_many(cls, volumes):
+        # Refresh all volumes with a single zone-scoped listing
+        # pylint:disable=protected-access
+        latest = volumes[0]._provider.storage.volumes.get_many(
+            [vol.id for vol in volumes])
+        for vol, latest_vol in zip(volumes, latest):
+            if latest_vol:
+                vol._volume = latest_vol._volume
+            else:
+                # volume no longer exists
+                vol._volume['status'] = VolumeState.UNKNOWN
+
 
 class GCPSnapshot(BaseSnapshot):
 
@@ -1909,6 +1941,10 @@ class GCPSnapshot(BaseSnapshot):
 
 class GCPBucketObject(BaseBucketObject):
 
+    # A composite object can be assembled from at most 32 source objects
+    # in a single compose request
+    MAX_COMPOSE_SOURCES = 32
+
     def __init__(self, provider, bucket, obj):
         super(GCPBucketObject, self).__init__(provider)
         self._bucket = bucket
@@ -1930,13 +1966,25 @@ class GCPBucketObject(BaseBucketObject):
     def last_modified(self):
         return self._obj['updated']
 
+    def _iter_media_chunks(self):
+        request = (self._provider
+                       .gcp_storage
+                       .objects()
+                       .get_media(bucket=self._obj['bucket'],
+                                  object=self.name))
+        buf = io.BytesIO()
+        downloader = googleapiclient.http.MediaIoBaseDownload(
+            buf, request, chunksize=self._provider.config.default_chunk_size)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+            # Hand over each chunk and reuse the buffer for the next one
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
     def iter_content(self):
-        return io.BytesIO(self._provider
-                              .gcp_storage
-                              .objects()
-                              .get_media(bucket=self._obj['bucket'],
-                                         object=self.name)
-                              .execute())
+        return cb_transfer.ChunkedReader(self._iter_media_chunks())
 
     def upload(self, data):
         """
@@ -1999,6 +2047,74 @@ class GCPBucketObject(BaseBucketObject):
         # pylint:disable=protected-access
         self._obj = self.bucket.objects.get(self.id)._obj
 
+    def _begin_multipart_upload(self):
+        # Parts are uploaded as temporary objects and then composed into
+        # this object
+        return {'prefix': '{0}.cbpart-{1}/'.format(self.name,
+                                                   uuid.uuid4().hex[:8]),
+                'parts': []}
+
+    def _upload_part(self, upload, part_number, data):
+        name = '{0}{1:05d}'.format(upload['prefix'], part_number)
+        media_body = googleapiclient.http.MediaIoBaseUpload(
+            io.BytesIO(data), 'application/octet-stream')
+        # Each concurrent request needs its own connection
+        # pylint:disable=protected-access
+        (self._provider
+             .gcp_storage
+             .objects()
+             .insert(bucket=self._obj['bucket'], body={'name': name},
+                     media_body=media_body)
+             .execute(http=self._provider._authorized_http()))
+        upload['parts'].append(name)
+        return name
+
+    def _compose(self, sources, name):
+        return (self._provider
+                    .gcp_storage
+                    .objects()
+                    .compose(destinationBucket=self._obj['bucket'],
+                             destinationObject=name,
+                             body={'sourceObjects': [{'name': source}
+                                                     for source in sources]})
+                    .execute())
+
+    def _complete_multipart_upload(self, upload, parts):
+        level = 0
+        while len(parts) > self.MAX_COMPOSE_SOURCES:
+            composed = []
+            for i in range(0, len(parts), self.MAX_COMPOSE_SOURCES):
+                name = '{0}composed-{1}-{2:05d}'.format(
+                    upload['prefix'], level, i)
+                self._compose(parts[i:i + self.MAX_COMPOSE_SOURCES], name)
+                upload['parts'].append(name)
+                composed.append(name)
+            parts = composed
+            level += 1
+        self._obj = self._compose(parts, self.name)
+        self._abort_multipart_upload(upload)
+
+    def _abort_multipart_upload(self, upload):
+        for name in upload['parts']:
+            try:
+                (self._provider
+                     .gcp_storage
+                     .objects()
+                     .delete(bucket=self._obj['bucket'], object=name)
+                     .execute())
+            except googleapiclient.errors.HttpError as e:
+                log.warning("Could not delete temporary part %s: %s",
+                            name, e)
+
+    def _read_range(self, start, end):
+        request = (self._provider
+                       .gcp_storage
+                       .objects()
+                       .get_media(bucket=self._obj['bucket'],
+                                  object=self.name))
+        request.headers['Range'] = 'bytes={0}-{1}'.format(start, end)
+        return request.execute(http=self._provider._authorized_http())
+
 
 class GCPBucket(BaseBucket):
 
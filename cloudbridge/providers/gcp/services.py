@@ -9,6 +9,8 @@ import googleapiclient
 
 from cloudbridge.base import helpers as cb_helpers
 from cloudbridge.base.middleware import dispatch
+from cloudbridge.base.query import QueryPlanner
+from cloudbridge.base.query import prefix_pushdown
 from cloudbridge.base.resources import ClientPagedResultList
 from cloudbridge.base.resources import ServerPagedResultList
 from cloudbridge.base.services import BaseBucketObjectService
@@ -466,6 +468,9 @@ class GCPImageService(BaseImageService):
 
 class GCPInstanceService(BaseInstanceService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': helpers.filter_pushdown('labels.cblabel')})
+
     def __init__(self, provider):
         super(GCPInstanceService, self).__init__(provider)
 
@@ -473,11 +478,18 @@ class GCPInstanceService(BaseInstanceService):
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def create(self, label, image, vm_type, subnet,
                key_pair=None, vm_firewalls=None, user_data=None,
-               launch_config=None, **kwargs):
+               launch_config=None, count=None, **kwargs):
         """
         Creates a new virtual machine instance.
         """
         GCPInstance.assert_valid_resource_name(label)
+        if count is not None:
+            # Each instance is inserted with its own name and boot disk, so
+            # the inserts are run concurrently
+            return self._create_concurrently(
+                count, label, image, vm_type, subnet, key_pair=key_pair,
+                vm_firewalls=vm_firewalls, user_data=user_data,
+                launch_config=launch_config, **kwargs)
         zone_name = self.provider.zone_name
         if not isinstance(vm_type, GCPVMType):
             vm_type = self.provider.compute.vm_types.get(vm_type)
@@ -631,6 +643,11 @@ class GCPInstanceService(BaseInstanceService):
         instance = self.provider.get_resource('instances', instance_id)
         return GCPInstance(self.provider, instance) if instance else None
 
+    @dispatch(event="provider.compute.instances.get_many",
+              priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, instance_ids):
+        return helpers.get_many_in_zone(self, instance_ids)
+
     @dispatch(event="provider.compute.instances.find",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def find(self, limit=None, marker=None, **kwargs):
@@ -638,22 +655,20 @@ class GCPInstanceService(BaseInstanceService):
         Searches for instances by instance label.
         :return: a list of Instance objects
         """
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        instances = [instance for instance in self.list()
-                     if instance.label == label]
-        return ClientPagedResultList(self.provider, instances,
+        plan = self._plan_find(**kwargs)
+        instances = (GCPInstance(self.provider, inst)
+                     for inst in helpers.iter_all(
+                         self.provider.gcp_compute.instances(),
+                         project=self.provider.project_name,
+                         zone=self.provider.zone_name,
+                         filter=helpers.to_list_filter(plan.native_filters)))
+        return ClientPagedResultList(self.provider,
+                                     list(plan.filter(instances)),
                                      limit=limit, marker=marker)
 
     @dispatch(event="provider.compute.instances.list",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
-    def list(self, limit=None, marker=None):
+    def list(self, limit=None, marker=None, prefetch=None):
         """
         List all instances.
         """
@@ -673,9 +688,34 @@ class GCPInstanceService(BaseInstanceService):
         if len(instances) > max_result:
             log.warning('Expected at most %d results; got %d',
                         max_result, len(instances))
-        return ServerPagedResultList('nextPageToken' in response,
-                                     response.get('nextPageToken'),
-                                     False, data=instances)
+        return self._prefetch(
+            ServerPagedResultList('nextPageToken' in response,
+                                  response.get('nextPageToken'),
+                                  False, data=instances),
+            prefetch)
+
+    def _resolve_vm_firewalls(self, instances):
+        # Firewalls are matched by network and tags, so instances sharing
+        # both share their firewalls, which are looked up once
+        by_tags = {}
+        firewalls = {}
+        for inst in instances:
+            # pylint:disable=protected-access
+            gcp_instance = inst._gcp_instance
+            tags = gcp_instance.get('tags', {}).get('items')
+            if not tags:
+                firewalls[inst.id] = []
+                continue
+            network_url = gcp_instance['networkInterfaces'][0]['network']
+            network_name = self.provider.parse_url(
+                network_url).parameters['network']
+            key = (network_name, tuple(sorted(tags)))
+            if key not in by_tags:
+                by_tags[key] = (self.provider.security.vm_firewalls
+                                .find_by_network_and_tags(network_name,
+                                                          tags))
+            firewalls[inst.id] = by_tags[key]
+        return firewalls
 
     @dispatch(event="provider.compute.instances.delete",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
@@ -754,6 +794,10 @@ class GCPNetworkingService(BaseNetworkingService):
 
 class GCPNetworkService(BaseNetworkService):
 
+    _find_planner = QueryPlanner(
+        ['name', 'label'],
+        {'name': helpers.filter_pushdown('name', search=True)})
+
     def __init__(self, provider):
         super(GCPNetworkService, self).__init__(provider)
 
@@ -770,10 +814,14 @@ class GCPNetworkService(BaseNetworkService):
         GCP networks are global. There is at most one network with a given
         name.
         """
-        obj_list = self
-        filters = ['name', 'label']
-        matches = cb_helpers.generic_find(filters, kwargs, obj_list)
-        return ClientPagedResultList(self._provider, list(matches),
+        plan = self._plan_find(**kwargs)
+        obj_list = (GCPNetwork(self.provider, network)
+                    for network in helpers.iter_all(
+                        self.provider.gcp_compute.networks(),
+                        project=self.provider.project_name,
+                        filter=helpers.to_list_filter(plan.native_filters)))
+        return ClientPagedResultList(self._provider,
+                                     list(plan.filter(obj_list)),
                                      limit=limit, marker=marker)
 
     @dispatch(event="provider.networking.networks.list",
@@ -815,6 +863,8 @@ class GCPNetworkService(BaseNetworkService):
         cb_net.label = label
         return cb_net
 
+    @dispatch(event="provider.networking.networks.get_or_create_default",
+              priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self):
         default_nets = self.provider.networking.networks.find(
             label=GCPNetwork.CB_DEFAULT_NETWORK_LABEL)
@@ -855,6 +905,10 @@ class GCPNetworkService(BaseNetworkService):
 
 class GCPRouterService(BaseRouterService):
 
+    _find_planner = QueryPlanner(
+        ['name', 'label'],
+        {'name': helpers.filter_pushdown('name', search=True)})
+
     def __init__(self, provider):
         super(GCPRouterService, self).__init__(provider)
 
@@ -868,10 +922,15 @@ class GCPRouterService(BaseRouterService):
     @dispatch(event="provider.networking.routers.find",
               priority=BaseRouterService.STANDARD_EVENT_PRIORITY)
     def find(self, limit=None, marker=None, **kwargs):
-        obj_list = self
-        filters = ['name', 'label']
-        matches = cb_helpers.generic_find(filters, kwargs, obj_list)
-        return ClientPagedResultList(self._provider, list(matches),
+        plan = self._plan_find(**kwargs)
+        obj_list = (GCPRouter(self.provider, router)
+                    for router in helpers.iter_all(
+                        self.provider.gcp_compute.routers(),
+                        project=self.provider.project_name,
+                        region=self.provider.region_name,
+                        filter=helpers.to_list_filter(plan.native_filters)))
+        return ClientPagedResultList(self._provider,
+                                     list(plan.filter(obj_list)),
                                      limit=limit, marker=marker)
 
     @dispatch(event="provider.networking.routers.list",
@@ -1043,6 +1102,8 @@ class GCPSubnetService(BaseSubnetService):
             log.warning('No label was found associated with this subnet '
                         '"{}" when deleted.'.format(sn.name))
 
+    @dispatch(event="provider.networking.subnets.get_or_create_default",
+              priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self):
         """
         Return an existing or create a new subnet in the provider default zone.
@@ -1116,6 +1177,9 @@ class GCPStorageService(BaseStorageService):
 
 class GCPVolumeService(BaseVolumeService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': helpers.filter_pushdown('labels.cblabel')})
+
     def __init__(self, provider):
         super(GCPVolumeService, self).__init__(provider)
 
@@ -1125,21 +1189,29 @@ class GCPVolumeService(BaseVolumeService):
         vol = self.provider.get_resource('disks', volume_id)
         return GCPVolume(self.provider, vol) if vol else None
 
+    @dispatch(event="provider.storage.volumes.get_many",
+              priority=BaseVolumeService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, volume_ids):
+        return helpers.get_many_in_zone(self, volume_ids)
+
     @dispatch(event="provider.storage.volumes.find",
               priority=BaseVolumeService.STANDARD_EVENT_PRIORITY)
     def find(self, limit=None, marker=None, **kwargs):
         """
         Searches for a volume by a given list of attributes.
         """
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        filtr = 'labels.cblabel eq ' + label
+        plan = self._plan_find(**kwargs)
+        filtr = helpers.to_list_filter(plan.native_filters)
+        if plan.residual:
+            gcp_vols = (GCPVolume(self.provider, vol)
+                        for vol in helpers.iter_all(
+                            self.provider.gcp_compute.disks(),
+                            project=self.provider.project_name,
+                            zone=self.provider.zone_name,
+                            filter=filtr))
+            return ClientPagedResultList(self.provider,
+                                         list(plan.filter(gcp_vols)),
+                                         limit=limit, marker=marker)
         max_result = limit if limit is not None and limit < 500 else 500
         response = (self.provider
                         .gcp_compute
@@ -1233,6 +1305,9 @@ class GCPVolumeService(BaseVolumeService):
 
 class GCPSnapshotService(BaseSnapshotService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': helpers.filter_pushdown('labels.cblabel')})
+
     def __init__(self, provider):
         super(GCPSnapshotService, self).__init__(provider)
 
@@ -1245,15 +1320,17 @@ class GCPSnapshotService(BaseSnapshotService):
     @dispatch(event="provider.storage.snapshots.find",
               priority=BaseSnapshotService.STANDARD_EVENT_PRIORITY)
     def find(self, limit=None, marker=None, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        filtr = 'labels.cblabel eq ' + label
+        plan = self._plan_find(**kwargs)
+        filtr = helpers.to_list_filter(plan.native_filters)
+        if plan.residual:
+            snapshots = (GCPSnapshot(self.provider, snapshot)
+                         for snapshot in helpers.iter_all(
+                             self.provider.gcp_compute.snapshots(),
+                             project=self.provider.project_name,
+                             filter=filtr))
+            return ClientPagedResultList(self.provider,
+                                         list(plan.filter(snapshots)),
+                                         limit=limit, marker=marker)
         max_result = limit if limit is not None and limit < 500 else 500
         response = (self.provider
                         .gcp_compute
@@ -1437,6 +1514,10 @@ class GCPBucketService(BaseBucketService):
 
 class GCPBucketObjectService(BaseBucketObjectService):
 
+    # A JSON API batch request can contain up to 100 calls
+    DELETE_BATCH_SIZE = 100
+    _find_planner = QueryPlanner(['name'], {'name': prefix_pushdown('prefix')})
+
     def __init__(self, provider):
         super(GCPBucketObjectService, self).__init__(provider)
 
@@ -1472,9 +1553,11 @@ class GCPBucketObjectService(BaseBucketObjectService):
                                      False, data=objects)
 
     def find(self, bucket, limit=None, marker=None, **kwargs):
-        filters = ['name']
-        matches = cb_helpers.generic_find(filters, kwargs, bucket.objects)
-        return ClientPagedResultList(self._provider, list(matches),
+        plan = self._plan_find(bucket, **kwargs)
+        obj_list = bucket.objects.iter(
+            prefix=plan.native_filters.get('prefix'))
+        return ClientPagedResultList(self._provider,
+                                     list(plan.filter(obj_list)),
                                      limit=limit, marker=marker)
 
     def _create_object_with_media_body(self, bucket, name, media_body):
@@ -1497,6 +1580,23 @@ class GCPBucketObjectService(BaseBucketObjectService):
                                bucket,
                                response) if response else None
 
+    def _delete_batch(self, bucket, names):
+        failures = {}
+
+        def record_failure(request_id, response, exception):
+            if exception is not None:
+                failures[request_id] = str(exception)
+
+        batch = self.provider.gcp_storage.new_batch_http_request(
+            callback=record_failure)
+        for name in names:
+            batch.add(self.provider.gcp_storage.objects().delete(
+                bucket=bucket.name, object=name), request_id=name)
+        # Batches run concurrently, so each needs its own connection
+        # pylint:disable=protected-access
+        batch.execute(http=self.provider._authorized_http())
+        return failures
+
 
 class GCPGatewayService(BaseGatewayService):
     _DEFAULT_GATEWAY_NAME = 'default-internet-gateway'
@@ -29,6 +29,8 @@ class MockAWSCloudProvider(AWSCloudProvider, TestMockHelperMixin):
     def __init__(self, config):
         self.setUpMock()
         super(MockAWSCloudProvider, self).__init__(config)
+        # Keep the mocked VM type catalogue out of the real on-disk cache
+        self.config.setdefault('cb_cache_dir', '')
 
     def setUpMock(self):
         """
@@ -95,6 +97,12 @@ class MockAWSCloudProvider(AWSCloudProvider, TestMockHelperMixin):
 ]
 """)
 
+    def _create_region_provider(self, region_name, provider_class=None):
+        # Moto already intercepts all boto calls, so providers for other
+        # regions must not start (and so reset) it again.
+        return super(MockAWSCloudProvider, self)._create_region_provider(
+            region_name, provider_class or AWSCloudProvider)
+
     def tearDownMock(self):
         """
         Stop Moto intercepting all socket communications
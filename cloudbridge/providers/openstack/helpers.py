@@ -4,6 +4,10 @@ Helper functions
 import itertools
 import logging as log
 
+import six
+
+from cloudbridge.base.query import Pushdown
+from cloudbridge.base.query import glob_to_regex
 from cloudbridge.base.resources import ServerPagedResultList
 
 
@@ -38,3 +42,20 @@ def to_server_paged_list(provider, objects, limit=None):
     for obj in itertools.islice(objects, limit):
         results.append(obj)
     return results
+
+
+def name_regex_pushdown(key):
+    """
+    Returns a ``find()`` translator to a Nova ``search_opts`` name filter,
+    which is a regular expression searched for in names. As on the client,
+    only the end of the expression is anchored. The database may implement
+    a different dialect, so the results are also filtered client-side.
+    """
+    def translate(value):
+        if not isinstance(value, six.string_types):
+            return None
+        regex = glob_to_regex(value)
+        if regex is None:
+            return None
+        return Pushdown(key, regex + '$', exact=False)
+    return translate
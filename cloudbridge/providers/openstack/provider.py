@@ -29,6 +29,17 @@ class OpenStackCloudProvider(BaseCloudProvider):
     """OpenStack provider implementation."""
 
     PROVIDER_ID = 'openstack'
+    REGION_CONFIG_KEY = 'os_region_name'
+    API_FAMILIES = (
+        ('provider.compute.images', 'glance'),
+        ('provider.compute', 'nova'),
+        ('provider.security.key_pairs', 'nova'),
+        ('provider.storage.volumes', 'cinder'),
+        ('provider.storage.snapshots', 'cinder'),
+        ('provider.storage', 'swift'),
+        ('provider.dns', 'designate'),
+        ('provider', 'neutron')
+    )
 
     def __init__(self, config):
         super(OpenStackCloudProvider, self).__init__(config)
@@ -3,9 +3,11 @@ DataTypes used by this provider
 """
 import inspect
 import ipaddress
+import json
 import logging
 import os
 import re
+import uuid
 
 try:
     from urllib.parse import urlparse
@@ -43,6 +45,7 @@ from cloudbridge.base.resources import BaseVMFirewall
 from cloudbridge.base.resources import BaseVMFirewallRule
 from cloudbridge.base.resources import BaseVMType
 from cloudbridge.base.resources import BaseVolume
+from cloudbridge.base.resources import prefetchable
 from cloudbridge.interfaces.resources import GatewayState
 from cloudbridge.interfaces.resources import InstanceState
 from cloudbridge.interfaces.resources import MachineImageState
@@ -353,6 +356,7 @@ class OpenStackInstance(BaseInstance):
         return self._os_instance.flavor.get('id')
 
     @property
+    @prefetchable
     def vm_type(self):
         """
         Get the VM type object.
@@ -397,6 +401,13 @@ class OpenStackInstance(BaseInstance):
         subnet, the one corresponding to port associated with the first
         private IP associated with the instance.
         """
+        return self._find_subnet_id(
+            self._provider.neutron.list_ports().get('ports'))
+
+    def _find_subnet_id(self, ports):
+        """
+        Finds the subnet id of this instance among a list of Neutron ports.
+        """
         # MAC address can be used to identify a port so extract the MAC
         # address corresponding to the (first) private IP associated with the
         # instance.
@@ -408,13 +419,14 @@ class OpenStackInstance(BaseInstance):
                     break
         # Now get a handle to a port with the given MAC address and get the
         # subnet to which the private IP is connected as the desired id.
-        for prt in self._provider.neutron.list_ports().get('ports'):
+        for prt in ports:
             if prt.get('mac_address') == port:
                 for ip in prt.get('fixed_ips'):
                     if ip.get('ip_address') == addr:
                         return ip.get('subnet_id')
 
     @property
+    @prefetchable
     def vm_firewalls(self):
         return [
             self._provider.security.vm_firewalls.get(group.id)
@@ -495,6 +507,7 @@ class OpenStackInstance(BaseInstance):
         Refreshes the state of this instance by re-querying the cloud provider
         for its latest state.
         """
+        self._prefetched.clear()
         instance = self._provider.compute.instances.get(
             self.id)
         if instance:
@@ -1330,6 +1343,45 @@ class OpenStackBucketObject(BaseBucketObject):
     def refresh(self):
         self._obj = self.cbcontainer.objects.get(self.id)._obj
 
+    def _begin_multipart_upload(self):
+        # Segments are stored in a separate container, following the
+        # swift client's convention, and joined by a static large object
+        # manifest
+        container = '{0}_segments'.format(self.cbcontainer.name)
+        self._provider.swift.put_container(container)
+        return {'container': container,
+                'prefix': '{0}/slo/{1}/'.format(self.name, uuid.uuid4().hex),
+                'parts': []}
+
+    def _upload_part(self, upload, part_number, data):
+        name = '{0}{1:08d}'.format(upload['prefix'], part_number)
+        # Swift connections are not thread safe, so each part gets its own
+        # pylint:disable=protected-access
+        etag = self._provider._connect_swift().put_object(
+            upload['container'], name, data)
+        upload['parts'].append(name)
+        return {'path': '/{0}/{1}'.format(upload['container'], name),
+                'etag': etag, 'size_bytes': len(data)}
+
+    def _complete_multipart_upload(self, upload, parts):
+        self._provider.swift.put_object(
+            self.cbcontainer.name, self.name, json.dumps(parts),
+            query_string='multipart-manifest=put')
+
+    def _abort_multipart_upload(self, upload):
+        for name in upload['parts']:
+            try:
+                self._provider.swift.delete_object(upload['container'], name)
+            except swiftclient.ClientException as e:
+                log.warning("Could not delete segment %s: %s", name, e)
+
+    def _read_range(self, start, end):
+        # pylint:disable=protected-access
+        _, content = self._provider._connect_swift().get_object(
+            self.cbcontainer.name, self.name,
+            headers={'Range': 'bytes={0}-{1}'.format(start, end)})
+        return content
+
 
 class OpenStackBucket(BaseBucket):
 
@@ -3,6 +3,11 @@ Services implemented by the OpenStack provider.
 """
 import logging
 
+try:
+    from urllib.parse import unquote
+except ImportError:  # python 2
+    from urllib import unquote
+
 from neutronclient.common.exceptions import NeutronClientException
 from neutronclient.common.exceptions import PortNotFoundClient
 
@@ -14,9 +19,14 @@ from openstack.exceptions import NotFoundException
 from openstack.exceptions import ResourceNotFound
 
 from swiftclient import ClientException as SwiftClientException
+from swiftclient.service import SwiftService
 
 import cloudbridge.base.helpers as cb_helpers
 from cloudbridge.base.middleware import dispatch
+from cloudbridge.base.query import QueryPlanner
+from cloudbridge.base.query import equality_pushdown
+from cloudbridge.base.query import equals_pushdown
+from cloudbridge.base.query import prefix_pushdown
 from cloudbridge.base.resources import BaseLaunchConfig
 from cloudbridge.base.resources import ClientPagedResultList
 from cloudbridge.base.services import BaseBucketObjectService
@@ -374,6 +384,9 @@ class OpenStackStorageService(BaseStorageService):
 
 class OpenStackVolumeService(BaseVolumeService):
 
+    _find_planner = QueryPlanner(['label'],
+                                 {'label': equality_pushdown('name')})
+
     def __init__(self, provider):
         super(OpenStackVolumeService, self).__init__(provider)
 
@@ -398,23 +411,16 @@ class OpenStackVolumeService(BaseVolumeService):
     @dispatch(event="provider.storage.volumes.find",
               priority=BaseVolumeService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        log.debug("Searching for an OpenStack Volume with the label %s", label)
+        plan = self._plan_find(**kwargs)
+        log.debug("Searching for an OpenStack Volume %s", plan)
         cb_vols = [
             OpenStackVolume(self.provider, vol)
             for vol in self.provider.os_conn.block_storage.volumes(
-                name=label,
                 limit=oshelpers.os_result_limit(self.provider),
-                marker=None)
+                marker=None, **plan.native_filters)
             if vol.availability_zone == self.provider.service_zone_name(self)]
-        return oshelpers.to_server_paged_list(self.provider, cb_vols)
+        return oshelpers.to_server_paged_list(self.provider,
+                                              list(plan.filter(cb_vols)))
 
     @dispatch(event="provider.storage.volumes.list",
               priority=BaseVolumeService.STANDARD_EVENT_PRIORITY)
@@ -452,6 +458,10 @@ class OpenStackVolumeService(BaseVolumeService):
 
 class OpenStackSnapshotService(BaseSnapshotService):
 
+    # Some Cinder versions ignore the name filter of snapshots
+    _find_planner = QueryPlanner(
+        ['label'], {'label': equality_pushdown('name', exact=False)})
+
     def __init__(self, provider):
         super(OpenStackSnapshotService, self).__init__(provider)
 
@@ -469,26 +479,19 @@ class OpenStackSnapshotService(BaseSnapshotService):
     @dispatch(event="provider.storage.snapshots.find",
               priority=BaseSnapshotService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        search_opts = {'name': label,  # TODO: Cinder is ignoring name
-                       'limit': oshelpers.os_result_limit(self.provider),
-                       'marker': None}
+        plan = self._plan_find(**kwargs)
+        search_opts = dict(plan.native_filters,
+                           limit=oshelpers.os_result_limit(self.provider),
+                           marker=None)
         log.debug("Searching for an OpenStack snapshot with the following "
                   "params: %s", search_opts)
         cb_snaps = [
             OpenStackSnapshot(self.provider, snap) for
             snap in self.provider.os_conn.block_storage.snapshots(
-                **search_opts)
-            if snap.name == label]
+                **search_opts)]
 
-        return oshelpers.to_server_paged_list(self.provider, cb_snaps)
+        return oshelpers.to_server_paged_list(self.provider,
+                                              list(plan.filter(cb_snaps)))
 
     @dispatch(event="provider.storage.snapshots.list",
               priority=BaseSnapshotService.STANDARD_EVENT_PRIORITY)
@@ -593,6 +596,10 @@ class OpenStackBucketService(BaseBucketService):
 
 class OpenStackBucketObjectService(BaseBucketObjectService):
 
+    # The default limit of the bulk delete middleware
+    DELETE_BATCH_SIZE = 10000
+    _find_planner = QueryPlanner(['name'], {'name': prefix_pushdown('prefix')})
+
     def __init__(self, provider):
         super(OpenStackBucketObjectService, self).__init__(provider)
 
@@ -631,18 +638,64 @@ class OpenStackBucketObjectService(BaseBucketObjectService):
             cb_objects,
             limit)
 
+    def _iter_objects(self, bucket, prefix=None):
+        """
+        Iterates through all objects in a bucket, fetching one page of
+        results at a time, rather than the single capped listing returned
+        by a plain ``get_container`` call.
+        """
+        marker = None
+        while True:
+            _, object_list = self.provider.swift.get_container(
+                bucket.name, marker=marker, prefix=prefix)
+            if not object_list:
+                return
+            for obj in object_list:
+                yield OpenStackBucketObject(self.provider, bucket, obj)
+            marker = object_list[-1].get('name')
+
     def find(self, bucket, **kwargs):
-        _, obj_list = self.provider.swift.get_container(bucket.name)
-        cb_objs = [OpenStackBucketObject(self.provider, bucket, obj)
-                   for obj in obj_list]
-        filters = ['name']
-        matches = cb_helpers.generic_find(filters, kwargs, cb_objs)
-        return ClientPagedResultList(self.provider, list(matches))
+        plan = self._plan_find(bucket, **kwargs)
+        cb_objs = self._iter_objects(
+            bucket, prefix=plan.native_filters.get('prefix'))
+        return ClientPagedResultList(self.provider,
+                                     list(plan.filter(cb_objs)))
 
     def create(self, bucket, object_name):
         self.provider.swift.put_object(bucket.name, object_name, None)
         return self.get(bucket, object_name)
 
+    def _delete_batch(self, bucket, names):
+        """
+        Deletes a batch of objects through the swift service, which uses
+        the bulk delete middleware when the cluster supports it, and
+        deletes objects individually otherwise.
+
+        The service's connections reuse the storage URL and token of the
+        provider's swift connection, rather than authenticating afresh.
+        """
+        storage_url, token = self.provider.swift.get_auth()
+        options = {'os_storage_url': storage_url, 'os_auth_token': token}
+
+        failures = {}
+        container_path = '/{0}/'.format(bucket.name)
+        with SwiftService(options=options) as swift:
+            for res in swift.delete(bucket.name, names):
+                if res['action'] == 'bulk_delete':
+                    if not res['success']:
+                        failures.update((name, str(res.get('error')))
+                                        for name in res['objects'])
+                        continue
+                    for path, status in res['result'].get('Errors', []):
+                        path = unquote(path)
+                        if path.startswith(container_path):
+                            path = path[len(container_path):]
+                        failures[path] = status
+                elif (res['action'] == 'delete_object' and
+                        not res['success']):
+                    failures[res['object']] = str(res.get('error'))
+        return failures
+
 
 class OpenStackComputeService(BaseComputeService):
 
@@ -720,6 +773,9 @@ class OpenStackImageService(BaseImageService):
 
 class OpenStackInstanceService(BaseInstanceService):
 
+    _find_planner = QueryPlanner(
+        ['label'], {'label': oshelpers.name_regex_pushdown('name')})
+
     def __init__(self, provider):
         super(OpenStackInstanceService, self).__init__(provider)
 
@@ -780,8 +836,16 @@ class OpenStackInstanceService(BaseInstanceService):
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def create(self, label, image, vm_type, subnet,
                key_pair=None, vm_firewalls=None, user_data=None,
-               launch_config=None, **kwargs):
+               launch_config=None, count=None, **kwargs):
         OpenStackInstance.assert_valid_resource_label(label)
+        self._check_count(count)
+        if count is not None and subnet:
+            # Each instance in a subnet needs its own port, which Nova's
+            # multiple create cannot attach, so launch them one by one
+            return self._create_concurrently(
+                count, label, image, vm_type, subnet, key_pair=key_pair,
+                vm_firewalls=vm_firewalls, user_data=user_data,
+                launch_config=launch_config, **kwargs)
         image_id = image.id if isinstance(image, MachineImage) else image
         if isinstance(vm_type, VMType):
             vm_size = vm_type.id
@@ -853,41 +917,43 @@ class OpenStackInstanceService(BaseInstanceService):
             label,
             None if self._has_root_device(launch_config) else image_id,
             vm_size,
-            min_count=1,
-            max_count=1,
+            # Launch all instances or none of them
+            min_count=count or 1,
+            max_count=count or 1,
             availability_zone=zone_name,
             key_name=key_pair_name,
             security_groups=sg_name_list,
             userdata=str(user_data) or None,
             block_device_mapping_v2=bdm,
-            nics=nics)
+            nics=nics,
+            reservation_id=count is not None)
+        if count is not None:
+            # A multiple create returns the reservation id of the group,
+            # which its instances are listed by
+            return [OpenStackInstance(self.provider, inst)
+                    for inst in self.provider.nova.servers.list(
+                        search_opts={'reservation_id': os_instance})]
         return OpenStackInstance(self.provider, os_instance)
 
     @dispatch(event="provider.compute.instances.find",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        label = kwargs.pop('label', None)
-
-        # All kwargs should have been popped at this time.
-        if len(kwargs) > 0:
-            raise InvalidParamException(
-                "Unrecognised parameters for search: %s. Supported "
-                "attributes: %s" % (kwargs, 'label'))
-
-        search_opts = {'name': label,
-                       'availability_zone': self.provider
-                                                .service_zone_name(self)}
+        plan = self._plan_find(**kwargs)
+        search_opts = dict(plan.native_filters,
+                           availability_zone=self.provider
+                                                 .service_zone_name(self))
         cb_insts = [
             OpenStackInstance(self.provider, inst)
             for inst in self.provider.nova.servers.list(
                 search_opts=search_opts,
                 limit=oshelpers.os_result_limit(self.provider),
                 marker=None)]
-        return oshelpers.to_server_paged_list(self.provider, cb_insts)
+        return oshelpers.to_server_paged_list(self.provider,
+                                              list(plan.filter(cb_insts)))
 
     @dispatch(event="provider.compute.instances.list",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
-    def list(self, limit=None, marker=None):
+    def list(self, limit=None, marker=None, prefetch=None):
         """
         List all instances.
         """
@@ -899,7 +965,39 @@ class OpenStackInstanceService(BaseInstanceService):
                 search_opts=search_opts,
                 limit=oshelpers.os_result_limit(self.provider, limit),
                 marker=marker)]
-        return oshelpers.to_server_paged_list(self.provider, cb_insts, limit)
+        return self._prefetch(
+            oshelpers.to_server_paged_list(self.provider, cb_insts, limit),
+            prefetch)
+
+    def _resolve_vm_firewalls(self, instances):
+        # The ports of an instance record its security groups, so the
+        # groups of all instances can be found with a single port listing
+        group_ids = {}
+        for port in self.provider.neutron.list_ports().get('ports'):
+            group_ids.setdefault(port.get('device_id'), []).extend(
+                port.get('security_groups') or [])
+        firewalls = dict((fw.id, fw)
+                         for fw in self.provider.security.vm_firewalls)
+        return dict((inst.id, [firewalls[fw_id] for fw_id
+                               in self._unique(group_ids.get(inst.id, []))
+                               if fw_id in firewalls])
+                    for inst in instances)
+
+    def _resolve_subnet(self, instances):
+        ports = self.provider.neutron.list_ports().get('ports')
+        # pylint:disable=protected-access
+        inst_subnet_ids = dict((inst.id, inst._find_subnet_id(ports))
+                               for inst in instances)
+        subnet_ids = self._unique(inst_subnet_ids.values())
+        subnets = dict(zip(
+            subnet_ids, self.provider.networking.subnets.get_many(subnet_ids)))
+        return dict((inst_id, subnets.get(subnet_id))
+                    for inst_id, subnet_id in inst_subnet_ids.items())
+
+    def _list_floating_ips(self):
+        # Floating IPs belong to a gateway, so list those of all gateways
+        return [OpenStackFloatingIP(self.provider, fip)
+                for fip in self.provider.os_conn.network.ips()]
 
     @dispatch(event="provider.compute.instances.get",
               priority=BaseInstanceService.STANDARD_EVENT_PRIORITY)
@@ -1035,6 +1133,11 @@ class OpenStackNetworkingService(BaseNetworkingService):
 
 class OpenStackNetworkService(BaseNetworkService):
 
+    # Labels are searched for, so a label also matches longer names which
+    # end with it, and only explicit equality can be filtered by Neutron
+    _find_planner = QueryPlanner(['label'],
+                                 {'label': equals_pushdown('name')})
+
     def __init__(self, provider):
         super(OpenStackNetworkService, self).__init__(provider)
 
@@ -1044,27 +1147,44 @@ class OpenStackNetworkService(BaseNetworkService):
         network = (n for n in self if n.id == network_id)
         return next(network, None)
 
+    @dispatch(event="provider.networking.networks.get_many",
+              priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, network_ids):
+        if not network_ids:
+            return []
+        # Neutron accepts a list of ids as a server-side filter
+        networks = {network.get('id'): OpenStackNetwork(self.provider, network)
+                    for network in self.provider.neutron.list_networks(
+                        id=list(network_ids)).get('networks')
+                    if self._in_service_zone(network)}
+        return [networks.get(network_id) for network_id in network_ids]
+
+    def _in_service_zone(self, network):
+        # If there are no availability zones, keep the network
+        # in the results list
+        return network and (not network.get('availability_zones')
+                            or self.provider.service_zone_name(self)
+                            in network.get('availability_zones'))
+
     @dispatch(event="provider.networking.networks.list",
               priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
     def list(self, limit=None, marker=None):
         networks = [OpenStackNetwork(self.provider, network)
                     for network in self.provider.neutron.list_networks()
-                    .get('networks') if network
-                    # If there are no availability zones, keep the network
-                    # in the results list
-                    and (not network.get('availability_zones')
-                         or self.provider.service_zone_name(self)
-                         in network.get('availability_zones'))]
+                    .get('networks') if self._in_service_zone(network)]
         return ClientPagedResultList(self.provider, networks,
                                      limit=limit, marker=marker)
 
     @dispatch(event="provider.networking.networks.find",
               priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        obj_list = self
-        filters = ['label']
-        matches = cb_helpers.generic_find(filters, kwargs, obj_list)
-        return ClientPagedResultList(self._provider, list(matches))
+        plan = self._plan_find(**kwargs)
+        obj_list = [OpenStackNetwork(self.provider, network)
+                    for network in self.provider.neutron.list_networks(
+                        **plan.native_filters).get('networks')
+                    if self._in_service_zone(network)]
+        return ClientPagedResultList(self._provider,
+                                     list(plan.filter(obj_list)))
 
     @dispatch(event="provider.networking.networks.create",
               priority=BaseNetworkService.STANDARD_EVENT_PRIORITY)
@@ -1108,6 +1228,17 @@ class OpenStackSubnetService(BaseSubnetService):
         subnet = (s for s in self if s.id == subnet_id)
         return next(subnet, None)
 
+    @dispatch(event="provider.networking.subnets.get_many",
+              priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
+    def get_many(self, subnet_ids):
+        if not subnet_ids:
+            return []
+        # Neutron accepts a list of ids as a server-side filter
+        subnets = {subnet.get('id'): OpenStackSubnet(self.provider, subnet)
+                   for subnet in self.provider.neutron.list_subnets(
+                       id=list(subnet_ids)).get('subnets', [])}
+        return [subnets.get(subnet_id) for subnet_id in subnet_ids]
+
     @dispatch(event="provider.networking.subnets.list",
               priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
     def list(self, network=None, limit=None, marker=None):
@@ -1141,6 +1272,8 @@ class OpenStackSubnetService(BaseSubnetService):
         sn_id = subnet.id if isinstance(subnet, OpenStackSubnet) else subnet
         self.provider.neutron.delete_subnet(sn_id)
 
+    @dispatch(event="provider.networking.subnets.get_or_create_default",
+              priority=BaseSubnetService.STANDARD_EVENT_PRIORITY)
     def get_or_create_default(self):
         try:
             sn = self.find(label=OpenStackSubnet.CB_DEFAULT_SUBNET_LABEL)
@@ -1164,6 +1297,11 @@ class OpenStackSubnetService(BaseSubnetService):
 
 class OpenStackRouterService(BaseRouterService):
 
+    # Labels are searched for, so a label also matches longer names which
+    # end with it, and only explicit equality can be filtered by Neutron
+    _find_planner = QueryPlanner(['label'],
+                                 {'label': equals_pushdown('name')})
+
     def __init__(self, provider):
         super(OpenStackRouterService, self).__init__(provider)
 
@@ -1197,10 +1335,14 @@ class OpenStackRouterService(BaseRouterService):
     @dispatch(event="provider.networking.routers.find",
               priority=BaseRouterService.STANDARD_EVENT_PRIORITY)
     def find(self, **kwargs):
-        obj_list = self
-        filters = ['label']
-        matches = cb_helpers.generic_find(filters, kwargs, obj_list)
-        return ClientPagedResultList(self._provider, list(matches))
+        plan = self._plan_find(**kwargs)
+        obj_list = [OpenStackRouter(self.provider, r)
+                    for r in self.provider.os_conn.list_routers(
+                        filters=dict(plan.native_filters))
+                    if self.provider.service_zone_name(self)
+                    in r.availability_zones]
+        return ClientPagedResultList(self._provider,
+                                     list(plan.filter(obj_list)))
 
     @dispatch(event="provider.networking.routers.create",
               priority=BaseRouterService.STANDARD_EVENT_PRIORITY)
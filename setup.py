@@ -24,7 +24,8 @@ REQS_BASE = [
     'tenacity>=6.0',
     'cachetools>=2.1.0',
     'deprecation>=2.0.7',
-    'pyeventsystem<2'
+    'pyeventsystem<2',
+    'futures>=3.0; python_version < "3"'
 ]
 REQS_AWS = [
     'boto3>=1.9.86'
@@ -83,7 +84,8 @@ setup(
         'full': REQS_FULL,
         'dev': REQS_DEV
     },
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
+    package_data={'cloudbridge.providers.aws': ['data/*.json']},
     license='MIT',
     classifiers=[
         'Development Status :: 4 - Beta',
@@ -92,6 +92,33 @@ def check_find(test, service, obj):
     return find_objs
 
 
+def check_find_glob(test, service, obj):
+    # A character class cannot be matched by any server-side filter, so
+    # at least part of the find is done client-side
+    attr = 'label' if isinstance(obj, LabeledCloudResource) else 'name'
+    value = getattr(obj, attr)
+    if not value or not value[-1].isalnum():
+        return
+    find_objs = service.find(**{attr: value[:-1] + '[' + value[-1] + ']'})
+    test.assertIn(
+        obj.id, [o.id for o in find_objs],
+        "Find objects for %s by glob does not return the expected object: "
+        "%s. Got %s" % (type(obj).__name__, value, find_objs))
+
+
+def check_explain(test, service, obj):
+    attr = 'label' if isinstance(obj, LabeledCloudResource) else 'name'
+    plan = service.explain(**{attr: getattr(obj, attr)})
+    test.assertEqual(set(plan),
+                     set(['native_filters', 'pushed_down', 'client_side']))
+    test.assertIn(
+        attr, set(plan['pushed_down']) | set(plan['client_side']),
+        "Explain for %s does not account for the %s filter: %s"
+        % (type(service).__name__, attr, plan))
+    if not plan['pushed_down']:
+        test.assertEqual(plan['native_filters'], {})
+
+
 def check_find_non_existent(test, service, obj):
     args = {}
     # AWSImageService.find looks through all public images by default
@@ -118,6 +145,19 @@ def check_get(test, service, obj):
     return get_obj
 
 
+def check_get_many(test, service, obj):
+    non_existent_id = 'tmp-' + str(uuid.uuid4())[:28]
+    get_objs = service.get_many([non_existent_id, obj.id])
+    test.assertEqual(len(get_objs), 2)
+    test.assertIsNone(
+        get_objs[0],
+        "Get many for %s returned an unexpected object for a non-existent id:"
+        " %s" % (type(service).__name__, get_objs[0]))
+    test.assertEqual(get_objs[1].id, obj.id)
+    test.assertIsInstance(get_objs[1], type(obj))
+    return get_objs[1]
+
+
 def check_get_non_existent(test, service):
     # check get
     get_objs = service.get('tmp-' + str(uuid.uuid4())[:28])
@@ -214,9 +254,12 @@ def check_standard_behaviour(test, service, obj):
     objs_list = check_list(test, service, obj)
     objs_iter = check_iter(test, service, obj)
     objs_find = check_find(test, service, obj)
+    check_find_glob(test, service, obj)
+    check_explain(test, service, obj)
     check_find_non_existent(test, service, obj)
     obj_get = check_get(test, service, obj)
     check_get_non_existent(test, service)
+    check_get_many(test, service, obj)
 
     test.assertTrue(
         obj.id == objs_list[0].id == objs_iter[0].id ==
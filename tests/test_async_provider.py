@@ -0,0 +1,73 @@
+import sys
+
+from cloudbridge.base.middleware import MetricsMiddleware
+from cloudbridge.interfaces import Region
+
+from tests import helpers
+from tests.helpers import ProviderTestBase
+from tests.helpers import skipIfPython
+
+
+class AsyncCloudProviderTestCase(ProviderTestBase):
+
+    _multiprocess_can_split_ = True
+
+    def setUp(self):
+        super(AsyncCloudProviderTestCase, self).setUp()
+        if sys.version_info < (3, 5):
+            return
+        import asyncio
+        from cloudbridge.base.async_provider import AsyncCloudProvider
+
+        # The awaitables are created outside of a running loop, so they are
+        # bound to the current event loop
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.async_provider = AsyncCloudProvider(self.provider, max_workers=2)
+
+    def tearDown(self):
+        if sys.version_info >= (3, 5):
+            import asyncio
+
+            self.async_provider.close()
+            asyncio.set_event_loop(None)
+            self.loop.close()
+        super(AsyncCloudProviderTestCase, self).tearDown()
+
+    def run_async(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    @skipIfPython("<", 3, 5)
+    @helpers.skipIfNoService(['compute.regions'])
+    def test_list_and_get_regions(self):
+        regions = self.run_async(self.async_provider.compute.regions.list())
+        self.assertTrue(regions)
+        self.assertIsInstance(regions[0], Region)
+        self.assertEqual(
+            self.run_async(
+                self.async_provider.compute.regions.get(regions[0].id)),
+            regions[0])
+
+    @skipIfPython("<", 3, 5)
+    @helpers.skipIfNoService(['compute.regions'])
+    def test_async_iteration_matches_sync(self):
+        # Drive the iterator by hand, as "async for" would, so that this
+        # module still compiles on Python 2
+        iterator = self.async_provider.compute.regions.__aiter__()
+        regions = []
+        while True:
+            try:
+                regions.append(self.run_async(iterator.__anext__()))
+            except StopAsyncIteration:  # noqa: F821
+                break
+        self.assertEqual([r.id for r in regions],
+                         [r.id for r in self.provider.compute.regions])
+
+    @skipIfPython("<", 3, 5)
+    @helpers.skipIfNoService(['compute.regions'])
+    def test_middleware_events_fire(self):
+        metrics = MetricsMiddleware()
+        self.provider.middleware.add(metrics)
+        self.run_async(self.async_provider.compute.regions.list())
+        events = metrics.snapshot()['providers'][self.provider.PROVIDER_ID]
+        self.assertEqual(events['provider.compute.regions.list']['calls'], 1)
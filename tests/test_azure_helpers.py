@@ -0,0 +1,126 @@
+import unittest
+
+from cloudbridge.interfaces.exceptions import InvalidValueException
+
+try:
+    from cloudbridge.providers.azure import azure_client
+    from cloudbridge.providers.azure import helpers as azure_helpers
+except ImportError:
+    azure_helpers = None
+
+SUBSCRIPTION = '/subscriptions/7904d702-e01c-4826-8519-f5a25c866a96'
+
+
+def reference_parse_url(template_urls, original_url):
+    """
+    The implementation of ``parse_url`` before templates were compiled and
+    parsed IDs were cached.
+    """
+    if not original_url:
+        raise InvalidValueException(template_urls, original_url)
+    original_url_parts = original_url.split('/')
+    if len(original_url_parts) == 1:
+        original_url_parts = original_url.split(':')
+    for each_template in template_urls:
+        template_url_parts = each_template.split('/')
+        if len(template_url_parts) == 1:
+            template_url_parts = each_template.split(':')
+        if len(template_url_parts) == len(original_url_parts):
+            break
+    if len(template_url_parts) != len(original_url_parts):
+        raise InvalidValueException(template_urls, original_url)
+    resource_param = {}
+    for key, value in zip(template_url_parts, original_url_parts):
+        if key.startswith('{') and key.endswith('}'):
+            resource_param.update({key[1:-1]: value})
+    return resource_param
+
+
+@unittest.skipIf(azure_helpers is None, "The Azure SDK is not installed")
+class AzureHelpersTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    def setUp(self):
+        azure_helpers._parsed_ids.clear()
+
+    def assert_parsed_like_reference(self, templates, resource_id):
+        try:
+            expected = reference_parse_url(templates, resource_id)
+        except InvalidValueException:
+            with self.assertRaises(InvalidValueException):
+                azure_helpers.parse_url(templates, resource_id)
+            return None
+        # Parse twice, to also check the cached result
+        for _ in range(2):
+            self.assertEqual(
+                azure_helpers.parse_url(templates, resource_id), expected,
+                "Parsed %r with %s" % (resource_id, templates))
+        return expected
+
+    def test_parse_url_matches_reference(self):
+        template_lists = [getattr(azure_client, name)
+                          for name in dir(azure_client)
+                          if name.endswith('_RESOURCE_ID')]
+        self.assertTrue(template_lists)
+        ids = [
+            SUBSCRIPTION + '/resourceGroups/cb-rg/providers/'
+            'Microsoft.Compute/virtualMachines/cb-vm',
+            SUBSCRIPTION + '/resourceGroups/cb-rg/providers/'
+            'Microsoft.Network/virtualNetworks/cb-net/subnets/cb-subnet',
+            SUBSCRIPTION + '/resourceGroups/cb-rg/providers/'
+            'Microsoft.Network/networkSecurityGroups/cb-fw/'
+            'securityRules/cb-rule',
+            'cb-name', 'Canonical:UbuntuServer:16.04.0-LTS:latest',
+            'a:b', 'a/b', '/', 'cb-rg/providers/cb-vm',
+            SUBSCRIPTION + '/resourceGroups/cb-rg']
+        for templates in template_lists:
+            for resource_id in ids:
+                self.assert_parsed_like_reference(templates, resource_id)
+
+    def test_multiple_templates(self):
+        templates = ['/subscriptions/{subscriptionId}/resourceGroups/'
+                     '{resourceGroupName}/providers/Microsoft.Compute/'
+                     'images/{imageName}',
+                     '{imageName}',
+                     '{publisher}:{offer}:{sku}:{version}',
+                     '{other}']
+        self.assertEqual(
+            self.assert_parsed_like_reference(
+                templates, SUBSCRIPTION + '/resourceGroups/cb-rg/providers/'
+                'Microsoft.Compute/images/cb-image'),
+            {'subscriptionId': '7904d702-e01c-4826-8519-f5a25c866a96',
+             'resourceGroupName': 'cb-rg', 'imageName': 'cb-image'})
+        # The first template with as many segments as the ID is used
+        self.assertEqual(
+            self.assert_parsed_like_reference(templates, 'cb-image'),
+            {'imageName': 'cb-image'})
+        # URNs are split on colons
+        self.assertEqual(
+            self.assert_parsed_like_reference(
+                templates, 'Canonical:UbuntuServer:16.04.0-LTS:latest'),
+            {'publisher': 'Canonical', 'offer': 'UbuntuServer',
+             'sku': '16.04.0-LTS', 'version': 'latest'})
+
+    def test_segment_count_mismatch_raises(self):
+        templates = ['/subscriptions/{subscriptionId}/resourceGroups/'
+                     '{resourceGroupName}/providers/Microsoft.Compute/'
+                     'disks/{diskName}',
+                     '{diskName}']
+        for resource_id in ['cb-rg/cb-disk', 'a:b:c', '',
+                            SUBSCRIPTION + '/resourceGroups/cb-rg']:
+            with self.assertRaises(InvalidValueException):
+                azure_helpers.parse_url(templates, resource_id)
+            with self.assertRaises(InvalidValueException):
+                reference_parse_url(templates, resource_id)
+
+    def test_parsed_ids_can_be_modified(self):
+        templates = ['{vmName}']
+        parsed = azure_helpers.parse_url(templates, 'cb-vm')
+        parsed['vmName'] = 'changed'
+        parsed['extra'] = 'value'
+        self.assertEqual(azure_helpers.parse_url(templates, 'cb-vm'),
+                         {'vmName': 'cb-vm'})
+        # The same templates in a new list share the compiled form
+        self.assertEqual(azure_helpers.parse_url(list(templates), 'cb-vm'),
+                         {'vmName': 'cb-vm'})
@@ -1,6 +1,29 @@
+import fnmatch
+import os
+import re
+import shutil
+import tempfile
+import threading
 import unittest
 
 from cloudbridge.base import helpers as cb_helpers
+from cloudbridge.base.clients import ClientPool
+from cloudbridge.base.predicates import Equals
+from cloudbridge.base.predicates import In
+from cloudbridge.base.predicates import Prefix
+from cloudbridge.base.predicates import Range
+from cloudbridge.base.predicates import Regex
+from cloudbridge.base.query import Pushdown
+from cloudbridge.base.query import QueryPlanner
+from cloudbridge.base.query import equality_pushdown
+from cloudbridge.base.query import equals_pushdown
+from cloudbridge.base.query import glob_to_regex
+from cloudbridge.base.query import prefix_pushdown
+from cloudbridge.base.transfer import ChunkedReader
+from cloudbridge.base.waiters import ExponentialBackoffWaitStrategy
+from cloudbridge.base.waiters import FixedIntervalWaitStrategy
+from cloudbridge.base.waiters import WaitMetrics
+from cloudbridge.base.waiters import Waiter
 from cloudbridge.interfaces.exceptions import InvalidParamException
 
 
@@ -100,3 +123,286 @@ class BaseHelpersTestCase(unittest.TestCase):
 
         with self.assertRaises(InvalidParamException):
             custom_func(new_param="world", old_param="hello")
+
+    def test_fixed_interval_wait_strategy(self):
+        delays = FixedIntervalWaitStrategy().delays(5)
+        self.assertEqual([next(delays) for _ in range(3)], [5, 5, 5])
+
+    def test_backoff_wait_strategy_without_jitter(self):
+        strategy = ExponentialBackoffWaitStrategy(base=0.5, factor=2,
+                                                  jitter=0)
+        delays = strategy.delays(5)
+        self.assertEqual([next(delays) for _ in range(6)],
+                         [0.5, 1, 2, 4, 5, 5])
+        # The first delay should never exceed the interval
+        self.assertEqual(next(strategy.delays(0)), 0)
+
+    def test_backoff_wait_strategy_with_jitter(self):
+        strategy = ExponentialBackoffWaitStrategy(base=1, factor=2,
+                                                  jitter=0.5)
+        delays = strategy.delays(8)
+        for expected in [1, 2, 4, 8, 8]:
+            delay = next(delays)
+            self.assertTrue(expected / 2.0 <= delay <= expected,
+                            "Delay %s is outside the jitter range" % delay)
+
+    def test_waiter_records_metrics(self):
+        metrics = WaitMetrics()
+        strategy = FixedIntervalWaitStrategy()
+        with Waiter(strategy, 10, 0, metrics=metrics,
+                    description="first") as waiter:
+            self.assertTrue(waiter.next_poll())
+            self.assertTrue(waiter.next_poll())
+        with self.assertRaises(ValueError):
+            with Waiter(strategy, 0, 0, metrics=metrics,
+                        description="second") as waiter:
+                self.assertFalse(waiter.next_poll())
+                raise ValueError()
+        self.assertEqual([(r.description, r.polls, r.succeeded)
+                          for r in metrics.recent],
+                         [("first", 2, True), ("second", 0, False)])
+        self.assertEqual(metrics.last.description, "second")
+        self.assertEqual(metrics.stats['waits'], 2)
+        self.assertEqual(metrics.stats['polls'], 2)
+        self.assertEqual(metrics.stats['failures'], 1)
+        metrics.reset()
+        self.assertIsNone(metrics.last)
+        self.assertEqual(metrics.stats['waits'], 0)
+
+    def test_get_glob_prefix(self):
+        self.assertEqual(cb_helpers.get_glob_prefix("logs/2019-*.gz"),
+                         "logs/2019-")
+        self.assertEqual(cb_helpers.get_glob_prefix("file?.txt"), "file")
+        self.assertEqual(cb_helpers.get_glob_prefix("[ab]*"), "")
+        self.assertEqual(cb_helpers.get_glob_prefix("exact-name"),
+                         "exact-name")
+
+    def test_generic_find(self):
+        class Obj(object):
+            def __init__(self, name, label, size):
+                self.name = name
+                self.label = label
+                self.size = size
+
+        objs = [Obj('web-1', 'prod', 10), Obj('web-2', None, 20),
+                Obj('db-1', 'prod', 30)]
+
+        def find(**kwargs):
+            return [o.name for o in cb_helpers.generic_find(
+                ['name', 'label', 'size'], kwargs, objs)]
+
+        self.assertEqual(find(), ['web-1', 'web-2', 'db-1'])
+        self.assertEqual(find(name='web-*', label='prod'), ['web-1'])
+        # Empty values are ignored, and empty attributes never match a glob
+        self.assertEqual(find(name='', label='*'), ['web-1', 'db-1'])
+        self.assertEqual(find(size=20), ['web-2'])
+        self.assertEqual(find(name=In(['db-1', 'web-2'])), ['web-2', 'db-1'])
+        self.assertEqual(find(name=Prefix('web')), ['web-1', 'web-2'])
+        self.assertEqual(find(size=Range(15, 30)), ['web-2', 'db-1'])
+        self.assertEqual(find(size=Range(10, 30, inclusive=False)),
+                         ['web-2'])
+        self.assertEqual(find(size=Range(high=10)), ['web-1'])
+        self.assertEqual(find(name=Regex(r'^\w+-1$'), label=In(['prod'])),
+                         ['web-1', 'db-1'])
+        with self.assertRaises(InvalidParamException):
+            find(name='web-*', kind='vm')
+
+    def test_filter_by(self):
+        class Obj(object):
+            def __init__(self, name):
+                self.name = name
+
+        objs = [Obj('web-1'), Obj('db-1')]
+        kwargs = {'name': 'web*', 'label': 'prod'}
+        self.assertEqual([o.name for o in cb_helpers.filter_by(
+            'name', kwargs, objs)], ['web-1'])
+        self.assertEqual(kwargs, {'label': 'prod'})
+        self.assertIs(cb_helpers.filter_by('name', kwargs, objs), objs)
+
+    def test_query_planner(self):
+        class Obj(object):
+            def __init__(self, name, label):
+                self.name = name
+                self.label = label
+
+        planner = QueryPlanner(
+            ['name', 'label', 'kind'],
+            {'name': prefix_pushdown('Prefix'),
+             'label': equality_pushdown('tag'),
+             'kind': lambda value: Pushdown('kind', value.upper())})
+        plan = planner.plan({'name': Prefix('web-'), 'label': 'db',
+                             'kind': 'vm'})
+        self.assertEqual(dict(plan.native_filters),
+                         {'Prefix': 'web-', 'tag': 'db', 'kind': 'VM'})
+        # An exact value also matches longer values, so is matched locally
+        self.assertEqual(plan.residual, {'label': 'db'})
+        objs = [Obj('web-1', 'db'), Obj('web-2', 'mydb'), Obj('web-3', 'dbx')]
+        self.assertEqual([o.name for o in plan.filter(objs)],
+                         ['web-1', 'web-2'])
+        explained = plan.explain()
+        self.assertEqual(explained['native_filters'],
+                         {'Prefix': 'web-', 'tag': 'db', 'kind': 'VM'})
+        self.assertEqual(sorted(explained['pushed_down']),
+                         ['kind', 'label', 'name'])
+        self.assertEqual(explained['client_side'], {'label': 'db'})
+
+        # Globs cannot be pushed to a prefix or an equality filter, and
+        # empty values are ignored
+        plan = planner.plan({'label': 'd?', 'name': 'web-*', 'kind': None})
+        self.assertEqual(dict(plan.native_filters), {})
+        self.assertEqual(plan.residual, {'label': 'd?', 'name': 'web-*'})
+        # With no residual filters, results are returned as is
+        plan = planner.plan({'kind': 'vm'})
+        self.assertIs(plan.filter(objs), objs)
+
+        with self.assertRaises(InvalidParamException):
+            planner.plan({'size': 1})
+
+        # Operators are pushed down if the server supports them, and are
+        # otherwise filtered client-side
+        plan = planner.plan({'name': Prefix('web-'), 'label': In(['db'])})
+        self.assertEqual(dict(plan.native_filters), {'Prefix': 'web-'})
+        self.assertEqual(list(plan.residual), ['label'])
+        plan = QueryPlanner(['name'], {'name': equals_pushdown('name')}).plan(
+            {'name': Equals('web-1')})
+        self.assertEqual(dict(plan.native_filters), {'name': 'web-1'})
+        self.assertEqual(plan.residual, {})
+        self.assertEqual(QueryPlanner(
+            ['name'], {'name': equals_pushdown('name')}).plan(
+            {'name': 'web-1'}).residual, {'name': 'web-1'})
+
+    # Names and patterns for which a planned find() must return the same
+    # results as the client-side search made before queries were planned
+    SEARCH_NAMES = ['foo', 'foo1', 'barfoo', 'barfoo1', 'bar', 'food/x.gz',
+                    'a.foo', 'xfooy']
+    SEARCH_PATTERNS = ['foo', 'foo*', '*foo', 'foo?', 'f*o', 'bar*1', '*',
+                       'food/*.gz', 'a.f*', '*foo*', 'foo[0-9]']
+
+    def assert_matches_baseline_search(self, translate, server_match):
+        """
+        Checks that a query planned with ``translate``, run on a server
+        which keeps the names for which ``server_match(native_value, name)``
+        is true, returns the names which an unanchored search for the glob
+        pattern found.
+        """
+        class Obj(object):
+            def __init__(self, name):
+                self.name = name
+
+        planner = QueryPlanner(['name'], {'name': translate})
+        for pattern in self.SEARCH_PATTERNS:
+            regex = fnmatch.translate(pattern)
+            expected = [n for n in self.SEARCH_NAMES if re.search(regex, n)]
+            plan = planner.plan({'name': pattern})
+            objs = [Obj(n) for n in self.SEARCH_NAMES]
+            for value in plan.native_filters.values():
+                objs = [o for o in objs if server_match(value, o.name)]
+            self.assertEqual([o.name for o in plan.filter(objs)], expected,
+                             "Pattern %r planned as %s" % (pattern, plan))
+
+    def test_pushdowns_match_baseline_search(self):
+        # Object store prefix filters, as used by S3, Swift, GCS and Azure
+        self.assert_matches_baseline_search(
+            prefix_pushdown('prefix'), lambda value, name:
+            name.startswith(value))
+        # Neutron equality filters
+        self.assert_matches_baseline_search(
+            equals_pushdown('name'), lambda value, name: name == value)
+
+    def test_provider_pushdowns_match_baseline_search(self):
+        try:
+            from cloudbridge.providers.gcp import helpers as gcp_helpers
+        except ImportError:
+            gcp_helpers = None
+        try:
+            from cloudbridge.providers.openstack import helpers as os_helpers
+        except ImportError:
+            os_helpers = None
+        if not (gcp_helpers or os_helpers):
+            self.skipTest("Neither the GCP nor the OpenStack SDK is"
+                          " installed")
+        if gcp_helpers:
+            # GCE matches list filter expressions against the whole value
+            self.assert_matches_baseline_search(
+                gcp_helpers.filter_pushdown('name', search=True),
+                lambda value, name: re.match('(?:%s)\\Z' % value, name))
+        if os_helpers:
+            # Nova searches for the name expression
+            self.assert_matches_baseline_search(
+                os_helpers.name_regex_pushdown('name'),
+                lambda value, name: re.search(value, name))
+
+    def test_glob_to_regex(self):
+        self.assertEqual(glob_to_regex('web-*.example?'),
+                         r'web-.*\.example.')
+        self.assertEqual(glob_to_regex('a+(b)'), r'a\+\(b\)')
+        self.assertIsNone(glob_to_regex('web-[12]'))
+
+    def test_chunked_reader(self):
+        reader = ChunkedReader(iter([b"abc", b"", b"defgh", b"ij"]))
+        self.assertEqual(reader.read(2), b"ab")
+        self.assertEqual(reader.read(4), b"cdef")
+        # Iterating picks up from the current position
+        self.assertEqual(list(reader), [b"gh", b"ij"])
+        self.assertEqual(reader.read(1), b"")
+
+        reader = ChunkedReader(iter([b"abc", b"defgh"]))
+        self.assertEqual(reader.read(1), b"a")
+        self.assertEqual(reader.read(), b"bcdefgh")
+
+    def test_cached_json(self):
+        cache_dir = os.path.join(tempfile.mkdtemp(), 'cache')
+        self.addCleanup(shutil.rmtree, os.path.dirname(cache_dir))
+        self.assertIsNone(cb_helpers.read_cached_json(cache_dir, 'doc.json'))
+        cb_helpers.write_cached_json(cache_dir, 'doc.json', {'a': [1, 2]})
+        self.assertEqual(cb_helpers.read_cached_json(cache_dir, 'doc.json'),
+                         {'a': [1, 2]})
+        self.assertListEqual(os.listdir(cache_dir), ['doc.json'])
+        # An empty cache directory disables caching
+        cb_helpers.write_cached_json('', 'doc.json', {})
+        self.assertIsNone(cb_helpers.read_cached_json('', 'doc.json'))
+
+    def test_client_pool(self):
+        created = []
+
+        def factory():
+            created.append(object())
+            return created[-1]
+
+        pool = ClientPool(factory, max_size=2)
+        client = pool.get()
+        self.assertIs(pool.get(), client)
+
+        # Running threads each get a client of their own
+        clients = []
+        started = threading.Semaphore(0)
+        release = threading.Event()
+
+        def use_pool():
+            clients.append(pool.get())
+            started.release()
+            release.wait()
+
+        threads = [threading.Thread(target=use_pool) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+            started.acquire()
+        self.assertEqual(len(created), 3)
+        self.assertNotIn(client, clients)
+        # The least recently used client is dropped from a full pool
+        self.assertEqual(len(pool), 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        # The clients of finished threads are handed to new threads
+        self.assertIn(pool.get(), clients)
+        thread = threading.Thread(target=use_pool)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(created), 3)
+
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+        pool.get()
+        self.assertEqual(len(created), 4)
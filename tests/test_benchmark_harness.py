@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+
+
+class BenchmarkHarnessTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    def test_suite_reports_throughput(self):
+        suite = harness.BenchmarkSuite()
+        calls = []
+
+        @suite.benchmark('things.list', items=10)
+        def list_things():
+            calls.append(1)
+
+        @suite.benchmark('other.list')
+        def list_others():
+            pass
+
+        results = suite.run(repeat=2, names=['things'])
+        self.assertEqual([r.name for r in results], ['things.list'])
+        # Two timed runs plus one for measuring memory
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(results[0].items, 10)
+        self.assertGreater(results[0].items_per_second, 0)
+
+    def test_compare_detects_regressions(self):
+        baselines = {'fast': {'items_per_second': 100,
+                              'peak_memory_kb': 10},
+                     'lean': {'items_per_second': 100,
+                              'peak_memory_kb': 10}}
+        results = [harness.Result('fast', 1, 1, 75, 10),
+                   harness.Result('lean', 1, 1, 100, 20),
+                   harness.Result('new', 1, 1, 1, 1000)]
+
+        regressions = harness.compare(results, baselines, tolerance=0.3)
+        self.assertEqual([(r.name, r.metric) for r in regressions],
+                         [('lean', 'peak_memory_kb')])
+
+        regressions = harness.compare(results, baselines, tolerance=0.2)
+        self.assertEqual([(r.name, r.metric) for r in regressions],
+                         [('fast', 'items_per_second'),
+                          ('lean', 'peak_memory_kb')])
+
+    def test_missing_baselines_fail(self):
+        path = os.path.join(tempfile.gettempdir(), 'cb-no-such-baselines',
+                            'mock.json')
+        self.assertNotEqual(main(['--baselines', path]), 0)
+
+    def test_save_missing_baselines(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'baselines', 'mock.json')
+        args = ['--save-missing', '--baselines', path, '--repeat', '1',
+                '--no-memory', '--instances', '1', '--volumes', '1',
+                '--buckets', '1', '--objects', '1', '--object-mb', '1',
+                'helpers']
+        # The first run records the baselines
+        self.assertEqual(main(args), 0)
+        saved = harness.load_baselines(path)
+        self.assertIn('helpers.generic_find', saved)
+        # Later runs compare against them, leaving them unchanged
+        main(args)
+        self.assertEqual(harness.load_baselines(path), saved)
@@ -1,3 +1,6 @@
+import json
+import subprocess
+import sys
 import unittest
 
 from cloudbridge import factory, interfaces
@@ -7,6 +10,19 @@ from cloudbridge.interfaces.provider import CloudProvider
 from cloudbridge.providers.aws import AWSCloudProvider
 
 
+# Creates a single provider in a fresh interpreter, and reports the time it
+# took along with which provider SDKs were imported as a result
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.time()
+from cloudbridge.factory import CloudProviderFactory
+CloudProviderFactory().create_provider(sys.argv[1], {})
+print(json.dumps({
+    'seconds': time.time() - start,
+    'modules': sorted(set(m.split('.')[0] for m in sys.modules))}))
+"""
+
+
 class CloudFactoryTestCase(unittest.TestCase):
 
     _multiprocess_can_split_ = True
@@ -84,3 +100,29 @@ class CloudFactoryTestCase(unittest.TestCase):
         factory.register_provider_class(DummyClass)
         self.assertTrue(DummyClass not in
                         factory.get_all_provider_classes())
+
+    def test_create_provider_imports_only_that_provider(self):
+        # Creating a provider should not import the modules, or SDKs, of any
+        # of the other providers
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_SCRIPT, factory.ProviderList.AWS])
+        result = json.loads(output.decode('utf-8').splitlines()[-1])
+        self.assertIn('boto3', result['modules'])
+        for module in ('azure', 'googleapiclient', 'keystoneclient',
+                       'novaclient', 'swiftclient', 'moto'):
+            self.assertNotIn(module, result['modules'])
+        # A generous bound, to catch an accidental import of all providers
+        # without being sensitive to the speed of the machine
+        self.assertLess(result['seconds'], 10)
+
+    def test_get_provider_class_is_lazy(self):
+        cb_factory = CloudProviderFactory()
+        self.assertEqual(cb_factory.get_provider_class(
+            factory.ProviderList.AWS), AWSCloudProvider)
+        self.assertEqual(list(cb_factory.provider_list), ['aws'])
+
+    def test_provider_paths_include_builtins(self):
+        paths = CloudProviderFactory().provider_paths
+        for provider_id in factory.PROVIDER_PATHS:
+            self.assertEqual(paths[provider_id],
+                             factory.PROVIDER_PATHS[provider_id])
@@ -2,8 +2,10 @@ import itertools
 
 import six
 
+from cloudbridge.base import helpers as cb_helpers
 from cloudbridge.base.helpers import get_env
 from cloudbridge.base.resources import ClientPagedResultList
+from cloudbridge.base.resources import LazyClientPagedResultList
 from cloudbridge.base.resources import ServerPagedResultList
 
 from tests.helpers import ProviderTestBase
@@ -62,6 +64,46 @@ class CloudHelpersTestCase(ProviderTestBase):
         self.assertFalse(results.supports_server_paging, "Client paged result"
                          " lists should return False for server paging.")
 
+    def test_lazy_client_paged_result_list(self):
+        objects = self.objects
+        consumed = []
+
+        def object_iter(marker):
+            for obj in objects:
+                if marker and obj.id <= marker:
+                    continue
+                consumed.append(obj.id)
+                yield obj
+
+        # A list with limit=2 and marker=None
+        results = LazyClientPagedResultList(self.provider, object_iter, 2)
+        self.assertListEqual(results, list(itertools.islice(objects, 2)))
+        self.assertEqual(results.marker, objects[1].id)
+        self.assertTrue(results.is_truncated)
+        self.assertFalse(results.supports_total)
+        self.assertIsNone(results.total_results)
+        # Only the page plus one should have been consumed
+        self.assertListEqual(consumed, [1, 2, 3])
+        self.assertListEqual(list(results.data), objects)
+
+        # A list with limit=2 and marker=2 should seek past the marker
+        del consumed[:]
+        results = LazyClientPagedResultList(self.provider, object_iter, 2, 2)
+        self.assertListEqual(results, list(itertools.islice(objects, 2, 4)))
+        self.assertEqual(results.marker, None)
+        self.assertFalse(results.is_truncated)
+        self.assertListEqual(consumed, [3, 4])
+
+        # A source that cannot seek is skipped past the marker instead
+        results = LazyClientPagedResultList(
+            self.provider, lambda _: iter(objects), 2, 3, seekable=False)
+        self.assertListEqual(results, list(itertools.islice(objects, 3, 4)))
+        self.assertFalse(results.is_truncated)
+        self.assertEqual(results.marker, None)
+
+        self.assertFalse(results.supports_server_paging, "Client paged result"
+                         " lists should return False for server paging.")
+
     def test_server_paged_result_list(self):
 
         objects = list(itertools.islice(self.objects, 2))
@@ -105,3 +147,15 @@ class CloudHelpersTestCase(ProviderTestBase):
         int_value = self.provider._get_config_value(
             'default_result_limit', None)
         self.assertIsInstance(int_value, int)
+
+    def test_concurrent_use(self):
+        # Hammer a single provider from many threads at once
+        def list_resources(_):
+            return (sorted(r.id for r in self.provider.compute.regions),
+                    sorted(k.id for k in self.provider.security.key_pairs),
+                    sorted(n.id for n in self.provider.networking.networks))
+
+        results = cb_helpers.concurrent_map(list_resources, range(64), 16)
+        self.assertEqual(len(results), 64)
+        for result in results:
+            self.assertEqual(result, results[0])
@@ -1,5 +1,7 @@
 import ipaddress
 
+from pyeventsystem.middleware import observe
+
 import six
 
 from cloudbridge.base import helpers as cb_helpers
@@ -7,6 +9,7 @@ from cloudbridge.base.resources import BaseNetwork
 from cloudbridge.factory import ProviderList
 from cloudbridge.interfaces import InstanceState
 from cloudbridge.interfaces import InvalidConfigurationException
+from cloudbridge.interfaces.exceptions import InvalidParamException
 from cloudbridge.interfaces.exceptions import WaitStateException
 from cloudbridge.interfaces.resources import Instance
 from cloudbridge.interfaces.resources import SnapshotState
@@ -17,6 +20,19 @@ from tests.helpers import ProviderTestBase
 from tests.helpers import standard_interface_tests as sit
 
 
+class EventCounter(object):
+    """
+    Records the provider events dispatched while it is installed.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    @observe(event_pattern="provider.*", priority=100)
+    def count(self, event_args, *args, **kwargs):
+        self.events.append(event_args.get('event'))
+
+
 class CloudComputeServiceTestCase(ProviderTestBase):
 
     _multiprocess_can_split_ = True
@@ -170,6 +186,72 @@ class CloudComputeServiceTestCase(ProviderTestBase):
                              "Instance's placement zone could not be "
                              " found in zones list")
 
+            # Relationships prefetched when listing must match those
+            # resolved for a single instance, and be read without any
+            # further requests
+            relations = ['vm_firewalls', 'vm_type', 'subnet', 'floating_ips']
+            prefetched = None
+            marker = None
+            while prefetched is None:
+                page = self.provider.compute.instances.list(
+                    marker=marker, prefetch=relations)
+                prefetched = next((inst for inst in page
+                                   if inst.id == test_instance.id), None)
+                if not page.is_truncated:
+                    break
+                marker = page.marker
+            self.assertIsNotNone(
+                prefetched, "Instance {0} was not listed".format(
+                    test_instance.id))
+            counter = EventCounter()
+            handler = self.provider.middleware.add(counter)
+            try:
+                values = dict((relation, getattr(prefetched, relation))
+                              for relation in relations)
+            finally:
+                self.provider.middleware.remove(handler)
+            self.assertEqual(
+                counter.events, [],
+                "Reading prefetched relationships dispatched events")
+            for relation in relations:
+                self.assertEqual(
+                    values[relation], getattr(test_instance, relation),
+                    "Prefetched %s does not match" % relation)
+            with self.assertRaises(InvalidParamException):
+                self.provider.compute.instances.list(prefetch=['volumes'])
+
+    @helpers.skipIfNoService(['compute.instances', 'networking.networks'])
+    def test_create_instance_count(self):
+        label = "cb-instcount-{0}".format(helpers.get_uuid())
+        instances = []
+
+        def cleanup_instances():
+            for inst in instances:
+                inst.delete()
+            if instances:
+                self.provider.wait_for_all(
+                    instances, [InstanceState.DELETED, InstanceState.UNKNOWN])
+
+        with cb_helpers.cleanup_action(cleanup_instances):
+            subnet = helpers.get_or_create_default_subnet(self.provider)
+            with self.assertRaises(InvalidParamException):
+                self.provider.compute.instances.create(
+                    label, helpers.get_provider_test_data(self.provider,
+                                                          'image'),
+                    helpers.get_provider_test_data(self.provider, 'vm_type'),
+                    subnet, count=0)
+            instances.extend(self.provider.compute.instances.create(
+                label, helpers.get_provider_test_data(self.provider, 'image'),
+                helpers.get_provider_test_data(self.provider, 'vm_type'),
+                subnet, count=2))
+            self.assertEqual(len(instances), 2)
+            self.assertEqual(len(set(inst.id for inst in instances)), 2)
+            for inst in instances:
+                self.assertIsInstance(inst, Instance)
+                self.assertEqual(inst.label, label)
+            self.provider.wait_for_all(instances, [InstanceState.RUNNING],
+                                       terminal_states=[InstanceState.ERROR])
+
     @helpers.skipIfNoService(['compute.instances', 'compute.images',
                               'compute.vm_types'])
     def test_block_device_mapping_launch_config(self):
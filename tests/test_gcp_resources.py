@@ -0,0 +1,315 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+
+from pyeventsystem.events import SimpleEventDispatcher
+from pyeventsystem.middleware import SimpleMiddlewareManager
+
+from cloudbridge.base import helpers as cb_helpers
+from cloudbridge.base.provider import BaseConfiguration
+from cloudbridge.base.resources import ServerPagedResultList
+
+try:
+    from cloudbridge.providers.gcp import provider as gcp_provider
+    from cloudbridge.providers.gcp.provider import GCPDiscoveryCache
+    from cloudbridge.providers.gcp.provider import GCPResources
+    from cloudbridge.providers.gcp.services import GCPNetworkService
+    from cloudbridge.providers.gcp.services import GCPVolumeService
+except ImportError:
+    GCPResources = None
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Values used to fill in the parameters of resource paths. Some parameters
+# span several path segments.
+PARAMETER_VALUES = {
+    'project': 'galaxy-on-gcp',
+    'region': 'us-central1',
+    'zone': 'us-central1-a',
+    'bucket': 'cb-bucket',
+    'object': 'logs/2019/app.log',
+    'firewallPolicy': 'firewallPolicies/123',
+    'securityPolicy': 'securityPolicies/456',
+    'parentName': 'reservations/cb-res/reservationBlocks/cb-block',
+}
+
+
+def load_discovery_document(api):
+    """
+    Loads a discovery document of a GCP API, trimmed to the ``get`` methods
+    which GCPResources reads.
+    """
+    path = os.path.join(FIXTURES, 'gcp_{0}_v1_discovery.json'.format(api))
+    with open(path) as f:
+        return json.load(f)
+
+
+class FakeConnection(object):
+
+    def __init__(self, desc):
+        self._resourceDesc = desc
+
+
+def linear_parse(table, url):
+    """
+    Parses a resource URL the way GCPResources did before URLs were routed
+    through a trie: by trying each resource pattern in turn.
+    """
+    for resource, desc in table.items():
+        m = re.match(desc['pattern'], url)
+        if m is None or len(m.group(0)) < len(url):
+            continue
+        return resource, dict(
+            (parameter, m.group(index + 1))
+            for index, parameter in enumerate(desc['parameters']))
+    return None
+
+
+@unittest.skipIf(GCPResources is None, "The GCP SDK is not installed")
+class GCPResourcesTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    def sample_paths(self, desc):
+        paths = []
+        for resource, resource_desc in desc['resources'].items():
+            path = resource_desc['methods']['get']['path']
+            default = 'cb-' + resource.lower()
+            paths.append(re.sub(
+                r'{\+?(\w+)}',
+                lambda m: PARAMETER_VALUES.get(m.group(1), default), path))
+        return paths
+
+    def check_matches_linear_scan(self, api):
+        desc = load_discovery_document(api)
+        resources = GCPResources(FakeConnection(desc))
+        table = GCPResources.build_table(desc)
+        prefix = 'https://www.googleapis.com/' + desc['servicePath']
+        paths = self.sample_paths(desc)
+        urls = []
+        for path in paths:
+            urls.extend([path, prefix + path, ' ' + prefix + path + '\n',
+                         path + '/extra', prefix + path + 's/x',
+                         path.replace('galaxy-on-gcp', 'Bad Project')])
+        urls.extend(['', 'projects', prefix, 'https://example.com/x'])
+
+        parsed_count = 0
+        for url in urls:
+            stripped = url.strip()
+            m = resources.RESOURCE_REGEX.match(stripped)
+            expected = linear_parse(table, m.group(2) if m else stripped)
+            # Parse twice, to also check the cached result
+            for _ in range(2):
+                out = resources.parse_url(url)
+                actual = (out._resource, out.parameters) if out else None
+                self.assertEqual(actual, expected, "Parsed %r" % url)
+            if expected:
+                parsed_count += 1
+                # Callers may change the parameters of a parsed URL
+                out.parameters['project'] = 'changed'
+                self.assertEqual(resources.parse_url(url).parameters,
+                                 expected[1])
+        # Most sample URLs refer to a resource
+        self.assertGreater(parsed_count, len(paths))
+
+    def test_compute_urls_match_linear_scan(self):
+        self.check_matches_linear_scan('compute')
+
+    def test_storage_urls_match_linear_scan(self):
+        self.check_matches_linear_scan('storage')
+
+    def test_cache_name_includes_format(self):
+        name = GCPDiscoveryCache._cache_name('compute', 'v1')
+        self.assertIn('v{0}'.format(GCPDiscoveryCache.CACHE_FORMAT), name)
+        self.assertIn('compute-v1', name)
+
+
+class FakeDiscovery(object):
+    """
+    Stands in for the googleapiclient discovery module, and records the
+    discovery documents fetched.
+    """
+
+    def __init__(self, desc):
+        self.desc = desc
+        self.fetches = []
+        self.error = None
+
+    def build(self, api, version, **kwargs):
+        self.fetches.append((api, version))
+        if self.error:
+            raise self.error
+        return FakeConnection(self.desc)
+
+    def build_from_document(self, desc, **kwargs):
+        return FakeConnection(desc)
+
+
+@unittest.skipIf(GCPResources is None, "The GCP SDK is not installed")
+class GCPDiscoveryCacheTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.desc = load_discovery_document('storage')
+        self.discovery = FakeDiscovery(self.desc)
+        self._discovery = gcp_provider.discovery
+        gcp_provider.discovery = self.discovery
+
+    def tearDown(self):
+        gcp_provider.discovery = self._discovery
+        shutil.rmtree(self.cache_dir)
+
+    def write_entry(self, fetched_at, desc=None):
+        desc = desc or self.desc
+        cb_helpers.write_cached_json(
+            self.cache_dir, GCPDiscoveryCache._cache_name('storage', 'v1'),
+            {'fetched_at': fetched_at, 'document': desc,
+             'resources': GCPResources.build_table(desc)})
+
+    def read_entry(self):
+        return cb_helpers.read_cached_json(
+            self.cache_dir, GCPDiscoveryCache._cache_name('storage', 'v1'))
+
+    def test_warm_cache_needs_no_fetch(self):
+        self.write_entry(time.time())
+        service, table = GCPDiscoveryCache(self.cache_dir).build(
+            'storage', 'v1', None)
+        self.assertEqual(self.discovery.fetches, [])
+        self.assertEqual(service._resourceDesc, self.desc)
+        self.assertIn('objects', table)
+        # The compiled table is ready to route URLs
+        resources = GCPResources(service, resource_table=table)
+        self.assertEqual(resources.parse_url('b/cb-bucket').parameters,
+                         {'bucket': 'cb-bucket'})
+
+    def test_stale_cache_is_refreshed(self):
+        old_desc = dict(self.desc, revision='1')
+        self.write_entry(0, old_desc)
+        cache = GCPDiscoveryCache(self.cache_dir)
+        service, _ = cache.build('storage', 'v1', None)
+        self.assertEqual(self.discovery.fetches, [('storage', 'v1')])
+        self.assertEqual(service._resourceDesc, self.desc)
+        entry = self.read_entry()
+        self.assertEqual(entry['document'], self.desc)
+        self.assertGreater(entry['fetched_at'], 0)
+        # The refreshed entry is used from then on
+        cache.build('storage', 'v1', None)
+        GCPDiscoveryCache(self.cache_dir).build('storage', 'v1', None)
+        self.assertEqual(len(self.discovery.fetches), 1)
+
+    def test_failed_refresh_uses_stale_cache(self):
+        old_desc = dict(self.desc, revision='1')
+        self.write_entry(0, old_desc)
+        self.discovery.error = IOError("Discovery is unavailable")
+        service, table = GCPDiscoveryCache(self.cache_dir).build(
+            'storage', 'v1', None)
+        self.assertEqual(self.discovery.fetches, [('storage', 'v1')])
+        self.assertEqual(service._resourceDesc, old_desc)
+        self.assertIn('objects', table)
+        # The stale copy is kept, so that the next build tries again
+        self.assertEqual(self.read_entry()['fetched_at'], 0)
+
+    def test_failed_fetch_without_cache_raises(self):
+        self.discovery.error = IOError("Discovery is unavailable")
+        with self.assertRaises(IOError):
+            GCPDiscoveryCache(self.cache_dir).build('storage', 'v1', None)
+
+
+class FakeListRequest(object):
+
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeCollection(object):
+    """
+    Serves a list of items in pages, and records the list requests made.
+    """
+
+    def __init__(self, items, page_size):
+        self.items = items
+        self.page_size = page_size
+        self.requests = []
+
+    def list(self, pageToken=None, maxResults=None, **kwargs):
+        self.requests.append(dict(kwargs, pageToken=pageToken,
+                                  maxResults=maxResults))
+        start = int(pageToken or 0)
+        end = start + min(self.page_size, maxResults or self.page_size)
+        response = {'items': self.items[start:end]}
+        if end < len(self.items):
+            response['nextPageToken'] = str(end)
+        return FakeListRequest(response)
+
+
+class FakeCompute(object):
+
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getattr__(self, name):
+        try:
+            return lambda: self.collections[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class FakeProvider(object):
+
+    project_name = 'galaxy-on-gcp'
+    zone_name = 'us-central1-a'
+
+    def __init__(self, **collections):
+        self.config = BaseConfiguration({})
+        self.middleware = SimpleMiddlewareManager(SimpleEventDispatcher())
+        self.gcp_compute = FakeCompute(**collections)
+
+
+@unittest.skipIf(GCPResources is None, "The GCP SDK is not installed")
+class GCPFindTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    def test_find_networks_past_first_page(self):
+        networks = FakeCollection(
+            [{'name': 'cb-net-{0}'.format(i),
+              'selfLink': 'global/networks/cb-net-{0}'.format(i)}
+             for i in range(120)], page_size=40)
+        service = GCPNetworkService(FakeProvider(networks=networks))
+        found = service.find(name='cb-net-11?')
+        self.assertEqual(sorted(net.name for net in found),
+                         ['cb-net-11{0}'.format(i) for i in range(10)])
+        self.assertEqual(len(networks.requests), 3)
+        self.assertEqual(networks.requests[0]['filter'],
+                         '(name eq .*cb-net-11.)')
+
+    def test_find_volumes_by_label(self):
+        volumes = FakeCollection(
+            [{'name': 'disk-{0}'.format(i),
+              'labels': {'cblabel': 'cb-vol'}} for i in range(3)],
+            page_size=2)
+        service = GCPVolumeService(FakeProvider(disks=volumes))
+        # A literal label is matched exactly by the server, which pages
+        found = service.find(label='cb-vol', limit=2)
+        self.assertIsInstance(found, ServerPagedResultList)
+        self.assertTrue(found.is_truncated)
+        self.assertEqual(len(found), 2)
+        self.assertEqual(
+            volumes.requests,
+            [{'project': 'galaxy-on-gcp', 'zone': 'us-central1-a',
+              'filter': '(labels.cblabel eq cb-vol)', 'maxResults': 2,
+              'pageToken': None}])
+        # A pattern is also filtered client-side, over every page
+        del volumes.requests[:]
+        found = service.find(label='cb-v*')
+        self.assertEqual(len(found), 3)
+        self.assertEqual(len(volumes.requests), 2)
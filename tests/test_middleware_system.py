@@ -1,14 +1,28 @@
+import json
+import threading
+import time
 import unittest
 
 from pyeventsystem.events import SimpleEventDispatcher
 from pyeventsystem.middleware import SimpleMiddlewareManager
 from pyeventsystem.middleware import implement
 
+from cloudbridge.base.metrics import StatsdExporter
 from cloudbridge.base.middleware import EventDebugLoggingMiddleware
 from cloudbridge.base.middleware import ExceptionWrappingMiddleware
+from cloudbridge.base.middleware import MetricsMiddleware
+from cloudbridge.base.middleware import RateLimitingMiddleware
+from cloudbridge.base.middleware import ResourceCacheMiddleware
+from cloudbridge.base.middleware import SingleFlightMiddleware
+from cloudbridge.base.provider import BaseConfiguration
+from cloudbridge.base.ratelimit import TokenBucket
+from cloudbridge.base.ratelimit import get_throttle
+from cloudbridge.base.ratelimit import parse_retry_after
+from cloudbridge.base.waiters import FixedIntervalWaitStrategy
 from cloudbridge.interfaces.exceptions import CloudBridgeBaseException
 from cloudbridge.interfaces.exceptions import \
     InvalidConfigurationException
+from cloudbridge.interfaces.exceptions import RateLimitExceededException
 
 from .helpers import skipIfPython
 
@@ -93,3 +107,424 @@ class EventDebugLoggingMiddlewareTestCase(unittest.TestCase):
         self.assertTrue(
             "hello world" in cm.output[1],
             "Log output {0} does not contain result".format(cm.output[1]))
+
+
+class ResourceCacheMiddlewareTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    class SomeDummyService(object):
+
+        def __init__(self):
+            self.call_count = 0
+
+        @implement(event_pattern="provider.some.things.get", priority=2500)
+        def get(self, thing_id):
+            self.call_count += 1
+            return "thing-{0}".format(thing_id)
+
+        @implement(event_pattern="provider.some.things.create",
+                   priority=2500)
+        def create(self, thing_id):
+            return "thing-{0}".format(thing_id)
+
+    def _create_manager(self, cache):
+        dispatcher = SimpleEventDispatcher()
+        manager = SimpleMiddlewareManager(dispatcher)
+        manager.add(cache)
+        service = self.SomeDummyService()
+        manager.add(service)
+        return dispatcher, service
+
+    def test_results_are_cached(self):
+        cache = ResourceCacheMiddleware()
+        dispatcher, service = self._create_manager(cache)
+
+        for _ in range(3):
+            self.assertEqual(
+                dispatcher.dispatch(self, "provider.some.things.get", "a"),
+                "thing-a")
+        dispatcher.dispatch(self, "provider.some.things.get", "b")
+
+        self.assertEqual(service.call_count, 2)
+        self.assertEqual(cache.stats['hits'], 2)
+        self.assertEqual(cache.stats['misses'], 2)
+        self.assertEqual(
+            cache.stats['events']['provider.some.things.get']['hits'], 2)
+
+    def test_results_are_cached_per_provider(self):
+        class SomeDummySender(object):
+            def __init__(self, provider):
+                self.provider = provider
+
+        class SomeDummyProvider(object):
+            region_name = 'some-region'
+
+        cache = ResourceCacheMiddleware()
+        dispatcher, service = self._create_manager(cache)
+        # Two providers, for example of two accounts, in the same region
+        first = SomeDummySender(SomeDummyProvider())
+        second = SomeDummySender(SomeDummyProvider())
+
+        dispatcher.dispatch(first, "provider.some.things.get", "a")
+        dispatcher.dispatch(second, "provider.some.things.get", "a")
+        dispatcher.dispatch(first, "provider.some.things.get", "a")
+
+        self.assertEqual(service.call_count, 2)
+        self.assertEqual(cache.stats['hits'], 1)
+
+    def test_create_invalidates_service_results(self):
+        cache = ResourceCacheMiddleware()
+        dispatcher, service = self._create_manager(cache)
+
+        dispatcher.dispatch(self, "provider.some.things.get", "a")
+        dispatcher.dispatch(self, "provider.some.things.create", "b")
+        dispatcher.dispatch(self, "provider.some.things.get", "a")
+
+        self.assertEqual(service.call_count, 2)
+        self.assertEqual(cache.stats['invalidations'], 1)
+
+    def test_expired_results_are_refetched(self):
+        cache = ResourceCacheMiddleware(ttl=0)
+        dispatcher, service = self._create_manager(cache)
+
+        dispatcher.dispatch(self, "provider.some.things.get", "a")
+        dispatcher.dispatch(self, "provider.some.things.get", "a")
+
+        self.assertEqual(service.call_count, 2)
+
+    def test_least_recently_used_results_are_evicted(self):
+        cache = ResourceCacheMiddleware(maxsize=1)
+        dispatcher, service = self._create_manager(cache)
+
+        dispatcher.dispatch(self, "provider.some.things.get", "a")
+        dispatcher.dispatch(self, "provider.some.things.get", "b")
+        dispatcher.dispatch(self, "provider.some.things.get", "a")
+
+        self.assertEqual(service.call_count, 3)
+        self.assertEqual(cache.stats['size'], 1)
+
+
+class MetricsMiddlewareTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    class SomeDummyProvider(object):
+        PROVIDER_ID = 'dummy'
+
+    class SomeDummyService(object):
+
+        def __init__(self, provider):
+            self.provider = provider
+
+        @implement(event_pattern="provider.some.things.get", priority=2500)
+        def get(self, thing_id):
+            if thing_id is None:
+                raise ValueError("No thing id")
+            return "thing-{0}".format(thing_id)
+
+    class RecordingExporter(object):
+
+        def __init__(self):
+            self.records = []
+
+        def record(self, provider_id, event, elapsed, error):
+            self.records.append((provider_id, event, error))
+
+    def _create_manager(self, metrics):
+        dispatcher = SimpleEventDispatcher()
+        manager = SimpleMiddlewareManager(dispatcher)
+        manager.add(metrics)
+        manager.add(ExceptionWrappingMiddleware())
+        service = self.SomeDummyService(self.SomeDummyProvider())
+        manager.add(service)
+        return dispatcher, service
+
+    def test_calls_and_errors_are_counted(self):
+        exporter = self.RecordingExporter()
+        metrics = MetricsMiddleware(exporters=[exporter])
+        dispatcher, service = self._create_manager(metrics)
+
+        for _ in range(3):
+            dispatcher.dispatch(service, "provider.some.things.get", "a")
+        with self.assertRaises(CloudBridgeBaseException):
+            dispatcher.dispatch(service, "provider.some.things.get", None)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['calls'], 4)
+        self.assertEqual(snapshot['errors'], 1)
+        stats = snapshot['providers']['dummy']['provider.some.things.get']
+        self.assertEqual(stats['calls'], 4)
+        self.assertEqual(stats['error_types'],
+                         {'CloudBridgeBaseException': 1})
+        self.assertEqual(stats['latency']['count'], 4)
+        self.assertEqual(sum(stats['latency']['buckets'].values()), 4)
+        self.assertLessEqual(stats['latency']['p50'],
+                             stats['latency']['max'])
+        self.assertEqual(
+            exporter.records[-1],
+            ('dummy', 'provider.some.things.get', True))
+        self.assertEqual(metrics.slowest(1)[0][:2],
+                         ('dummy', 'provider.some.things.get'))
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['calls'], 0)
+
+    def test_prometheus_export(self):
+        metrics = MetricsMiddleware(buckets=(0.1, 1.0, float('inf')))
+        metrics.record('dummy', 'provider.some.things.get', 0.05)
+        metrics.record('dummy', 'provider.some.things.get', 0.5,
+                       ValueError())
+
+        output = metrics.to_prometheus()
+        labels = 'provider="dummy",event="provider.some.things.get"'
+        self.assertIn('cloudbridge_event_calls_total{%s} 2' % labels,
+                      output)
+        self.assertIn('cloudbridge_event_errors_total{%s} 1' % labels,
+                      output)
+        self.assertIn('cloudbridge_event_duration_seconds_bucket{%s,'
+                      'le="0.1"} 1' % labels, output)
+        self.assertIn('cloudbridge_event_duration_seconds_bucket{%s,'
+                      'le="+Inf"} 2' % labels, output)
+        self.assertIn('cloudbridge_event_duration_seconds_count{%s} 2'
+                      % labels, output)
+
+    def test_statsd_format(self):
+        exporter = StatsdExporter(prefix='cb')
+        self.addCleanup(exporter.close)
+        self.assertEqual(
+            exporter.format('aws', 'provider.compute.instances.list', 0.25,
+                            True),
+            "cb.aws.compute.instances.list.calls:1|c\n"
+            "cb.aws.compute.instances.list.latency:250.000|ms\n"
+            "cb.aws.compute.instances.list.errors:1|c")
+
+
+class RateLimitingMiddlewareTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    class ThrottlingError(Exception):
+        # Shaped like a botocore ClientError
+        def __init__(self, code='RequestLimitExceeded', retry_after=None):
+            super(RateLimitingMiddlewareTestCase.ThrottlingError,
+                  self).__init__(code)
+            headers = {'retry-after': retry_after} if retry_after else {}
+            self.response = {'Error': {'Code': code},
+                             'ResponseMetadata': {'HTTPStatusCode': 503,
+                                                  'HTTPHeaders': headers}}
+
+    class SomeDummyProvider(object):
+
+        def __init__(self, config):
+            self.config = BaseConfiguration(config)
+
+        def _get_api_family(self, event):
+            return event.split('.')[1]
+
+    class SomeDummyService(object):
+
+        def __init__(self, throttles):
+            self.throttles = throttles
+            self.call_count = 0
+
+        def _call(self, thing_id):
+            self.call_count += 1
+            if self.call_count <= self.throttles:
+                raise RateLimitingMiddlewareTestCase.ThrottlingError()
+            return "thing-{0}".format(thing_id)
+
+        @implement(event_pattern="provider.some.things.get", priority=2500)
+        def get(self, thing_id):
+            return self._call(thing_id)
+
+        @implement(event_pattern="provider.some.things.create",
+                   priority=2500)
+        def create(self, thing_id):
+            return self._call(thing_id)
+
+    def _create_manager(self, throttles, **config):
+        provider = self.SomeDummyProvider(config)
+        limiter = RateLimitingMiddleware(provider)
+        # Retry without delay
+        limiter._backoff = FixedIntervalWaitStrategy()
+        limiter.MAX_RETRY_DELAY = 0
+        dispatcher = SimpleEventDispatcher()
+        manager = SimpleMiddlewareManager(dispatcher)
+        manager.add(ExceptionWrappingMiddleware())
+        manager.add(limiter)
+        service = self.SomeDummyService(throttles)
+        manager.add(service)
+        return dispatcher, limiter, service
+
+    def test_throttled_lookups_are_retried(self):
+        dispatcher, limiter, service = self._create_manager(2)
+        self.assertEqual(
+            dispatcher.dispatch(self, "provider.some.things.get", "a"),
+            "thing-a")
+        self.assertEqual(service.call_count, 3)
+        stats = limiter.stats['some']
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['throttles'], 2)
+        self.assertEqual(stats['retries'], 2)
+
+    def test_retries_are_limited(self):
+        dispatcher, limiter, service = self._create_manager(
+            5, throttle_max_retries=1)
+        with self.assertRaises(RateLimitExceededException):
+            dispatcher.dispatch(self, "provider.some.things.get", "a")
+        self.assertEqual(service.call_count, 2)
+
+        # Changes are not retried, since they may have been partly applied
+        dispatcher, limiter, service = self._create_manager(1)
+        with self.assertRaises(RateLimitExceededException):
+            dispatcher.dispatch(self, "provider.some.things.create", "a")
+        self.assertEqual(service.call_count, 1)
+        self.assertEqual(limiter.stats['some']['retries'], 0)
+
+    def test_requests_are_rate_limited(self):
+        dispatcher, limiter, _ = self._create_manager(
+            0, rate_limit=20, rate_limit_burst=2)
+        for _ in range(4):
+            dispatcher.dispatch(self, "provider.some.things.get", "a")
+        stats = limiter.stats['some']
+        self.assertEqual(stats['requests'], 4)
+        self.assertEqual(stats['waits'], 2)
+        self.assertGreater(stats['wait_time'], 0)
+        limiter.reset()
+        self.assertEqual(limiter.stats, {})
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        bucket = TokenBucket()
+        self.assertEqual(bucket.reserve(), 0)
+        bucket.pause(10)
+        self.assertGreater(bucket.reserve(), 9)
+
+    def test_get_throttle(self):
+        throttle = get_throttle(self.ThrottlingError('SlowDown', '3'))
+        self.assertEqual(throttle, ('SlowDown', 3))
+
+        class GoogleResponse(dict):
+            status = 403
+
+        google_error = Exception()
+        google_error.resp = GoogleResponse({'retry-after': '5'})
+        google_error.content = json.dumps({'error': {'errors': [
+            {'reason': 'rateLimitExceeded'}]}}).encode('utf-8')
+        self.assertEqual(get_throttle(google_error),
+                         ('rateLimitExceeded', 5))
+
+        azure_error = Exception()
+        azure_error.status_code = 429
+        self.assertEqual(get_throttle(azure_error), ('TooManyRequests', None))
+
+        # Shaped like novaclient's OverLimit
+        class OverLimit(Exception):
+            http_status = 413
+
+            def __init__(self, code, message=None, retry_after=0):
+                super(OverLimit, self).__init__(message)
+                self.code = code
+                self.retry_after = retry_after
+
+        self.assertEqual(get_throttle(OverLimit(413, retry_after=7)),
+                         ('OverLimit', 7))
+
+        # Shaped like an openstacksdk HttpException
+        sdk_error = Exception()
+        sdk_error.status_code = 413
+        sdk_error.response = type('Response', (object,), {
+            'status_code': 413, 'headers': {'Retry-After': '2'}})()
+        self.assertEqual(get_throttle(sdk_error), ('OverLimit', 2))
+        sdk_error.response.headers = {}
+        self.assertIsNone(get_throttle(sdk_error))
+
+        self.assertIsNone(get_throttle(ValueError()))
+        self.assertIsNone(get_throttle(
+            self.ThrottlingError('InvalidInstanceID.NotFound')))
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'),
+                         0)
+
+
+class SingleFlightMiddlewareTestCase(unittest.TestCase):
+
+    _multiprocess_can_split_ = True
+
+    class SomeDummyService(object):
+
+        def __init__(self):
+            self.call_count = 0
+            self.release = threading.Event()
+
+        @implement(event_pattern="provider.some.things.get", priority=2500)
+        def get(self, thing_id):
+            self.call_count += 1
+            self.release.wait(10)
+            if thing_id is None:
+                raise ValueError("No thing id")
+            return "thing-{0}".format(thing_id)
+
+    def _create_manager(self, single_flight):
+        dispatcher = SimpleEventDispatcher()
+        manager = SimpleMiddlewareManager(dispatcher)
+        manager.add(single_flight)
+        service = self.SomeDummyService()
+        manager.add(service)
+        return dispatcher, service
+
+    def _dispatch_concurrently(self, dispatcher, thing_id, wait_until):
+        outcomes = []
+
+        def get_thing():
+            try:
+                outcomes.append(dispatcher.dispatch(
+                    self, "provider.some.things.get", thing_id))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads = [threading.Thread(target=get_thing) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for _ in range(1000):
+            if wait_until():
+                break
+            time.sleep(0.01)
+        return threads, outcomes
+
+    def test_concurrent_calls_are_coalesced(self):
+        single_flight = SingleFlightMiddleware()
+        dispatcher, service = self._create_manager(single_flight)
+        threads, outcomes = self._dispatch_concurrently(
+            dispatcher, "a", lambda: single_flight.stats['coalesced'] == 4)
+        service.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(service.call_count, 1)
+        self.assertEqual(outcomes, ["thing-a"] * 5)
+        self.assertEqual(single_flight.stats['in_flight'], 0)
+
+        # Exceptions are shared too, and later calls are made afresh
+        service.release.clear()
+        threads, outcomes = self._dispatch_concurrently(
+            dispatcher, None, lambda: single_flight.stats['coalesced'] == 8)
+        service.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(service.call_count, 2)
+        self.assertEqual(len(outcomes), 5)
+        self.assertTrue(all(isinstance(e, ValueError) for e in outcomes))
+
+    def test_excluded_events_are_not_coalesced(self):
+        single_flight = SingleFlightMiddleware(exclude=['provider.some.*'])
+        dispatcher, service = self._create_manager(single_flight)
+        threads, outcomes = self._dispatch_concurrently(
+            dispatcher, "a", lambda: service.call_count == 5)
+        service.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(service.call_count, 5)
+        self.assertEqual(single_flight.stats['calls'], 0)
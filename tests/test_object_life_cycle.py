@@ -30,6 +30,7 @@ class CloudObjectLifeCycleTestCase(ProviderTestBase):
                 test_vol.wait_for([VolumeState.ERROR], timeout=10, interval=20)
 
             test_vol.wait_till_ready()
+            self.assertTrue(self.provider.wait_metrics.last.succeeded)
             # Hitting a terminal state should raise an exception
             with self.assertRaises(WaitStateException):
                 test_vol.wait_for([VolumeState.ERROR],
@@ -38,3 +39,36 @@ class CloudObjectLifeCycleTestCase(ProviderTestBase):
             # Hitting the timeout should raise an exception
             with self.assertRaises(WaitStateException):
                 test_vol.wait_for([VolumeState.ERROR], timeout=0, interval=0)
+            self.assertFalse(self.provider.wait_metrics.last.succeeded)
+
+    @helpers.skipIfNoService(['storage.volumes'])
+    def test_wait_for_all(self):
+        # Test batched waiting by using a pair of volumes.
+        label = "cb-waitforall-{0}".format(helpers.get_uuid())
+        vol1 = vol2 = None
+        with cb_helpers.cleanup_action(lambda: vol1.delete()):
+            vol1 = self.provider.storage.volumes.create(label, 1)
+            with cb_helpers.cleanup_action(lambda: vol2.delete()):
+                vol2 = self.provider.storage.volumes.create(label, 1)
+
+                self.assertTrue(self.provider.wait_for_all(
+                    [vol1, vol2], [VolumeState.AVAILABLE],
+                    terminal_states=[VolumeState.ERROR]))
+                self.assertEqual(vol1.state, VolumeState.AVAILABLE)
+                self.assertEqual(vol2.state, VolumeState.AVAILABLE)
+
+                # Waiting on an empty list should return immediately
+                self.assertTrue(self.provider.wait_for_all(
+                    [], [VolumeState.AVAILABLE]))
+
+                # Hitting a terminal state should raise an exception
+                with self.assertRaises(WaitStateException):
+                    self.provider.wait_for_all(
+                        [vol1, vol2], [VolumeState.ERROR],
+                        terminal_states=[VolumeState.AVAILABLE])
+
+                # Hitting the timeout should raise an exception
+                with self.assertRaises(WaitStateException):
+                    self.provider.wait_for_all(
+                        [vol1, vol2], [VolumeState.ERROR],
+                        timeout=0, interval=0)
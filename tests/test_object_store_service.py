@@ -8,6 +8,7 @@ from unittest import skip
 import requests
 
 from cloudbridge.base import helpers as cb_helpers
+from cloudbridge.base.predicates import Prefix
 from cloudbridge.interfaces.exceptions import DuplicateResourceException
 from cloudbridge.interfaces.provider import TestMockHelperMixin
 from cloudbridge.interfaces.resources import Bucket
@@ -211,6 +212,86 @@ class CloudObjectStoreServiceTestCase(ProviderTestBase):
                 with open(test_file, 'rb') as f:
                     self.assertEqual(target_stream.getvalue(), f.read())
 
+    @helpers.skipIfNoService(['storage.buckets'])
+    def test_delete_many_bucket_objects(self):
+        name = "cbtestbucketobjs-{0}".format(helpers.get_uuid())
+        test_bucket = self.provider.storage.buckets.create(name)
+
+        with cb_helpers.cleanup_action(lambda: test_bucket.delete()):
+            names = ["keep.txt", "logs/1.txt", "logs/2.txt", "logs/3.txt",
+                     "other/1.txt", "other/2.txt"]
+            for obj_name in names:
+                test_bucket.objects.create(obj_name).upload("content")
+
+            failures = test_bucket.objects.delete_many(
+                ["other/1.txt", "other/2.txt"])
+            self.assertEqual(failures, {})
+            failures = test_bucket.objects.delete_many("logs/")
+            self.assertEqual(failures, {})
+            self.assertListEqual([o.name for o in test_bucket.objects],
+                                 ["keep.txt"])
+            test_bucket.objects.delete_many(["keep.txt"])
+
+    @helpers.skipIfNoService(['storage.buckets'])
+    def test_find_bucket_objects(self):
+        name = "cbtestbucketobjs-{0}".format(helpers.get_uuid())
+        test_bucket = self.provider.storage.buckets.create(name)
+
+        with cb_helpers.cleanup_action(lambda: test_bucket.delete()):
+            names = ["foo1", "barfoo1", "bar/foo", "food/x.gz", "other"]
+            for obj_name in names:
+                test_bucket.objects.create(obj_name).upload("content")
+
+            with cb_helpers.cleanup_action(
+                    lambda: test_bucket.objects.delete_many(names)):
+                def find(**kwargs):
+                    return sorted(o.name for o in
+                                  test_bucket.objects.find(**kwargs))
+
+                # Patterns are searched for, so they also match keys which
+                # only end with a match
+                self.assertListEqual(find(name="foo*"),
+                                     ["bar/foo", "barfoo1", "foo1",
+                                      "food/x.gz"])
+                self.assertListEqual(find(name="foo"), ["bar/foo"])
+                self.assertListEqual(find(name="food/*.gz"), ["food/x.gz"])
+                self.assertListEqual(find(name=Prefix("foo")),
+                                     ["foo1", "food/x.gz"])
+
+    @helpers.skipIfNoService(['storage.buckets'])
+    def test_upload_download_bucket_content_in_parts(self):
+        name = "cbtestbucketobjs-{0}".format(helpers.get_uuid())
+        test_bucket = self.provider.storage.buckets.create(name)
+
+        with cb_helpers.cleanup_action(lambda: test_bucket.delete()):
+            obj_name = "hello_upload_download_parts.bin"
+            obj = test_bucket.objects.create(obj_name)
+
+            with cb_helpers.cleanup_action(lambda: obj.delete()):
+                # Large enough for three parts at the smallest part size
+                # S3 accepts
+                part_size = 5 * 1024 * 1024
+                content = os.urandom(2 * part_size + 1024)
+                stats = obj.upload_stream(BytesIO(content),
+                                          part_size=part_size,
+                                          concurrency=2)
+                self.assertEqual(stats.bytes, len(content))
+                self.assertEqual(stats.parts, 3)
+
+                obj = test_bucket.objects.get(obj_name)
+                target_stream = BytesIO()
+                stats = obj.download_to(target_stream, part_size=part_size,
+                                        concurrency=2)
+                self.assertEqual(stats.parts, 3)
+                self.assertEqual(target_stream.getvalue(), content)
+
+                # Streams that fit in a single part are uploaded directly
+                stats = obj.upload_stream(BytesIO(b"small"))
+                self.assertEqual(stats.parts, 1)
+                target_stream = BytesIO()
+                obj.download_to(target_stream)
+                self.assertEqual(target_stream.getvalue(), b"small")
+
     @skip("Skip unless you want to test objects bigger than 5GB")
     @helpers.skipIfNoService(['storage.buckets'])
     def test_upload_download_bucket_content_with_large_file(self):
@@ -1,5 +1,6 @@
 import six
 
+from cloudbridge.base import helpers as cb_helpers
 from cloudbridge.interfaces import Region
 
 from tests import helpers
@@ -66,3 +67,45 @@ class CloudRegionServiceTestCase(ProviderTestBase):
                     zone_find_count += 1
         # zone info cannot be repeated between regions
         self.assertEqual(zone_find_count, 1)
+
+    @helpers.skipIfNoService(['compute.regions', 'security.key_pairs'])
+    def test_across_regions(self):
+        current = self.provider.region_name
+        other = next(region.name for region in self.provider.compute.regions
+                     if region.name != current)
+        name = 'cb-fanout-{0}'.format(helpers.get_uuid())
+        kp = self.provider.security.key_pairs.create(name=name)
+        with cb_helpers.cleanup_action(lambda: kp.delete()):
+            key_pairs = self.provider.across_regions(
+                [current, other]).security.key_pairs.find(name=name)
+            self.assertEqual(key_pairs.regions, [current])
+            self.assertEqual(key_pairs.by_region[current], [kp])
+            self.assertEqual(key_pairs.errors, {})
+            # Region providers are reused between calls
+            # pylint:disable=protected-access
+            self.assertIs(self.provider._get_region_provider(other),
+                          self.provider._get_region_provider(other))
+            self.assertEqual(
+                self.provider._get_region_provider(other).region_name, other)
+
+    @helpers.skipIfNoService(['compute.regions', 'security.key_pairs'])
+    def test_across_regions_fetches_all_pages(self):
+        current = self.provider.region_name
+        prefix = 'cb-fanoutpg-{0}'.format(helpers.get_uuid())
+        kps = [self.provider.security.key_pairs.create(
+            name='{0}-{1}'.format(prefix, i)) for i in range(3)]
+
+        def cleanup():
+            for kp in kps:
+                kp.delete()
+
+        with cb_helpers.cleanup_action(cleanup):
+            # Every page is fetched, not only the first page of each region
+            key_pairs = self.provider.across_regions(
+                [current]).security.key_pairs.list(limit=2)
+            self.assertEqual(
+                sorted(kp.id for kp in key_pairs),
+                sorted(kp.id for kp in self.provider.security.key_pairs))
+            self.assertTrue(set(kp.id for kp in kps) <=
+                            set(kp.id for kp in key_pairs))
+            self.assertEqual(key_pairs.regions, [current] * len(key_pairs))
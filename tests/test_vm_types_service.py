@@ -1,5 +1,15 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import responses
+
 import six
 
+from cloudbridge.providers.aws.helpers import AWSVMTypeCatalogue
+
 from tests import helpers
 from tests.helpers import ProviderTestBase
 from tests.helpers import standard_interface_tests as sit
@@ -85,3 +95,91 @@ class CloudVMTypeServiceTestCase(ProviderTestBase):
 
         sit.check_standard_behaviour(
                 self, self.provider.compute.vm_types, vm_type)
+
+
+class AWSVMTypeCatalogueTestCase(unittest.TestCase):
+
+    URL = 'http://catalogue.example.com/vm-types.json'
+    VM_TYPES = [
+        {'instance_type': 't2.nano', 'vCPU': 1, 'memory': 0.5,
+         'pricing': {'us-east-1': {}, 'eu-west-1': {}}},
+        {'instance_type': 'm5.large', 'vCPU': 2, 'memory': 8,
+         'pricing': {'us-east-1': {}}}]
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def catalogue(self, cache_dir=None, ttl=3600):
+        return AWSVMTypeCatalogue(
+            self.URL, self.cache_dir if cache_dir is None else cache_dir,
+            ttl=ttl)
+
+    def cached(self, catalogue):
+        with open(os.path.join(self.cache_dir, catalogue.cache_name)) as f:
+            return json.load(f)
+
+    def test_region_index(self):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, self.URL, json=self.VM_TYPES)
+            catalogue = self.catalogue()
+            self.assertEqual(
+                [t['instance_type'] for t in catalogue.list('us-east-1')],
+                ['t2.nano', 'm5.large'])
+            self.assertEqual(
+                [t['instance_type'] for t in catalogue.list('eu-west-1')],
+                ['t2.nano'])
+            self.assertEqual(catalogue.list('ap-south-1'), [])
+            self.assertEqual(catalogue.get('us-east-1', 'm5.large')['vCPU'],
+                             2)
+            self.assertIsNone(catalogue.get('eu-west-1', 'm5.large'))
+            # The index is built once, and a fresh cache is not revalidated
+            self.catalogue().list('us-east-1')
+            self.assertEqual(len(mock.calls), 1)
+
+    def test_revalidates_with_etag(self):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, self.URL, json=self.VM_TYPES,
+                     headers={'ETag': '"v1"',
+                              'Last-Modified': 'Mon, 01 Jan 2018 00:00:00 '
+                                               'GMT'})
+            catalogue = self.catalogue(ttl=0)
+            catalogue.list('us-east-1')
+            fetched_at = self.cached(catalogue)['fetched_at']
+
+            mock.replace(responses.GET, self.URL, status=304)
+            self.assertEqual(len(catalogue.list('us-east-1')), 2)
+            self.assertEqual(len(mock.calls), 2)
+            headers = mock.calls[1].request.headers
+            self.assertEqual(headers['If-None-Match'], '"v1"')
+            self.assertEqual(headers['If-Modified-Since'],
+                             'Mon, 01 Jan 2018 00:00:00 GMT')
+            # The unchanged catalogue is kept, and is fresh again
+            cached = self.cached(catalogue)
+            self.assertEqual(cached['etag'], '"v1"')
+            self.assertGreaterEqual(cached['fetched_at'], fetched_at)
+
+    def test_falls_back_to_stale_cache(self):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, self.URL, json=self.VM_TYPES)
+            self.catalogue().list('us-east-1')
+            mock.replace(responses.GET, self.URL, status=503)
+            # An expired copy is used if the catalogue cannot be refreshed
+            catalogue = self.catalogue(ttl=0)
+            self.assertEqual(
+                [t['instance_type'] for t in catalogue.list('eu-west-1')],
+                ['t2.nano'])
+            self.assertEqual(len(mock.calls), 2)
+
+    def test_falls_back_to_snapshot(self):
+        with responses.RequestsMock() as mock:
+            mock.add(responses.GET, self.URL, status=503)
+            # Without a cache, the snapshot bundled with cloudbridge is used
+            catalogue = self.catalogue(cache_dir='')
+            vm_type = catalogue.get('us-east-1', 't2.micro')
+            self.assertEqual(vm_type['vCPU'], 1)
+            self.assertTrue(catalogue.list('eu-west-1'))
+            self.assertEqual(len(mock.calls), 1)
+        self.assertTrue(os.path.exists(AWSVMTypeCatalogue.SNAPSHOT_PATH))